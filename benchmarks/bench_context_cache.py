@@ -0,0 +1,109 @@
+"""Offer design reruns on one upstream payload, with and without a context cache.
+
+Runs offer design ``--runs`` times on the same payload against ``StubLlm``, whose
+prefill delay grows with the uncached prompt, first sending the whole prompt each
+time and then through ``ContextCachingLlm`` with the local cache stand-in. Each
+run reports its latency, input tokens, the share served from the cache and the
+latency the cache saved, as the workflow's stage timings do.
+
+Usage: python benchmarks/bench_context_cache.py [--runs 5] [--briefs 8] [--prefill 0.5]
+           [--latency 0.05]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+os.environ.setdefault("TRACE_JSONL_PATH", "")
+
+from bench_prompt_budget import _payload  # noqa: E402
+from bench_suite import CANNED  # noqa: E402
+from google.adk.models.base_llm import BaseLlm  # noqa: E402
+
+from src.offer_design.agent import OfferDesignRootAgent, get_agent  # noqa: E402
+from src.offer_design.sub_agents.simplified_offer_design.agent import NAME  # noqa: E402
+from src.utils.context_cache import (  # noqa: E402
+    ContextCacheRegistry,
+    ContextCachingLlm,
+    LocalContextCacheBackend,
+    min_cache_tokens,
+)
+from src.utils.model_tiers import FAST_TIER, tier_model  # noqa: E402
+from src.utils.stub_llm import StubLlm, apply_model  # noqa: E402
+from src.utils.tracing import get_tracer, stage_timings  # noqa: E402
+
+
+async def _run_once(payload: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    with get_tracer().trace("offer_design_rerun") as trace:
+        await OfferDesignRootAgent().run_async(payload)
+    row = stage_timings(trace.spans, {NAME: "Offer Design"}, root=trace.root)[0]
+    return {**row, "latency_s": time.perf_counter() - started}
+
+
+async def _runs(label: str, model: BaseLlm, payload: Dict[str, Any], runs: int) -> float:
+    apply_model(get_agent(), model)
+    print(f"\n{label}")
+    print(f"  {'run':>3}  {'latency':>9}  {'input':>6}  {'cached':>6}  {'saved':>7}")
+    total_s = 0.0
+    for index in range(runs):
+        row = await _run_once(payload)
+        total_s += row["latency_s"]
+        print(
+            f"  {index + 1:3d}  {row['latency_s']:7.3f} s  {row['input_tokens']:6d}  "
+            f"{row['cached_share']:6.0%}  {row['cache_saved_s']:5.3f} s"
+        )
+    return total_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--briefs", type=int, default=8)
+    parser.add_argument("--prefill", type=float, default=0.5, help="stub seconds per 1k tokens")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub base latency (s)")
+    parser.add_argument(
+        "--min-tokens",
+        type=int,
+        default=min_cache_tokens(tier_model(FAST_TIER)),
+        help="smallest cached prefix (default: the fast model's minimum)",
+    )
+    args = parser.parse_args()
+
+    payload = _payload(args.briefs)
+    backend = LocalContextCacheBackend()
+    stub = StubLlm(
+        latency_s=args.latency,
+        prefill_s_per_1k_tokens=args.prefill,
+        responses=CANNED,
+        context_cache=backend,
+    )
+    registry = ContextCacheRegistry()
+    print(
+        f"{args.runs} offer design runs on one payload ({args.briefs} trend briefs), stub "
+        f"prefill {args.prefill}s per 1k tokens, caching prefixes of {args.min_tokens}+ tokens"
+    )
+    uncached_s = asyncio.run(_runs("full prompt every run", stub, payload, args.runs))
+    cached = ContextCachingLlm(
+        model="stub", inner=stub, registry=registry, backend=backend, min_tokens=args.min_tokens
+    )
+    cached_s = asyncio.run(_runs("context cache", cached, payload, args.runs))
+    asyncio.run(registry.clear())
+
+    print(f"\ntotal {uncached_s:.2f} s -> {cached_s:.2f} s")
+    print(f"registry {registry.stats()}")
+    print(f"cache service {backend.stats}")
+
+
+if __name__ == "__main__":
+    main()
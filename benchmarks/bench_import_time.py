@@ -0,0 +1,107 @@
+"""Cold import time of the agent modules, with a budget for the UI's entry point.
+
+Each module is imported ``--runs`` times, every time in a fresh interpreter, and
+the median import time is reported with whether Google ADK / GenAI were loaded
+and how long first use of ``root_agent`` then takes. Importing
+``src.marketing_orchestrator.agent`` (what the Streamlit UI does on startup) must
+stay under ``--budget-ms``, and no agent module may load ``google.adk`` or
+``google.genai`` before ``root_agent`` is used; otherwise the script exits with
+status 1, so it can gate CI.
+
+Usage: python benchmarks/bench_import_time.py [--runs 3] [--budget-ms 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+ENTRY_MODULE = "src.marketing_orchestrator.agent"
+MODULES = (
+    ENTRY_MODULE,
+    "src.market_trends_analyst.agent",
+    "src.customer_insights.agent",
+    "src.event_planner.agent",
+    "src.orchestrator.agent",
+    "src.offer_design.agent",
+)
+HEAVY_PACKAGES = ("google.adk", "google.genai")
+
+_PROBE = """
+import importlib, json, sys, time, warnings
+warnings.filterwarnings("ignore")
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+import_s = time.perf_counter() - started
+loaded = [name for name in sys.argv[2:] if name in sys.modules]
+started = time.perf_counter()
+module.root_agent
+print(json.dumps({"import_s": import_s, "loaded": loaded,
+                  "root_agent_s": time.perf_counter() - started}))
+"""
+
+
+def _probe(module: str) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, module, *HEAVY_PACKAGES],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _measure(module: str, runs: int) -> Dict[str, Any]:
+    samples: List[Dict[str, Any]] = [_probe(module) for _ in range(runs)]
+    return {
+        "import_ms": statistics.median(sample["import_s"] for sample in samples) * 1000,
+        "root_agent_ms": statistics.median(sample["root_agent_s"] for sample in samples) * 1000,
+        "loaded": sorted({name for sample in samples for name in sample["loaded"]}),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--budget-ms", type=float, default=50.0, help=f"import budget for {ENTRY_MODULE}"
+    )
+    args = parser.parse_args()
+
+    # Compile bytecode once so the first run does not count the compilation.
+    _probe(ENTRY_MODULE)
+    print(f"median of {args.runs} fresh interpreters per module")
+    print(f"{'module':<36} {'import':>10} {'root_agent':>12}  heavy imports at import")
+    results = {}
+    for module in MODULES:
+        result = results[module] = _measure(module, args.runs)
+        print(
+            f"{module:<36} {result['import_ms']:7.1f} ms {result['root_agent_ms']:9.1f} ms  "
+            f"{', '.join(result['loaded']) or '-'}"
+        )
+
+    entry = results[ENTRY_MODULE]
+    failures = []
+    if entry["import_ms"] > args.budget_ms:
+        failures.append(
+            f"{ENTRY_MODULE} import took {entry['import_ms']:.1f} ms "
+            f"(budget {args.budget_ms:g} ms)"
+        )
+    for module, result in results.items():
+        if result["loaded"]:
+            failures.append(f"{module} import loaded {', '.join(result['loaded'])}")
+    if failures:
+        print(f"\nFAIL: {'; '.join(failures)}")
+        sys.exit(1)
+    print(f"\nOK {ENTRY_MODULE}: {entry['import_ms']:.1f} ms within {args.budget_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
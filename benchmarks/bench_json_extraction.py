@@ -0,0 +1,150 @@
+"""JSON extraction over large, noisy model outputs: greedy regex vs bracket scanner.
+
+Also checks which span the scanner picks when the output holds several JSON-like
+values, and exits with status 1 if any pick is wrong.
+
+Usage: python benchmarks/bench_json_extraction.py [--briefs 2000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.utils.adk_runner import parse_json_payload  # noqa: E402
+
+_LEGACY_JSON_BLOCK_RE = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
+
+# (text, prefer_keys, expected value): a preferred key wins, then a span that parsed
+# without repairs, then the longest span.
+RANKING_CASES: List[Tuple[str, Sequence[str], Any]] = [
+    ('[{"a":1},{"a":2}] note {x: 1}', (), [{"a": 1}, {"a": 2}]),
+    ('{"a": 1} and {"b": 2, "c": 3}', (), {"b": 2, "c": 3}),
+    ('{"notes": [1, 2, 3, 4, 5, 6]} then {"trend_briefs": []}', ("trend_briefs",),
+     {"trend_briefs": []}),
+    ('{"trend_briefs": [1,],} and {"other": "clean"}', ("trend_briefs",), {"trend_briefs": [1]}),
+    ("Wendy's picks: {'a': True,} or [1, 2]", (), [1, 2]),
+    # Deeper than the recursion limit: no value rather than a RecursionError.
+    ("[1, x " * 1000, (), None),
+    ("[" * 5000 + "]" * 5000 + ' {"ok": true}', (), {"ok": True}),
+]
+
+
+def legacy_parse_json_payload(text: str) -> Any:
+    """The pre-scanner implementation, kept here as the baseline."""
+    if not text:
+        return None
+    cleaned = text
+    if "```" in text:
+        lines = text.strip().splitlines()
+        if lines and lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].startswith("```"):
+            lines = lines[:-1]
+        cleaned = "\n".join(lines)
+    cleaned = cleaned.strip()
+    if not cleaned:
+        return None
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        match = _LEGACY_JSON_BLOCK_RE.search(cleaned)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def _payload(briefs: int) -> Dict[str, Any]:
+    return {
+        "trend_briefs": [
+            {
+                "title": f"Value bundle trend {index}",
+                "summary": "Guests trade down to bundles; app-exclusive {deals} win.",
+                "evidence_snippets": [f"https://example.com/{index}", "Reddit r/fastfood"],
+                "signal_strength": "high",
+                "velocity": "rising",
+                "recommended_directions": ["bundle", "late night"],
+            }
+            for index in range(briefs)
+        ]
+    }
+
+
+def build_cases(briefs: int) -> Dict[str, str]:
+    body = json.dumps(_payload(briefs), indent=2)
+    prose = "Here's what I found for Wendy's {brand} team. " * 200
+    return {
+        "clean": body,
+        "fenced": f"```json\n{body}\n```",
+        "prose_with_braces": f"{prose}\n```json\n{body}\n```\nLet me know if {{anything}} changes.",
+        "trailing_commas": body.replace("\n      ]", ",\n      ]"),
+        "single_quotes": body.replace('"', "'"),
+        "truncated": body[: int(len(body) * 0.9)],
+    }
+
+
+def _time(parser: Callable[[str], Any], text: str, repeat: int) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parser(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _briefs(value: Any) -> int:
+    if isinstance(value, dict) and isinstance(value.get("trend_briefs"), list):
+        return len(value["trend_briefs"])
+    return 0
+
+
+def check_ranking() -> bool:
+    print(f"\n{'ranking case':<60}  pick")
+    passed = True
+    for text, prefer_keys, expected in RANKING_CASES:
+        value = parse_json_payload(text, prefer_keys=prefer_keys)
+        ok = value == expected
+        passed = passed and ok
+        label = text if len(text) <= 60 else text[:56] + " ..."
+        print(f"{label:<60}  {'ok  ' if ok else 'FAIL'} {json.dumps(value)}")
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--briefs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def scanner(text: str) -> Any:
+        return parse_json_payload(text, prefer_keys=("trend_briefs",))
+
+    print(f"{'case':<20}{'size':>10}  {'legacy':>22}  {'scanner':>22}")
+    for name, text in build_cases(args.briefs).items():
+        legacy_s, legacy_value = _time(legacy_parse_json_payload, text, args.repeat)
+        scanner_s, scanner_value = _time(scanner, text, args.repeat)
+        megabytes = len(text) / 1_000_000
+        print(
+            f"{name:<20}{megabytes:>8.2f}MB  "
+            f"{legacy_s * 1000:>8.1f} ms {_briefs(legacy_value):>5} briefs  "
+            f"{scanner_s * 1000:>8.1f} ms {_briefs(scanner_value):>5} briefs"
+        )
+
+    if not check_ranking():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
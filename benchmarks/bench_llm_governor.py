@@ -0,0 +1,136 @@
+"""LLM governor under quota pressure, on a stub model that throttles like Gemini.
+
+The stub answers 429 RESOURCE_EXHAUSTED whenever more than ``--capacity`` calls are
+in flight. Interactive and batch calls are fired at once, first straight at the
+stub and then through an ``LlmGovernor``; the report shows failures, throttles,
+retries, the adapted concurrency limit and each lane's queue wait.
+
+Usage: python benchmarks/bench_llm_governor.py [--interactive 20] [--batch 80]
+           [--capacity 6] [--latency 0.1] [--rpm 0]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from google.adk.agents.llm_agent import LlmAgent  # noqa: E402
+from google.genai import errors  # noqa: E402
+
+from src.utils.adk_runner import run_agent_async  # noqa: E402
+from src.utils.llm_governor import (  # noqa: E402
+    BATCH_LANE,
+    INTERACTIVE_LANE,
+    GovernedLlm,
+    LlmGovernor,
+    run_in_lane,
+)
+from src.utils.stub_llm import StubLlm  # noqa: E402
+
+
+class ThrottlingStubLlm(StubLlm):
+    """Stub model with a hard concurrency quota, answering 429 above it."""
+
+    capacity: int = 6
+    in_flight: int = 0
+    throttled: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):  # type: ignore[override]
+        if self.in_flight >= self.capacity:
+            self.throttled += 1
+            await asyncio.sleep(0.005)
+            raise errors.ClientError(
+                429,
+                {
+                    "error": {
+                        "code": 429,
+                        "message": "Quota exceeded.",
+                        "status": "RESOURCE_EXHAUSTED",
+                    }
+                },
+            )
+        self.in_flight += 1
+        try:
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+        finally:
+            self.in_flight -= 1
+
+
+async def _call(agent: LlmAgent, lane: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        await run_in_lane(lane, run_agent_async(agent, "Return JSON."))
+        error = None
+    except Exception as failure:
+        error = type(failure).__name__
+    return {"lane": lane, "latency_s": time.perf_counter() - started, "error": error}
+
+
+async def _load(args: argparse.Namespace, model: Any) -> List[Dict[str, Any]]:
+    agent = LlmAgent(name="governed_agent", model=model, instruction="Return JSON only.")
+    calls = [_call(agent, BATCH_LANE) for _ in range(args.batch)]
+    # Interactive work arrives just after the batch has filled the queue.
+    calls += [_call(agent, INTERACTIVE_LANE) for _ in range(args.interactive)]
+    return await asyncio.gather(*calls)
+
+
+def _report(label: str, outcomes: List[Dict[str, Any]], stub: ThrottlingStubLlm) -> None:
+    print(f"\n{label}: {stub.throttled} throttled model calls")
+    for lane in (INTERACTIVE_LANE, BATCH_LANE):
+        rows = [outcome for outcome in outcomes if outcome["lane"] == lane]
+        latencies = sorted(outcome["latency_s"] for outcome in rows)
+        failed = sum(outcome["error"] is not None for outcome in rows)
+        print(
+            f"  {lane:<12} {len(rows):4d} calls  {failed:4d} failed  "
+            f"p50 {latencies[len(latencies) // 2]:.2f} s  max {latencies[-1]:.2f} s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=80)
+    parser.add_argument("--capacity", type=int, default=6, help="stub concurrency quota")
+    parser.add_argument("--latency", type=float, default=0.1, help="stub model latency (s)")
+    parser.add_argument("--rpm", type=float, default=0, help="governor requests/min (0: off)")
+    args = parser.parse_args()
+    # ADK logs a traceback for every call that fails in the ungoverned run.
+    logging.disable(logging.ERROR)
+
+    print(
+        f"{args.interactive} interactive + {args.batch} batch calls, stub quota "
+        f"{args.capacity} concurrent, latency {args.latency}s"
+    )
+    stub = ThrottlingStubLlm(latency_s=args.latency, capacity=args.capacity)
+    _report("ungoverned", asyncio.run(_load(args, stub)), stub)
+
+    stub = ThrottlingStubLlm(latency_s=args.latency, capacity=args.capacity)
+    governor = LlmGovernor(
+        requests_per_min=args.rpm, tokens_per_min=0, initial_concurrency=8, max_retries=6
+    )
+    outcomes = asyncio.run(_load(args, GovernedLlm(model="stub", inner=stub, governor=governor)))
+    _report("governed", outcomes, stub)
+    metrics = governor.metrics()
+    print(f"  concurrency limit now {metrics['concurrency_limit']}")
+    for lane, lane_metrics in metrics["lanes"].items():
+        print(
+            f"  {lane:<12} max queued {lane_metrics['max_queued']:4d}  "
+            f"throttles {lane_metrics['throttles']:3d}  retries {lane_metrics['retries']:3d}  "
+            f"wait p50 {lane_metrics['wait_p50_s']:.2f} s  p95 {lane_metrics['wait_p95_s']:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
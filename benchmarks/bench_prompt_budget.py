@@ -0,0 +1,109 @@
+"""Offer design prompt size and time to first token: indented JSON vs compact budgeted.
+
+Usage: python benchmarks/bench_prompt_budget.py [--briefs 8] [--prefill 0.5] [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from src.event_planner.event_store import get_event_store  # noqa: E402
+from src.offer_design.agent import get_agent  # noqa: E402
+from src.utils.adk_runner import run_agent_async  # noqa: E402
+from src.utils.prompt_budget import (  # noqa: E402
+    OFFER_DESIGN_STAGE,
+    compact_prompt,
+    stage_token_budget,
+)
+from src.utils.stub_llm import StubLlm, apply_model, canned_responses  # noqa: E402
+
+CANNED = canned_responses(
+    {"simplified_offer_design_agent": {"offer_concepts": [{"title": "Bundle", "priority_rank": 1}]}}
+)
+
+
+def _payload(briefs: int) -> Dict[str, Any]:
+    store = get_event_store()
+    return {
+        "research_topic": "Value offers for late-night and family guests in 2026",
+        "trend_briefs": [
+            {
+                "title": f"Trend {index}: value bundles with app-exclusive pricing",
+                "summary": (
+                    "Guests keep trading down to bundles and app-only deals as menu prices "
+                    "rise; chains that pair a hero item with a low anchor price win visits. "
+                ) * 2,
+                "evidence_snippets": [
+                    f"https://example.com/news/{index}/{source}: bundle sales up {source * 3}%"
+                    for source in range(6)
+                ],
+                "signal_strength": "high",
+                "velocity": "rising",
+                "recommended_directions": ["bundle", "late night", "app exclusive", "loyalty"],
+            }
+            for index in range(briefs)
+        ],
+        "customer_insights": [
+            {
+                "segment_id": segment,
+                "description": f"Customers in the {segment} segment.",
+                "preferred_mechanics": ["bundles", "app-exclusive deals", "loyalty points"],
+                "key_messaging_phrases": ["Save more every visit", "Only in the app"],
+                "empirical_metrics": {"redemption_rate": "31.0%", "segment_size": "45.0%"},
+                "sample_customer": {"name": "Ana", "city": "Columbus"},
+            }
+            for segment in ("value-driven-lunch-buyer", "late-night-craver", "family-bundle-planner")
+        ],
+        "event_calendar": store.calendar(store.query()),
+    }
+
+
+async def _ttft(text: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run_agent_async(get_agent(), text)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--briefs", type=int, default=8)
+    parser.add_argument("--prefill", type=float, default=0.5, help="stub seconds per 1k tokens")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=stage_token_budget(OFFER_DESIGN_STAGE))
+    args = parser.parse_args()
+
+    apply_model(get_agent(), StubLlm(prefill_s_per_1k_tokens=args.prefill, responses=CANNED))
+    payload = _payload(args.briefs)
+    indented = json.dumps(payload, indent=2)
+    compact = compact_prompt(payload)
+    budgeted = compact_prompt(payload, budget=args.budget)
+
+    print(f"{args.briefs} trend briefs, stub prefill {args.prefill}s per 1k tokens")
+    for label, text, tokens in (
+        ("json indent=2", indented, budgeted.tokens_before),
+        ("compact", compact.text, compact.tokens_after),
+        (f"compact, budget {args.budget}", budgeted.text, budgeted.tokens_after),
+    ):
+        ttft = asyncio.run(_ttft(text, args.runs))
+        print(f"{label:<24} {len(text):7d} chars  ~{tokens:6d} tokens  {ttft * 1000:7.1f} ms")
+    print(f"budgeted: {budgeted.log}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Per-call overhead of run_agent: fresh thread + loop + runner vs the persistent loop.
+
+Usage: python benchmarks/bench_runner_overhead.py [--calls 200] [--concurrency 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from google.adk.agents.llm_agent import LlmAgent  # noqa: E402
+
+from src.utils.adk_runner import clear_runner_pool, run_agent, run_agent_async  # noqa: E402
+from src.utils.stub_llm import StubLlm  # noqa: E402
+
+
+def _build_agent() -> LlmAgent:
+    return LlmAgent(
+        name="bench_agent",
+        model=StubLlm(default_response='{"ok": true}'),
+        instruction="Return JSON only.",
+    )
+
+
+def _time_sync_calls(agent: LlmAgent, calls: int, isolated_loop: bool) -> list[float]:
+    run_agent(agent, "warm-up", isolated_loop=isolated_loop)
+    samples = []
+    for index in range(calls):
+        start = time.perf_counter()
+        run_agent(agent, f"query {index}", isolated_loop=isolated_loop)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _time_async_batch(agent: LlmAgent, calls: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(index: int) -> None:
+        async with semaphore:
+            await run_agent_async(agent, f"query {index}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(index) for index in range(calls)))
+    return time.perf_counter() - start
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<32} mean {statistics.mean(samples) * 1000:7.2f} ms"
+        f"  p50 {statistics.median(samples) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    agent = _build_agent()
+    before = _time_sync_calls(agent, args.calls, isolated_loop=True)
+    clear_runner_pool()
+    after = _time_sync_calls(agent, args.calls, isolated_loop=False)
+
+    print(f"run_agent overhead over {args.calls} calls (stub model, zero latency)")
+    _report("before: thread+loop+runner/call", before)
+    _report("after: persistent loop + pool", after)
+    print(f"speedup (mean): {statistics.mean(before) / statistics.mean(after):.2f}x")
+
+    elapsed = asyncio.run(_time_async_batch(agent, args.calls, args.concurrency))
+    print(
+        f"run_agent_async, {args.calls} calls at concurrency {args.concurrency}: "
+        f"{elapsed:.2f} s ({args.calls / elapsed:.0f} calls/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Load test of the workflow service on the stub model.
+
+Many clients submit a handful of topics at once (with varied case and spacing), then
+long-poll for their results. Reports how many submissions were coalesced or rejected
+with 429, how many workflow runs and model calls that cost, and client latency.
+
+Usage: python benchmarks/bench_service.py [--clients 64] [--topics 4] [--workers 4]
+           [--queue-size 8] [--latency 0.2]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+# Measure coalescing, not stage checkpoints: every distinct run should call the model.
+os.environ.setdefault("STAGE_CHECKPOINTS", "false")
+
+import httpx  # noqa: E402
+
+from bench_suite import CANNED  # noqa: E402
+from src.customer_insights.agent import get_agent as get_customer_insights_agent  # noqa: E402
+from src.event_planner.agent import get_refresh_agent  # noqa: E402
+from src.market_trends_analyst.agent import get_agent as get_market_trends_agent  # noqa: E402
+from src.marketing_orchestrator.agent import get_agent  # noqa: E402
+from src.offer_design.agent import get_agent as get_offer_design_agent  # noqa: E402
+from src.utils.stub_llm import StubLlm, apply_model  # noqa: E402
+from src.workflow_service.app import WorkflowService, create_app  # noqa: E402
+
+
+class CountingStubLlm(StubLlm):
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):  # type: ignore[override]
+        self.calls += 1
+        async for response in super().generate_content_async(llm_request, stream=stream):
+            yield response
+
+
+async def _client(http: httpx.AsyncClient, query: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    response = await http.post("/jobs", json={"query": query})
+    if response.status_code == 429:
+        return {"status": 429, "latency_s": time.perf_counter() - started}
+    job = response.json()
+    while True:
+        result = await http.get(f"/jobs/{job['job_id']}/result", params={"wait": 30})
+        if result.status_code == 200:
+            break
+    return {
+        "status": result.json()["status"],
+        "coalesced": job["coalesced"],
+        "latency_s": time.perf_counter() - started,
+    }
+
+
+async def _run(args: argparse.Namespace, model: CountingStubLlm) -> None:
+    service = WorkflowService(workers=args.workers, queue_size=args.queue_size)
+    await service.start()
+    transport = httpx.ASGITransport(app=create_app(service))
+    topics = [f"Research topic {index}" for index in range(args.topics)]
+    # Same topic, different spelling: " research TOPIC 1. " coalesces with "Research topic 1".
+    queries = [
+        topics[index % args.topics] if index % 2 else f"  {topics[index % args.topics].upper()}. "
+        for index in range(args.clients)
+    ]
+    started = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            outcomes: List[Dict[str, Any]] = await asyncio.gather(
+                *(_client(http, query) for query in queries)
+            )
+            health = (await http.get("/health")).json()
+    finally:
+        await service.stop()
+    elapsed_s = time.perf_counter() - started
+
+    served = [outcome for outcome in outcomes if outcome["status"] != 429]
+    latencies = sorted(outcome["latency_s"] for outcome in served)
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    runs = health["succeeded"] + health["failed"]
+    print(
+        f"{args.clients} clients, {args.topics} topics, {args.workers} workers, "
+        f"queue {args.queue_size}, stub latency {args.latency}s"
+    )
+    print(f"{'submissions':<22} {health['submitted']:6d}")
+    print(f"{'coalesced':<22} {health['coalesced']:6d}")
+    print(f"{'rejected (429)':<22} {health['rejected']:6d}")
+    print(f"{'workflow runs':<22} {runs:6d} ({health['failed']} failed)")
+    print(f"{'model calls':<22} {model.calls:6d}")
+    print(f"{'wall time':<22} {elapsed_s:6.2f} s")
+    if latencies:
+        print(
+            f"{'client latency':<22} p50 {cuts[49]:.2f} s  p95 {cuts[94]:.2f} s  "
+            f"max {latencies[-1]:.2f} s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub model latency (s)")
+    args = parser.parse_args()
+
+    model = CountingStubLlm(latency_s=args.latency, responses=CANNED)
+    for agent in (
+        get_agent(),
+        get_market_trends_agent(),
+        get_customer_insights_agent(),
+        get_offer_design_agent(),
+        get_refresh_agent(),
+    ):
+        apply_model(agent, model)
+    asyncio.run(_run(args, model))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Orchestration overhead of the agent entry points on a local stub model.
+
+Measures run_agent, extract_final_responses, parse_json_payload, agent building and
+every ``*.run()`` entry point, reporting p50/p95/p99 latency and peak allocation per
+call. Results are written as JSON; ``--compare`` prints the change against an
+earlier results file.
+
+Usage: python benchmarks/bench_suite.py [--iterations 30] [--latency 0] [--tokens-per-s 0]
+           [--only run_agent,parse_json_payload] [--output results.json] [--compare base.json]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from google.adk.agents.llm_agent import LlmAgent  # noqa: E402
+
+from src.customer_insights import agent as customer_insights  # noqa: E402
+from src.event_planner import agent as event_planner  # noqa: E402
+from src.market_trends_analyst import agent as market_trends  # noqa: E402
+from src.marketing_orchestrator import agent as marketing_orchestrator  # noqa: E402
+from src.offer_design import agent as offer_design  # noqa: E402
+from src.orchestrator import agent as orchestrator  # noqa: E402
+from src.utils.adk_runner import (  # noqa: E402
+    extract_final_responses,
+    parse_json_payload,
+    run_agent,
+)
+from src.utils.stub_llm import StubLlm, apply_model, canned_responses  # noqa: E402
+
+TREND_BRIEFS = [
+    {
+        "title": f"Value bundles {index}",
+        "summary": "Guests trade down to bundles; app-exclusive deals win visits.",
+        "evidence_snippets": [f"https://example.com/trends/{index}", "QSR Magazine, 2026"],
+        "signal_strength": "high",
+        "velocity": "rising",
+        "recommended_directions": ["bundle", "late night", "app exclusive"],
+    }
+    for index in range(5)
+]
+CUSTOMER_INSIGHTS = [
+    {
+        "segment_id": segment,
+        "description": f"Customers in the {segment} segment.",
+        "preferred_mechanics": ["bundles", "app-exclusive deals"],
+        "key_messaging_phrases": ["Save more every visit"],
+        "empirical_metrics": {"redemption_rate": "31.0%", "segment_size": "45.0%"},
+    }
+    for segment in ("value-driven-lunch-buyer", "late-night-craver", "family-bundle-planner")
+]
+OFFER_CONCEPTS = [
+    {
+        "priority_rank": rank,
+        "title": f"Offer {rank}",
+        "offer_summary": "Late-night bundle with app-exclusive pricing.",
+        "success_hypothesis": "Bundles lift late-night check size.",
+        "evidence_map": ["Value bundles 0"],
+        "justification_points": ["Trend", "Segment", "Event"],
+    }
+    for rank in (1, 2, 3)
+]
+CANNED = canned_responses(
+    {
+        "data_collection_agent": {
+            "sources": [{"url": f"https://example.com/{index}", "title": "Trend"} for index in range(5)]
+        },
+        "research_synthesis_agent": {"trend_briefs": TREND_BRIEFS},
+        "behavioral_analysis_agent": {"topic": "bench", "segments": CUSTOMER_INSIGHTS},
+        "profile_synthesizer_agent": {"customer_insights": CUSTOMER_INSIGHTS},
+        "event_refresh_agent": {"year": 2026, "high_velocity_events": []},
+        "simplified_offer_design_agent": {"offer_concepts": OFFER_CONCEPTS},
+    }
+)
+QUERY = "Gen Z late night craving trends"
+
+
+def percentile_stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int, alloc_iterations: int) -> Dict[str, Any]:
+    fn()  # warm-up: builds runners, caches and lazily imported modules
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_iterations):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return {
+        "iterations": iterations,
+        **percentile_stats(samples),
+        "alloc_peak_kib": statistics.median(peaks) / 1024 if peaks else None,
+    }
+
+
+def benchmarks(model: StubLlm) -> Dict[str, Callable[[], Any]]:
+    for agent in (
+        market_trends.get_agent(),
+        customer_insights.get_agent(),
+        event_planner.get_refresh_agent(),
+        offer_design.get_agent(),
+        marketing_orchestrator.get_agent(parallel=True),
+        marketing_orchestrator.get_agent(parallel=False),
+    ):
+        apply_model(agent, model)
+
+    single_agent = LlmAgent(
+        name="simplified_offer_design_agent", model=model, instruction="Return JSON only."
+    )
+    workflow_events = run_agent(marketing_orchestrator.get_agent(), QUERY)
+    offer_text = CANNED["simplified_offer_design_agent"]
+    payload = orchestrator.merge_offer_payload(
+        QUERY, TREND_BRIEFS, CUSTOMER_INSIGHTS, event_planner.EventManager().run(QUERY)
+    )
+    return {
+        "run_agent": lambda: run_agent(single_agent, QUERY),
+        "extract_final_responses": lambda: extract_final_responses(workflow_events),
+        "parse_json_payload": lambda: parse_json_payload(
+            f"Here are the offers:\n```json\n{offer_text}\n```", prefer_keys=("offer_concepts",)
+        ),
+        "build.market_trends": market_trends.build_agent,
+        "build.customer_insights": customer_insights.build_agent,
+        "build.event_planner": event_planner.build_agent,
+        "build.offer_orchestrator": orchestrator.build_agent,
+        "build.offer_design": offer_design.build_agent,
+        "build.marketing_orchestrator": marketing_orchestrator.build_agent,
+        "run.MarketTrendsAnalystRoot": lambda: market_trends.MarketTrendsAnalystRoot().run(QUERY),
+        "run.CustomerInsightsManagerAgent": lambda: (
+            customer_insights.CustomerInsightsManagerAgent().run(QUERY)
+        ),
+        "run.EventManager": lambda: event_planner.EventManager().run(QUERY),
+        "run.OfferOrchestratorAgent": lambda: orchestrator.OfferOrchestratorAgent().run(
+            QUERY, TREND_BRIEFS, CUSTOMER_INSIGHTS, payload["event_calendar"]
+        ),
+        "run.OfferDesignRootAgent": lambda: offer_design.OfferDesignRootAgent().run(payload),
+        "run.MarketingOrchestrator": lambda: marketing_orchestrator.MarketingOrchestrator().run(
+            QUERY
+        ),
+        "run.MarketingOrchestrator.sequential": lambda: (
+            marketing_orchestrator.MarketingOrchestrator(parallel=False).run(QUERY)
+        ),
+    }
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    print(f"\nvs {baseline_path} ({baseline['meta'].get('revision', '?')})")
+    print(f"{'benchmark':<38} {'p50 before':>11} {'p50 after':>10} {'change':>8}")
+    for name, stats in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = (stats["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+        print(f"{name:<38} {before['p50_ms']:9.3f}ms {stats['p50_ms']:8.3f}ms {change:+7.1f}%")
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--alloc-iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub model latency (s)")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="stub generation rate")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names")
+    parser.add_argument("--output", default="")
+    parser.add_argument("--compare", default="", help="earlier results JSON to compare with")
+    args = parser.parse_args()
+
+    model = StubLlm(latency_s=args.latency, tokens_per_s=args.tokens_per_s, responses=CANNED)
+    selected = {name for name in args.only.split(",") if name}
+    revision = _revision()
+    results: Dict[str, Any] = {
+        "meta": {
+            "revision": revision,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "stub_latency_s": args.latency,
+            "stub_tokens_per_s": args.tokens_per_s,
+        },
+        "results": {},
+    }
+
+    print(f"{'benchmark':<38} {'p50':>9} {'p95':>9} {'p99':>9} {'alloc peak':>11}")
+    for name, fn in benchmarks(model).items():
+        if selected and name not in selected:
+            continue
+        stats = measure(fn, args.iterations, args.alloc_iterations)
+        results["results"][name] = stats
+        print(
+            f"{name:<38} {stats['p50_ms']:7.3f}ms {stats['p95_ms']:7.3f}ms "
+            f"{stats['p99_ms']:7.3f}ms {stats['alloc_peak_kib']:8.1f}KiB"
+        )
+
+    output = args.output or os.path.join(ROOT_DIR, ".cache", "benchmarks", f"suite-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Synthetic transaction generation throughput (rows/s) to chunked .npy columns.
+
+Usage: python benchmarks/bench_transaction_generator.py [--rows 10000000] [--workers N] [--out DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.customer_insights.sub_agents.behavioral_analysis.transactions import (  # noqa: E402
+    DEFAULT_CHUNK_ROWS,
+    customer_segments,
+    generate_chunk,
+    write_transactions,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="keep the files in this directory")
+    args = parser.parse_args()
+
+    segments = customer_segments(2_000_000, seed=0)
+    start = time.perf_counter()
+    generate_chunk(args.chunk_rows, seed=0, segments_by_customer=segments)
+    in_memory_s = time.perf_counter() - start
+    print(
+        f"generate_chunk, {args.chunk_rows:,} rows in memory: "
+        f"{args.chunk_rows / in_memory_s / 1e6:.2f}M rows/s"
+    )
+
+    out_dir = args.out or tempfile.mkdtemp(prefix="transactions-")
+    try:
+        start = time.perf_counter()
+        parts = write_transactions(
+            out_dir, args.rows, seed=0, chunk_rows=args.chunk_rows, workers=args.workers
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"write_transactions, {args.rows:,} rows in {len(parts)} parts: "
+            f"{elapsed:.2f} s ({args.rows / elapsed / 1e6:.2f}M rows/s) -> {out_dir}"
+        )
+    finally:
+        if args.out is None:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""``web_scraper_batch_tool`` against a local HTTP server standing in for the web.
+
+Starts a ``ThreadingHTTPServer`` on localhost that serves article pages after a
+delay, a page slower than the per-URL timeout, a 404, an endless response body and
+a closed port, then checks that the batch tool:
+
+- never has more than ``MAX_CONCURRENT_FETCHES`` requests in flight and overlaps
+  the rest (wall time close to ``ceil(n / limit)`` page delays, not ``n``);
+- gives up on the slow page after the per-URL timeout without failing the batch;
+- reports the 404 and the connection error per page with placeholder content;
+- stops reading the endless body at ``MAX_PAGE_BYTES``;
+- fetches each URL once, however often and with whatever padding it is passed;
+- keeps the title and article text and drops scripts, styles and page chrome;
+- parses large HTML pages without stalling the event loop for ``--max-stall-ms``.
+
+Exits with status 1 if any check fails. Needs ``httpx`` but no network access.
+
+Usage: python benchmarks/bench_web_scraper_batch.py [--pages 16] [--delay 0.2]
+           [--timeout 1.0] [--max-stall-ms 100]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.market_trends_analyst.sub_agents.research_synthesis import tools  # noqa: E402
+
+ARTICLE_TEXT = "Value bundles under five dollars drove repeat visits this quarter."
+CHROME_MARKERS = ("SCRIPT_MARKER", "STYLE_MARKER", "NAV_MARKER", "FOOTER_MARKER")
+STREAM_CHUNK_BYTES = 64 * 1024
+LARGE_PAGE_BYTES = 500 * 1024
+LARGE_PAGES = 4
+
+_ARTICLE_HTML = """<!doctype html>
+<html><head><title>Trend report {index}</title>
+<style>body {{ color: red; }} /* STYLE_MARKER */</style>
+<script>var tracking = "SCRIPT_MARKER";</script></head>
+<body><nav>Home | Menu | NAV_MARKER</nav>
+<article><h1>Report {index}</h1><p>{text}</p></article>
+<footer>Copyright FOOTER_MARKER</footer></body></html>
+"""
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connects when a whole batch arrives at once.
+    request_queue_size = 64
+    daemon_threads = True
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.hits: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.in_flight = self.max_in_flight = 0
+            self.hits.clear()
+
+
+def _handler(stats: _Stats, delay_s: float, slow_s: float) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            with stats.lock:
+                stats.in_flight += 1
+                stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+                stats.hits[self.path] = stats.hits.get(self.path, 0) + 1
+            try:
+                self._route()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                with stats.lock:
+                    stats.in_flight -= 1
+
+        def _route(self) -> None:
+            if self.path.startswith("/article/"):
+                time.sleep(delay_s)
+                index = self.path.rsplit("/", 1)[-1]
+                body = _ARTICLE_HTML.format(index=index, text=ARTICLE_TEXT)
+                self._send(200, "text/html; charset=utf-8", body.encode("utf-8"))
+            elif self.path == "/slow":
+                time.sleep(slow_s)
+                self._send(200, "text/plain", b"too late")
+            elif self.path.startswith("/large/"):
+                paragraph = f"<p>{ARTICLE_TEXT} <a href='#'>more</a></p>\n"
+                body = "<html><body>" + paragraph * (LARGE_PAGE_BYTES // len(paragraph))
+                self._send(200, "text/html; charset=utf-8", body.encode("utf-8"))
+            elif self.path == "/plain":
+                self._send(200, "text/plain", f"  {ARTICLE_TEXT}\n\n".encode("utf-8"))
+            elif self.path == "/endless":
+                # No Content-Length and no end: without the cap the fetch runs into its timeout.
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.end_headers()
+                chunk = b"x" * STREAM_CHUNK_BYTES
+                while True:
+                    self.wfile.write(chunk)
+            else:
+                self._send(404, "text/plain", b"not found")
+
+        def _send(self, status: int, content_type: str, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _max_stall(work: Any) -> Tuple[float, Any]:
+    """Run ``work`` while a 10 ms ticker measures the longest event loop stall."""
+    stalls: List[float] = []
+    done = asyncio.Event()
+
+    async def tick() -> None:
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            stalls.append(now - last - 0.01)
+            last = now
+
+    ticker = asyncio.create_task(tick())
+    try:
+        result = await work
+    finally:
+        done.set()
+        await ticker
+    return max(stalls, default=0.0), result
+
+
+async def _batch(urls: List[str]) -> Tuple[float, Dict[str, Dict[str, Any]]]:
+    started = time.perf_counter()
+    result = await tools.web_scraper_batch_tool(urls)
+    return time.perf_counter() - started, {page["url"]: page for page in result["pages"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=16, help="article pages in the batch")
+    parser.add_argument("--delay", type=float, default=0.2, help="server delay per page (s)")
+    parser.add_argument("--timeout", type=float, default=1.0, help="per-URL timeout (s)")
+    parser.add_argument(
+        "--max-stall-ms", type=float, default=100.0, help="longest event loop stall allowed"
+    )
+    args = parser.parse_args()
+
+    if tools.httpx is None:
+        print("httpx is not installed; web_scraper_batch_tool falls back to placeholders")
+        sys.exit(1)
+    # The tool reads its limits at call time; a short timeout keeps the run quick.
+    tools.PER_URL_TIMEOUT_S = args.timeout
+    pages = min(args.pages, tools.MAX_BATCH_URLS)
+    limit = tools.MAX_CONCURRENT_FETCHES
+
+    stats = _Stats()
+    server = _Server(("127.0.0.1", 0), _handler(stats, args.delay, slow_s=args.timeout * 3))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    failures: List[str] = []
+
+    def check(name: str, passed: bool, detail: str) -> None:
+        print(f"  {'ok  ' if passed else 'FAIL'} {name:<22} {detail}")
+        if not passed:
+            failures.append(name)
+
+    def concurrency() -> None:
+        urls = [f"{base}/article/{index}" for index in range(pages)]
+        elapsed, by_url = asyncio.run(_batch(urls))
+        floor_s = math.ceil(pages / limit) * args.delay
+        check(
+            "bounded concurrency",
+            stats.max_in_flight <= limit,
+            f"peak {stats.max_in_flight} in flight (limit {limit})",
+        )
+        check(
+            "fetches overlap",
+            floor_s <= elapsed < floor_s + pages * args.delay / 2,
+            f"{pages} pages in {elapsed:.2f} s (serial {pages * args.delay:.2f} s, "
+            f"floor {floor_s:.2f} s)",
+        )
+        check(
+            "all pages fetched",
+            all("error" not in page for page in by_url.values()) and len(by_url) == pages,
+            f"{sum('error' not in page for page in by_url.values())}/{pages} without error",
+        )
+
+    def timeout() -> None:
+        urls = [f"{base}/slow", f"{base}/article/0"]
+        elapsed, by_url = asyncio.run(_batch(urls))
+        slow = by_url[f"{base}/slow"]
+        check(
+            "per-URL timeout",
+            "error" in slow and elapsed < args.timeout * 2,
+            f"{slow.get('error', 'no error')!r} after {elapsed:.2f} s",
+        )
+        check(
+            "timeout isolated",
+            "error" not in by_url[f"{base}/article/0"]
+            and slow["content"] == tools.PLACEHOLDER_CONTENT,
+            "other page fetched, placeholder for the slow one",
+        )
+
+    def errors() -> None:
+        refused = f"http://127.0.0.1:{_closed_port()}/article/0"
+        _, by_url = asyncio.run(_batch([f"{base}/missing", refused]))
+        missing = by_url[f"{base}/missing"]
+        check(
+            "404 reported",
+            missing.get("error") == "HTTP 404" and missing["content"] == tools.PLACEHOLDER_CONTENT,
+            repr(missing.get("error")),
+        )
+        check(
+            "connection error",
+            "error" in by_url[refused]
+            and by_url[refused]["content"] == tools.PLACEHOLDER_CONTENT,
+            repr(by_url[refused].get("error")),
+        )
+
+    def byte_cap() -> None:
+        elapsed, by_url = asyncio.run(_batch([f"{base}/endless"]))
+        page = by_url[f"{base}/endless"]
+        check(
+            "byte cap",
+            "error" not in page and elapsed < args.timeout,
+            f"stopped reading after {elapsed:.2f} s (cap {tools.MAX_PAGE_BYTES // 1024} KB)",
+        )
+        check(
+            "content clipped",
+            len(page["content"]) <= tools.MAX_CONTENT_CHARS + len(" ..."),
+            f"{len(page['content'])} chars (limit {tools.MAX_CONTENT_CHARS})",
+        )
+
+    def dedupe() -> None:
+        url = f"{base}/article/7"
+        _, by_url = asyncio.run(_batch([url, f"  {url} ", url, "", "   ", f"{base}/plain"]))
+        check(
+            "URL dedupe",
+            stats.hits == {"/article/7": 1, "/plain": 1} and len(by_url) == 2,
+            f"server hits {stats.hits}",
+        )
+
+    def main_text() -> None:
+        _, by_url = asyncio.run(_batch([f"{base}/article/3", f"{base}/plain"]))
+        article = by_url[f"{base}/article/3"]
+        leaked = [marker for marker in CHROME_MARKERS if marker in article["content"]]
+        check(
+            "main text kept",
+            ARTICLE_TEXT in article["content"] and article.get("title") == "Trend report 3",
+            f"title {article.get('title')!r}, {len(article['content'])} chars",
+        )
+        check("chrome dropped", not leaked, f"leaked {leaked}" if leaked else "no chrome text")
+        check(
+            "plain text kept",
+            by_url[f"{base}/plain"]["content"] == ARTICLE_TEXT,
+            repr(by_url[f"{base}/plain"]["content"][:40]),
+        )
+
+    def loop_free() -> None:
+        urls = [f"{base}/large/{index}" for index in range(LARGE_PAGES)]
+        stall_s, (elapsed, by_url) = asyncio.run(_max_stall(_batch(urls)))
+        parsed = list(by_url.values())
+        check(
+            "large pages parsed",
+            all(ARTICLE_TEXT in page["content"] and "error" not in page for page in parsed),
+            f"{LARGE_PAGES} pages of {LARGE_PAGE_BYTES // 1024} KB in {elapsed:.2f} s",
+        )
+        check(
+            "event loop free",
+            stall_s * 1000 <= args.max_stall_ms,
+            f"longest stall {stall_s * 1000:.0f} ms (limit {args.max_stall_ms:g} ms)",
+        )
+
+    scenarios: List[Tuple[str, Callable[[], None]]] = [
+        ("concurrency", concurrency),
+        ("timeout", timeout),
+        ("errors", errors),
+        ("byte cap", byte_cap),
+        ("dedupe", dedupe),
+        ("main text", main_text),
+        ("event loop", loop_free),
+    ]
+    print(
+        f"local server {base}: {pages} pages at {args.delay}s each, "
+        f"{limit} concurrent fetches, {args.timeout}s per-URL timeout"
+    )
+    try:
+        for name, scenario in scenarios:
+            stats.reset()
+            print(f"\n{name}")
+            scenario()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if failures:
+        print(f"\nFAIL: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Throughput of many research topics: one run_workflow per query vs run_workflow_batch.
+
+Usage: python benchmarks/bench_workflow_batch.py [--queries 24] [--concurrency 4] [--latency 0.2]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from src.event_planner.agent import get_refresh_agent  # noqa: E402
+from src.marketing_orchestrator.agent import (  # noqa: E402
+    WorkflowBatch,
+    get_agent,
+    get_batch_agent,
+    run_workflow_async,
+)
+from src.utils.stub_llm import StubLlm, apply_model, canned_responses  # noqa: E402
+
+CANNED = canned_responses(
+    {
+        "research_synthesis_agent": {
+            "trend_briefs": [{"title": "Value bundles", "summary": "Guests trade down."}]
+        },
+        "profile_synthesizer_agent": {
+            "customer_insights": [
+                {"segment_id": "late-night", "description": "Late-night app users."}
+            ]
+        },
+        "event_refresh_agent": {
+            "year": 2026,
+            "high_velocity_events": [{"event_name": "Finals", "date": "2026-06-01"}],
+        },
+        "simplified_offer_design_agent": {
+            "offer_concepts": [
+                {
+                    "title": f"Bundle {rank}",
+                    "priority_rank": rank,
+                    "offer_summary": "Late-night bundle.",
+                    "success_hypothesis": "Bundles lift check size.",
+                }
+                for rank in (1, 2, 3)
+            ]
+        },
+    }
+)
+
+
+async def _per_query(queries: list[str], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(query: str) -> None:
+        async with semaphore:
+            await run_workflow_async(query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(query) for query in queries))
+    return time.perf_counter() - start
+
+
+async def _batched(queries: list[str], concurrency: int) -> WorkflowBatch:
+    batch = WorkflowBatch(queries, max_concurrency=concurrency)
+    async for _ in batch.stream_async():
+        pass
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub model latency (s)")
+    args = parser.parse_args()
+
+    model = StubLlm(latency_s=args.latency, responses=CANNED)
+    for agent in (get_agent(), get_batch_agent(), get_refresh_agent()):
+        apply_model(agent, model)
+    queries = [f"Research topic {index}" for index in range(args.queries)]
+
+    per_query_s = asyncio.run(_per_query(queries, args.concurrency))
+    batch = asyncio.run(_batched(queries, args.concurrency))
+    report = batch.report
+    assert report is not None
+
+    print(f"{args.queries} queries, concurrency {args.concurrency}, stub latency {args.latency}s")
+    print(
+        f"{'run_workflow per query':<26} {per_query_s:6.2f} s "
+        f"({args.queries * 60 / per_query_s:7.1f} queries/min)"
+    )
+    print(
+        f"{'run_workflow_batch':<26} {report.elapsed_s:6.2f} s "
+        f"({report.queries_per_minute:7.1f} queries/min)"
+    )
+    print(report.log)
+
+
+if __name__ == "__main__":
+    main()
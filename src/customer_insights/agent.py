@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from pathlib import Path
 import sys
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-from google.adk.agents import SequentialAgent
+if TYPE_CHECKING:
+    from google.adk.agents import SequentialAgent
 
 # ADK loads apps with /workspace/src on sys.path; add project root so src.* imports resolve.
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -20,17 +21,14 @@ from src.customer_insights.sub_agents.profile_synthesizer.agent import (
 from src.customer_insights.sub_agents.profile_synthesizer.agent import (
     build_agent as build_profile_synthesizer_agent,
 )
-from src.utils.adk_runner import (
-    coerce_list,
-    extract_final_responses,
-    parse_json_payload,
-    run_agent,
-)
+from src.utils.agent_registry import get_or_build_agent, lazy_root_agent
 
 ADK_ROOT_NAME = "customer_insights_manager"
 
 
 def build_agent() -> SequentialAgent:
+    from google.adk.agents import SequentialAgent
+
     return SequentialAgent(
         name=ADK_ROOT_NAME,
         description=CustomerInsightsManagerAgent.description,
@@ -41,6 +39,10 @@ def build_agent() -> SequentialAgent:
     )
 
 
+def get_agent() -> SequentialAgent:
+    return get_or_build_agent(ADK_ROOT_NAME, build_agent)
+
+
 class CustomerInsightsManagerAgent:
     """Sequential agent for customer behavioral analysis and synthesis."""
 
@@ -51,19 +53,25 @@ class CustomerInsightsManagerAgent:
     )
 
     def run(self, query: str, logs: List[str] | None = None) -> List[Dict[str, Any]]:
+        from src.utils.adk_runner import run_sync
+
+        return run_sync(self.run_async(query, logs=logs))
+
+    async def run_async(self, query: str, logs: List[str] | None = None) -> List[Dict[str, Any]]:
+        from src.utils.adk_runner import extract_final_responses, run_agent_async
+        from src.utils.output_schemas import validate_stage_output
+
         if logs is not None:
             logs.append("Customer Insights: Behavioral Analysis Agent running.")
             logs.append("Customer Insights: Profile Synthesizer Agent running.")
 
-        events = run_agent(build_agent(), query)
+        events = await run_agent_async(get_agent(), query)
         outputs = extract_final_responses(events)
 
-        profile_text = outputs.get(PROFILE_SYNTHESIZER_NAME, "")
-        profile_payload = parse_json_payload(profile_text)
-        insights = coerce_list(profile_payload, key="customer_insights")
-        if not insights and profile_payload is None:
-            insights = []
-        return insights
+        # Raises OutputValidationError instead of returning an empty list.
+        return validate_stage_output(
+            "customer_insights", outputs.get(PROFILE_SYNTHESIZER_NAME, "")
+        )
 
 
-root_agent = build_agent()
+__getattr__ = lazy_root_agent(__name__, get_agent)
@@ -1,23 +1,33 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.adk.agents.llm_agent import LlmAgent
-
-from src.customer_insights.sub_agents.behavioral_analysis.tools import (
-    generate_synthetic_behavioral_data,
-)
-from src.utils.adk_agent_factory import build_llm_agent
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import LlmAgent
 
 NAME = "behavioral_analysis_agent"
-DESCRIPTION = "Analyzes structured behavioral data with synthetic metrics."
+DESCRIPTION = "Analyzes structured behavioral data with measured segment metrics."
 
 
 def build_agent() -> LlmAgent:
+    from src.customer_insights.sub_agents.behavioral_analysis.tools import (
+        discover_customer_segments,
+        generate_synthetic_behavioral_data,
+        measure_segment_metrics,
+    )
+    from src.utils.adk_agent_factory import build_llm_agent
+    from src.utils.model_tiers import OutputCheck
+
     instruction_path = Path(__file__).with_name("instruction.txt")
     return build_llm_agent(
         name=NAME,
         description=DESCRIPTION,
         instruction_path=instruction_path,
-        tools=[generate_synthetic_behavioral_data],
+        output_check=OutputCheck("segments", min_items=1, item_fields=("segment_id",)),
+        tools=[
+            measure_segment_metrics,
+            discover_customer_segments,
+            generate_synthetic_behavioral_data,
+        ],
     )
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.customer_insights.sub_agents.behavioral_analysis.transactions import (
+    CHANNELS,
+    DAYPARTS,
+    list_parts,
+    process_pool,
+    read_manifest,
+    read_part,
+)
+
+AGGREGATES_NAME = "_aggregates.npz"
+# Rows pulled from the memory-mapped columns at a time; bounds scan memory per worker.
+BLOCK_ROWS = 1_000_000
+AGGREGATE_COLUMNS = (
+    "segment",
+    "daypart",
+    "channel",
+    "basket_cents",
+    "items",
+    "offer_exposed",
+    "offer_redeemed",
+)
+
+
+@dataclass
+class SegmentAggregates:
+    """Additive per-segment sums; two instances combine with ``merge``."""
+
+    transactions: np.ndarray
+    exposed: np.ndarray
+    redeemed: np.ndarray
+    unexposed: np.ndarray
+    basket_cents: np.ndarray
+    redeemed_basket_cents: np.ndarray
+    unexposed_basket_cents: np.ndarray
+    items: np.ndarray
+    channels: np.ndarray
+    dayparts: np.ndarray
+
+    @classmethod
+    def empty(cls, num_segments: int) -> "SegmentAggregates":
+        return cls(
+            transactions=np.zeros(num_segments, dtype=np.int64),
+            exposed=np.zeros(num_segments, dtype=np.int64),
+            redeemed=np.zeros(num_segments, dtype=np.int64),
+            unexposed=np.zeros(num_segments, dtype=np.int64),
+            basket_cents=np.zeros(num_segments, dtype=np.float64),
+            redeemed_basket_cents=np.zeros(num_segments, dtype=np.float64),
+            unexposed_basket_cents=np.zeros(num_segments, dtype=np.float64),
+            items=np.zeros(num_segments, dtype=np.int64),
+            channels=np.zeros((num_segments, len(CHANNELS)), dtype=np.int64),
+            dayparts=np.zeros((num_segments, len(DAYPARTS)), dtype=np.int64),
+        )
+
+    @property
+    def num_segments(self) -> int:
+        return int(self.transactions.shape[0])
+
+    def add_block(self, columns: Dict[str, np.ndarray]) -> None:
+        """Fold one block of transaction columns into the sums."""
+        k = self.num_segments
+        segment = np.asarray(columns["segment"], dtype=np.int64)
+        exposed = np.asarray(columns["offer_exposed"], dtype=bool)
+        redeemed = np.asarray(columns["offer_redeemed"], dtype=bool)
+        basket = np.asarray(columns["basket_cents"], dtype=np.float64)
+        self.transactions += np.bincount(segment, minlength=k)
+        self.exposed += np.bincount(segment[exposed], minlength=k)
+        self.redeemed += np.bincount(segment[redeemed], minlength=k)
+        self.unexposed += np.bincount(segment[~exposed], minlength=k)
+        self.basket_cents += np.bincount(segment, weights=basket, minlength=k)
+        self.redeemed_basket_cents += np.bincount(
+            segment[redeemed], weights=basket[redeemed], minlength=k
+        )
+        self.unexposed_basket_cents += np.bincount(
+            segment[~exposed], weights=basket[~exposed], minlength=k
+        )
+        self.items += np.bincount(segment, weights=columns["items"], minlength=k).astype(np.int64)
+        self.channels += _pair_counts(segment, columns["channel"], k, len(CHANNELS))
+        self.dayparts += _pair_counts(segment, columns["daypart"], k, len(DAYPARTS))
+
+    def merge(self, other: "SegmentAggregates") -> None:
+        for field in fields(self):
+            getattr(self, field.name).__iadd__(getattr(other, field.name))
+
+    def summaries(
+        self, segment_ids: Sequence[str], descriptions: Sequence[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """Segment metrics in the behavioral analysis output format."""
+        total = max(int(self.transactions.sum()), 1)
+        results = []
+        for index, segment_id in enumerate(segment_ids):
+            count = int(self.transactions[index])
+            if not count:
+                continue
+            redemption_rate = self.redeemed[index] / max(self.exposed[index], 1)
+            redeemed_mean = self.redeemed_basket_cents[index] / max(self.redeemed[index], 1)
+            unexposed_mean = self.unexposed_basket_cents[index] / max(self.unexposed[index], 1)
+            lift = redeemed_mean / unexposed_mean - 1 if unexposed_mean else 0.0
+            top_daypart = DAYPARTS[int(self.dayparts[index].argmax())].replace("_", " ")
+            results.append(
+                {
+                    "segment_id": segment_id,
+                    "segment_description": descriptions[index] if index < len(descriptions) else "",
+                    "empirical_metrics": {
+                        "redemption_rate": f"{redemption_rate * 100:.1f}%",
+                        "lift_estimate": f"{lift * 100:.1f}%",
+                        "segment_size": f"{count / total * 100:.1f}%",
+                        "channel_preference": CHANNELS[int(self.channels[index].argmax())],
+                        "transactions": count,
+                    },
+                    "behavioral_patterns": [
+                        f"Typical visit time: {top_daypart}.",
+                        f"Average order size: ${self.basket_cents[index] / count / 100:.2f}.",
+                        f"Average items per order: {self.items[index] / count:.1f}.",
+                        f"Promotion responsiveness: {_responsiveness(redemption_rate)}.",
+                    ],
+                }
+            )
+        return results
+
+    def save(self, path: Path, parts: Sequence[str]) -> None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        arrays = {field.name: getattr(self, field.name) for field in fields(self)}
+        np.savez(tmp_path, parts=np.array(sorted(parts), dtype=str), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["SegmentAggregates", List[str]]:
+        with np.load(path, allow_pickle=False) as data:
+            aggregates = cls(**{field.name: data[field.name] for field in fields(cls)})
+            return aggregates, [str(name) for name in data["parts"]]
+
+
+def scan_part(part: str | Path, num_segments: int) -> SegmentAggregates:
+    """Aggregate one memory-mapped part block by block."""
+    columns = read_part(part, AGGREGATE_COLUMNS)
+    aggregates = SegmentAggregates.empty(num_segments)
+    rows = columns["segment"].shape[0]
+    for start in range(0, rows, BLOCK_ROWS):
+        aggregates.add_block(
+            {name: values[start : start + BLOCK_ROWS] for name, values in columns.items()}
+        )
+    return aggregates
+
+
+class TransactionAggregator:
+    """Incremental per-segment metrics over a directory of transaction parts.
+
+    Sums for parts already scanned are kept in ``_aggregates.npz`` next to the data,
+    so ``update`` only reads partitions that landed since the last call. New parts
+    are scanned on ``workers`` processes (default: all cores) and merged in.
+    """
+
+    def __init__(self, directory: str | Path, workers: int | None = None) -> None:
+        self.directory = Path(directory)
+        self.workers = workers or os.cpu_count() or 1
+        manifest = read_manifest(self.directory)
+        self.segment_ids: List[str] = list(manifest["segments"])
+        self.descriptions: List[str] = [
+            profile.get("description", "") for profile in manifest.get("profiles", [])
+        ]
+        self._lock = threading.Lock()
+        self.aggregates = SegmentAggregates.empty(len(self.segment_ids))
+        self.parts: set[str] = set()
+        state_path = self.directory / AGGREGATES_NAME
+        if state_path.exists():
+            try:
+                aggregates, parts = SegmentAggregates.load(state_path)
+            except (OSError, ValueError, KeyError):
+                aggregates, parts = None, []
+            if aggregates is not None and aggregates.num_segments == len(self.segment_ids):
+                self.aggregates, self.parts = aggregates, set(parts)
+
+    def update(self) -> List[Path]:
+        """Scan and merge parts not yet aggregated; returns the parts scanned."""
+        with self._lock:
+            new_parts = [part for part in list_parts(self.directory) if part.name not in self.parts]
+            if not new_parts:
+                return []
+            num_segments = len(self.segment_ids)
+            if self.workers > 1 and len(new_parts) > 1:
+                with process_pool(min(self.workers, len(new_parts))) as pool:
+                    scanned = list(pool.map(scan_part, new_parts, [num_segments] * len(new_parts)))
+            else:
+                scanned = [scan_part(part, num_segments) for part in new_parts]
+            for part, aggregates in zip(new_parts, scanned):
+                self.aggregates.merge(aggregates)
+                self.parts.add(part.name)
+            self.aggregates.save(self.directory / AGGREGATES_NAME, self.parts)
+            return new_parts
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.aggregates.summaries(self.segment_ids, self.descriptions)
+
+    @property
+    def transactions(self) -> int:
+        return int(self.aggregates.transactions.sum())
+
+
+_AGGREGATORS: Dict[Path, TransactionAggregator] = {}
+_AGGREGATORS_LOCK = threading.Lock()
+
+
+def get_aggregator(directory: str | Path) -> TransactionAggregator:
+    path = Path(directory).resolve()
+    with _AGGREGATORS_LOCK:
+        aggregator = _AGGREGATORS.get(path)
+        if aggregator is None:
+            aggregator = TransactionAggregator(path)
+            _AGGREGATORS[path] = aggregator
+        return aggregator
+
+
+def _pair_counts(
+    segment: np.ndarray, category: np.ndarray, num_segments: int, num_categories: int
+) -> np.ndarray:
+    codes = segment * num_categories + np.asarray(category, dtype=np.int64)
+    counts = np.bincount(codes, minlength=num_segments * num_categories)
+    return counts.reshape(num_segments, num_categories)
+
+
+def _responsiveness(redemption_rate: float) -> str:
+    if redemption_rate >= 0.3:
+        return "high"
+    if redemption_rate >= 0.2:
+        return "medium"
+    return "growing"
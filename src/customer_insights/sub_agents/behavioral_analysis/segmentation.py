@@ -0,0 +1,512 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.customer_insights.sub_agents.behavioral_analysis.transactions import (
+    CHANNELS,
+    DAYPARTS,
+    list_parts,
+    process_pool,
+    read_manifest,
+    read_part,
+)
+
+# Per-customer running sums, one row per customer id.
+SUM_COLUMNS = (
+    "visits",
+    "basket_cents",
+    "items",
+    "offers_exposed",
+    "offers_redeemed",
+    *(f"daypart_{name}" for name in DAYPARTS),
+    *(f"channel_{name}" for name in CHANNELS),
+)
+FEATURE_NAMES = (
+    *(f"daypart_{name}_share" for name in DAYPARTS),
+    *(f"channel_{name}_share" for name in CHANNELS),
+    "log_visits",
+    "log_order_dollars",
+    "items_per_order",
+    "redemption_rate",
+)
+_VISITS, _BASKET, _ITEMS, _EXPOSED, _REDEEMED = range(5)
+_DAYPARTS = slice(5, 5 + len(DAYPARTS))
+_CHANNELS = slice(_DAYPARTS.stop, _DAYPARTS.stop + len(CHANNELS))
+
+CUSTOMER_SUMS_NAME = "customer_sums.npy"
+CUSTOMER_SUMS_PARTS_NAME = "customer_sums.parts.json"
+SEGMENTATION_DIR_NAME = "segmentation"
+MODEL_NAME = "model.npz"
+LABELS_NAME = "labels.npy"
+
+DEFAULT_NUM_SEGMENTS = 5
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_MAX_ITER = 300
+# Stop once no centroid moves further than this (in standardized units) for
+# ``_PATIENCE`` consecutive mini-batches.
+DEFAULT_TOLERANCE = 1e-3
+_PATIENCE = 10
+# Customers sampled for standardization and k-means++ seeding.
+_INIT_SAMPLE = 20_000
+# Customers labelled per task in the final assignment pass.
+_LABEL_BLOCK = 262_144
+UNASSIGNED = -1
+
+
+def customer_sums_from_columns(
+    columns: Dict[str, np.ndarray], num_customers: int | None = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-customer sums of a block of transactions.
+
+    Returns ``(customer_ids, sums)`` for the customers present in the block, with
+    ``sums`` laid out as ``SUM_COLUMNS``.
+    """
+    customer = np.asarray(columns["customer_id"], dtype=np.int64)
+    size = int(num_customers or (customer.max() + 1 if customer.size else 0))
+    visits = np.bincount(customer, minlength=size)
+    ids = np.flatnonzero(visits)
+    sums = np.empty((ids.size, len(SUM_COLUMNS)), dtype=np.float64)
+    sums[:, _VISITS] = visits[ids]
+    weights = {
+        _BASKET: columns["basket_cents"],
+        _ITEMS: columns["items"],
+        _EXPOSED: columns["offer_exposed"],
+        _REDEEMED: columns["offer_redeemed"],
+    }
+    for column, values in weights.items():
+        sums[:, column] = np.bincount(
+            customer, weights=np.asarray(values, dtype=np.float64), minlength=size
+        )[ids]
+    for name, labels, target in (
+        ("daypart", DAYPARTS, _DAYPARTS),
+        ("channel", CHANNELS, _CHANNELS),
+    ):
+        codes = customer * len(labels) + np.asarray(columns[name], dtype=np.int64)
+        counts = np.bincount(codes, minlength=size * len(labels)).reshape(size, len(labels))
+        sums[:, target] = counts[ids]
+    return ids, sums
+
+
+def customer_features(sums: np.ndarray) -> np.ndarray:
+    """Feature vectors (``FEATURE_NAMES``) from rows of per-customer sums."""
+    sums = np.asarray(sums, dtype=np.float64)
+    visits = np.maximum(sums[:, _VISITS], 1.0)
+    return np.column_stack(
+        (
+            sums[:, _DAYPARTS] / visits[:, None],
+            sums[:, _CHANNELS] / visits[:, None],
+            np.log1p(sums[:, _VISITS]),
+            np.log1p(sums[:, _BASKET] / visits / 100),
+            sums[:, _ITEMS] / visits,
+            sums[:, _REDEEMED] / np.maximum(sums[:, _EXPOSED], 1.0),
+        )
+    ).astype(np.float32)
+
+
+class CustomerSums:
+    """Per-customer sums over a transaction directory, kept in a memory-mapped file.
+
+    Like the segment aggregates, ``update`` only scans parts that are not listed in
+    ``customer_sums.parts.json`` yet; parts are reduced on ``workers`` processes.
+    """
+
+    def __init__(self, directory: str | Path, workers: int | None = None) -> None:
+        self.directory = Path(directory)
+        self.workers = workers or os.cpu_count() or 1
+        self.num_customers = int(read_manifest(self.directory)["num_customers"])
+        self.path = self.directory / CUSTOMER_SUMS_NAME
+        self._parts_path = self.directory / CUSTOMER_SUMS_PARTS_NAME
+        self._lock = threading.Lock()
+
+    def update(self) -> List[Path]:
+        """Fold parts not yet summed into the per-customer file; returns them."""
+        with self._lock:
+            done = set(self._read_parts())
+            sums = self._open(reset=not done)
+            if sums.shape != (self.num_customers, len(SUM_COLUMNS)):
+                done = set()
+                sums = self._open(reset=True)
+            new_parts = [part for part in list_parts(self.directory) if part.name not in done]
+            jobs = [(part, self.num_customers) for part in new_parts]
+            if self.workers > 1 and len(jobs) > 1:
+                with process_pool(min(self.workers, len(jobs))) as pool:
+                    for part, (ids, part_sums) in zip(new_parts, pool.map(_sum_part, jobs)):
+                        sums[ids] += part_sums
+            else:
+                for part, job in zip(new_parts, jobs):
+                    ids, part_sums = _sum_part(job)
+                    sums[ids] += part_sums
+            if new_parts:
+                sums.flush()
+                done.update(part.name for part in new_parts)
+                self._write_parts(sorted(done))
+            return new_parts
+
+    def load(self) -> np.ndarray:
+        """Read-only memory map of the sums, one row per customer id."""
+        return np.load(self.path, mmap_mode="r")
+
+    def _open(self, reset: bool) -> np.memmap:
+        if reset or not self.path.exists():
+            return np.lib.format.open_memmap(
+                self.path,
+                mode="w+",
+                dtype=np.float64,
+                shape=(self.num_customers, len(SUM_COLUMNS)),
+            )
+        return np.load(self.path, mmap_mode="r+")
+
+    def _read_parts(self) -> List[str]:
+        if not self.path.exists() or not self._parts_path.exists():
+            return []
+        try:
+            return list(json.loads(self._parts_path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def _write_parts(self, parts: Sequence[str]) -> None:
+        tmp_path = self._parts_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(list(parts)), encoding="utf-8")
+        os.replace(tmp_path, self._parts_path)
+
+
+@dataclass
+class SegmentModel:
+    """Fitted centroids plus the standardization they were fitted in."""
+
+    centroids: np.ndarray
+    mean: np.ndarray
+    scale: np.ndarray
+    counts: np.ndarray
+
+    @property
+    def num_segments(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def transform(self, sums: np.ndarray) -> np.ndarray:
+        return (customer_features(sums) - self.mean) / self.scale
+
+    def assign(self, sums: np.ndarray) -> np.ndarray:
+        """Nearest centroid of each customer: O(k) per customer, no refitting."""
+        return _nearest(self.transform(sums), self.centroids)[0]
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        arrays = {field.name: getattr(self, field.name) for field in fields(self)}
+        np.savez(tmp_path, feature_names=np.array(FEATURE_NAMES), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SegmentModel":
+        with np.load(path, allow_pickle=False) as data:
+            if tuple(str(name) for name in data["feature_names"]) != FEATURE_NAMES:
+                raise ValueError(f"Segment model {path} was fitted on other features.")
+            return cls(**{field.name: data[field.name] for field in fields(cls)})
+
+
+def fit_segments(
+    sums: np.ndarray,
+    num_segments: int = DEFAULT_NUM_SEGMENTS,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_iter: int = DEFAULT_MAX_ITER,
+    tolerance: float = DEFAULT_TOLERANCE,
+    seed: int = 0,
+) -> SegmentModel:
+    """Mini-batch k-means over per-customer sums (array or memory map).
+
+    Each step reads ``batch_size`` random customers, so memory stays bounded by the
+    batch regardless of how many customers the sums hold. Centroids move towards
+    the batch mean of their members with a per-centroid rate of
+    ``members_in_batch / members_seen``.
+    """
+    rng = np.random.default_rng(seed)
+    active = np.flatnonzero(np.asarray(sums[:, _VISITS]) > 0)
+    if active.size < num_segments:
+        raise ValueError(
+            f"Need at least {num_segments} customers with visits, found {active.size}."
+        )
+    sample = np.sort(rng.choice(active, size=min(active.size, _INIT_SAMPLE), replace=False))
+    sample_features = customer_features(sums[sample])
+    mean = sample_features.mean(axis=0)
+    scale = sample_features.std(axis=0)
+    scale[scale < 1e-6] = 1.0
+    sample_features = (sample_features - mean) / scale
+
+    centroids = _kmeans_plus_plus(sample_features, num_segments, rng)
+    counts = np.zeros(num_segments, dtype=np.int64)
+    stable = 0
+    for _ in range(max_iter):
+        batch = np.sort(rng.choice(active, size=min(batch_size, active.size), replace=False))
+        features = (customer_features(sums[batch]) - mean) / scale
+        labels, _ = _nearest(features, centroids)
+        batch_counts = np.bincount(labels, minlength=num_segments)
+        members = np.zeros((num_segments, features.shape[0]), dtype=np.float32)
+        members[labels, np.arange(features.shape[0])] = 1.0
+        batch_sums = members @ features
+        counts += batch_counts
+        moved = batch_counts > 0
+        rate = batch_counts[moved] / counts[moved]
+        batch_means = batch_sums[moved] / batch_counts[moved, None]
+        previous = centroids.copy()
+        centroids[moved] += rate[:, None] * (batch_means - centroids[moved])
+        shift = float(np.sqrt(((centroids - previous) ** 2).sum(axis=1)).max())
+        stable = stable + 1 if shift < tolerance else 0
+        if stable >= _PATIENCE:
+            break
+    return SegmentModel(centroids=centroids, mean=mean, scale=scale, counts=counts)
+
+
+def label_customers(
+    sums: np.ndarray,
+    model: SegmentModel,
+    *,
+    labels_path: str | Path | None = None,
+    workers: int | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Assign every customer with visits to a segment.
+
+    Returns ``(labels, segment_sums)``: one label per customer id (``UNASSIGNED``
+    without visits) and the ``SUM_COLUMNS`` totals of each segment. Blocks are
+    labelled on ``workers`` processes when ``sums`` is a memory-mapped file; with
+    ``labels_path`` the labels are written to a memory-mapped ``.npy`` file.
+    """
+    num_customers = sums.shape[0]
+    if labels_path is not None:
+        labels = np.lib.format.open_memmap(
+            labels_path, mode="w+", dtype=np.int16, shape=(num_customers,)
+        )
+    else:
+        labels = np.empty(num_customers, dtype=np.int16)
+    segment_sums = np.zeros((model.num_segments, len(SUM_COLUMNS)), dtype=np.float64)
+    bounds = [
+        (start, min(start + _LABEL_BLOCK, num_customers))
+        for start in range(0, num_customers, _LABEL_BLOCK)
+    ]
+    workers = workers or os.cpu_count() or 1
+    filename = getattr(sums, "filename", None)
+    if filename is not None and workers > 1 and len(bounds) > 1:
+        jobs = [(filename, start, stop, model) for start, stop in bounds]
+        with process_pool(min(workers, len(jobs))) as pool:
+            results = list(pool.map(_label_block, jobs))
+    else:
+        results = [_label_rows(sums[start:stop], model) for start, stop in bounds]
+    for (start, stop), (block_labels, block_sums) in zip(bounds, results):
+        labels[start:stop] = block_labels
+        segment_sums += block_sums
+    if isinstance(labels, np.memmap):
+        labels.flush()
+    return labels, segment_sums
+
+
+def summarize_segments(
+    segment_sums: np.ndarray, customers: np.ndarray
+) -> List[Dict[str, Any]]:
+    """Segment summaries in the profile synthesizer's ``customer_insights`` format."""
+    total_customers = max(int(customers.sum()), 1)
+    overall = segment_sums.sum(axis=0)
+    baseline = _segment_rates(overall, total_customers)
+    summaries = []
+    used_ids: Dict[str, int] = {}
+    for index in np.argsort(-customers):
+        count = int(customers[index])
+        if not count:
+            continue
+        row = segment_sums[index]
+        rates = _segment_rates(row, count)
+        redemption_rate, order_dollars, items_per_order, visits_per_customer = rates
+        daypart_shares = row[_DAYPARTS] / max(row[_VISITS], 1.0)
+        channel = CHANNELS[int(row[_CHANNELS].argmax())]
+        daypart = DAYPARTS[int(daypart_shares.argmax())]
+        traits = _traits(rates, baseline)
+
+        segment_id = f"{daypart.replace('_', '-')}-{channel}-{traits[0]}"
+        used_ids[segment_id] = used_ids.get(segment_id, 0) + 1
+        if used_ids[segment_id] > 1:
+            segment_id = f"{segment_id}-{used_ids[segment_id]}"
+        mechanics, phrases = _messaging(daypart, channel, traits)
+        summaries.append(
+            {
+                "segment_id": segment_id,
+                "description": (
+                    f"{' and '.join(traits).replace('-', ' ').capitalize()} customers who "
+                    f"order mostly at {daypart.replace('_', ' ')} "
+                    f"({daypart_shares.max() * 100:.0f}% of visits) via {channel}, "
+                    f"spending ${order_dollars:.2f} per order."
+                ),
+                "preferred_mechanics": mechanics,
+                "key_messaging_phrases": phrases,
+                "empirical_metrics": {
+                    "redemption_rate": f"{redemption_rate * 100:.1f}%",
+                    "segment_size": f"{count / total_customers * 100:.1f}%",
+                    "channel_preference": channel,
+                    "average_order_value": f"${order_dollars:.2f}",
+                    "items_per_order": round(float(items_per_order), 1),
+                    "visits_per_customer": round(float(visits_per_customer), 1),
+                    "customers": count,
+                },
+            }
+        )
+    return summaries
+
+
+class CustomerSegmentation:
+    """Discovered segments for a transaction directory.
+
+    Sums, centroids and labels live under the directory, so a later ``assign`` of
+    new customers reuses the persisted centroids instead of refitting.
+    """
+
+    def __init__(self, directory: str | Path, workers: int | None = None) -> None:
+        self.directory = Path(directory)
+        self.workers = workers
+        self.sums = CustomerSums(self.directory, workers=workers)
+        self.model_path = self.directory / SEGMENTATION_DIR_NAME / MODEL_NAME
+        self.labels_path = self.directory / SEGMENTATION_DIR_NAME / LABELS_NAME
+
+    def fit(
+        self, num_segments: int = DEFAULT_NUM_SEGMENTS, *, seed: int = 0, refit: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Update the sums, fit (or reuse) centroids, label customers and summarize."""
+        self.sums.update()
+        sums = self.sums.load()
+        model = self.load_model()
+        if refit or model is None or model.num_segments != num_segments:
+            model = fit_segments(sums, num_segments, seed=seed)
+            model.save(self.model_path)
+        labels, segment_sums = label_customers(
+            sums, model, labels_path=self.labels_path, workers=self.workers
+        )
+        customers = np.bincount(labels[labels >= 0], minlength=model.num_segments)
+        return summarize_segments(segment_sums, customers)
+
+    def load_model(self) -> SegmentModel | None:
+        if not self.model_path.exists():
+            return None
+        try:
+            return SegmentModel.load(self.model_path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def assign(self, sums: np.ndarray) -> np.ndarray:
+        """Segment of new customers' sums rows using the persisted centroids."""
+        model = self.load_model()
+        if model is None:
+            raise ValueError(f"No segment model under {self.model_path.parent}; call fit first.")
+        return model.assign(np.atleast_2d(sums))
+
+
+def _sum_part(job: Tuple[Path, int]) -> Tuple[np.ndarray, np.ndarray]:
+    part, num_customers = job
+    columns = read_part(
+        part,
+        ("customer_id", "daypart", "channel", "basket_cents", "items", "offer_exposed", "offer_redeemed"),
+    )
+    return customer_sums_from_columns(columns, num_customers)
+
+
+def _label_block(job: Tuple[str, int, int, SegmentModel]) -> Tuple[np.ndarray, np.ndarray]:
+    filename, start, stop, model = job
+    return _label_rows(np.load(filename, mmap_mode="r")[start:stop], model)
+
+
+def _label_rows(rows: np.ndarray, model: SegmentModel) -> Tuple[np.ndarray, np.ndarray]:
+    rows = np.asarray(rows, dtype=np.float64)
+    labels = np.full(rows.shape[0], UNASSIGNED, dtype=np.int16)
+    active = rows[:, _VISITS] > 0
+    labels[active] = model.assign(rows[active])
+    segment_sums = np.zeros((model.num_segments, rows.shape[1]), dtype=np.float64)
+    members = np.zeros((model.num_segments, int(active.sum())), dtype=np.float64)
+    members[labels[active], np.arange(members.shape[1])] = 1.0
+    segment_sums += members @ rows[active]
+    return labels, segment_sums
+
+
+def _nearest(features: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    distances = (
+        (features**2).sum(axis=1)[:, None]
+        - 2 * features @ centroids.T
+        + (centroids**2).sum(axis=1)[None, :]
+    )
+    labels = distances.argmin(axis=1)
+    return labels, distances[np.arange(labels.size), labels]
+
+
+def _kmeans_plus_plus(
+    features: np.ndarray, num_segments: int, rng: np.random.Generator
+) -> np.ndarray:
+    centroids = [features[rng.integers(features.shape[0])]]
+    closest = ((features - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, num_segments):
+        probabilities = closest / closest.sum() if closest.sum() > 0 else None
+        centroids.append(features[rng.choice(features.shape[0], p=probabilities)])
+        closest = np.minimum(closest, ((features - centroids[-1]) ** 2).sum(axis=1))
+    return np.array(centroids, dtype=np.float32)
+
+
+def _segment_rates(row: np.ndarray, customers: int) -> Tuple[float, float, float, float]:
+    """Redemption rate, dollars and items per order, and visits per customer."""
+    visits = max(float(row[_VISITS]), 1.0)
+    return (
+        float(row[_REDEEMED] / max(row[_EXPOSED], 1.0)),
+        float(row[_BASKET] / visits / 100),
+        float(row[_ITEMS] / visits),
+        float(row[_VISITS] / max(customers, 1)),
+    )
+
+
+def _traits(
+    rates: Tuple[float, float, float, float], baseline: Tuple[float, float, float, float]
+) -> List[str]:
+    # Traits are relative to the whole customer base, so they hold for any date range.
+    redemption_rate, order_dollars, items_per_order, visits = rates
+    base_redemption, base_dollars, base_items, base_visits = baseline
+    traits = []
+    if redemption_rate >= 1.1 * base_redemption:
+        traits.append("deal-seeker")
+    if items_per_order >= 1.25 * base_items or order_dollars >= 1.4 * base_dollars:
+        traits.append("bundle-buyer")
+    if visits >= 1.5 * base_visits:
+        traits.append("regular")
+    if not traits:
+        traits.append("value-buyer" if order_dollars < base_dollars else "occasional")
+    return traits
+
+
+def _messaging(daypart: str, channel: str, traits: Sequence[str]) -> Tuple[List[str], List[str]]:
+    mechanics = []
+    phrases = []
+    if "deal-seeker" in traits:
+        mechanics.append("percentage discounts")
+        phrases.append("Save more every visit")
+    if "bundle-buyer" in traits:
+        mechanics.append("bundles")
+        phrases.append("Enough for everyone")
+    if "regular" in traits:
+        mechanics.append("loyalty points")
+        phrases.append("Your usual, now rewarded")
+    if channel == "app":
+        mechanics.append("app-exclusive deals")
+        phrases.append("Only in the app")
+    elif channel == "delivery":
+        mechanics.append("free delivery")
+        phrases.append("Delivered to your door")
+    if daypart == "late_night":
+        mechanics.append("late-night limited-time offers")
+        phrases.append("Open late for your cravings")
+    elif daypart in ("breakfast", "lunch"):
+        mechanics.append(f"{daypart} combos")
+        phrases.append(f"Your {daypart} sorted")
+    if not mechanics:
+        mechanics.append("value menu")
+        phrases.append("Great taste, great price")
+    return mechanics, phrases
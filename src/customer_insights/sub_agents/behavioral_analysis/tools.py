@@ -1,49 +1,122 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from pathlib import Path
 import random
 from typing import Any, Dict, List
 
 from faker import Faker
+import numpy as np
+
+from src.customer_insights.sub_agents.behavioral_analysis.aggregation import (
+    SegmentAggregates,
+    get_aggregator,
+)
+from src.customer_insights.sub_agents.behavioral_analysis.segmentation import (
+    CustomerSegmentation,
+    customer_sums_from_columns,
+    fit_segments,
+    label_customers,
+    summarize_segments,
+)
+from src.customer_insights.sub_agents.behavioral_analysis.transactions import (
+    DEFAULT_PROFILES,
+    generate_chunk,
+    list_parts,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+
+TRANSACTIONS_DIR_ENV_VAR = "TRANSACTIONS_DIR"
+DEFAULT_TRANSACTIONS_DIR = PROJECT_ROOT / ".cache" / "transactions"
+
+SAMPLE_TRANSACTIONS = 200_000
+SAMPLE_CUSTOMERS = 50_000
+
+_FAKER = Faker()
+
+
+async def measure_segment_metrics() -> Dict[str, Any]:
+    """Measure per-segment metrics from the transaction files.
+
+    Partitions that landed since the previous call are scanned and folded into the
+    stored aggregates; older ones are not read again. Without transaction files
+    the metrics come from a synthetic sample instead.
+    """
+    # Scans wait on worker processes; keep the event loop serving other agents.
+    return await asyncio.to_thread(_measure_segment_metrics)
+
+
+def _measure_segment_metrics() -> Dict[str, Any]:
+    directory = _transactions_dir()
+    if not list_parts(directory):
+        return {"source": "synthetic_sample", "segments": generate_synthetic_behavioral_data()}
+    aggregator = get_aggregator(directory)
+    new_parts = aggregator.update()
+    return {
+        "source": "transactions",
+        "transactions": aggregator.transactions,
+        "partitions": len(aggregator.parts),
+        "new_partitions": len(new_parts),
+        "segments": aggregator.summaries(),
+    }
+
+
+async def discover_customer_segments(num_segments: int = 5) -> Dict[str, Any]:
+    """Discover customer segments by clustering per-customer behaviour.
+
+    Returns ``customer_insights`` entries (segment_id, description,
+    preferred_mechanics, key_messaging_phrases, empirical_metrics). Centroids are
+    persisted with the transaction files and reused until ``num_segments`` changes.
+    """
+    # Summing, fitting and labelling run for seconds; keep the event loop free.
+    return await asyncio.to_thread(_discover_customer_segments, num_segments)
+
+
+def _discover_customer_segments(num_segments: int) -> Dict[str, Any]:
+    num_segments = max(2, min(int(num_segments), 12))
+    directory = _transactions_dir()
+    if list_parts(directory):
+        segmentation = CustomerSegmentation(directory)
+        return {"source": "transactions", "customer_insights": segmentation.fit(num_segments)}
+
+    chunk = generate_chunk(SAMPLE_TRANSACTIONS, 0, num_customers=SAMPLE_CUSTOMERS)
+    _, sums = customer_sums_from_columns(chunk, SAMPLE_CUSTOMERS)
+    model = fit_segments(sums, num_segments)
+    labels, segment_sums = label_customers(sums, model)
+    customers = np.bincount(labels[labels >= 0], minlength=num_segments)
+    return {
+        "source": "synthetic_sample",
+        "customer_insights": summarize_segments(segment_sums, customers),
+    }
 
 
 def generate_synthetic_behavioral_data(
     num_segments: int = 3, seed: int | None = None
 ) -> List[Dict[str, Any]]:
-    fake = Faker()
-    if seed is not None:
-        Faker.seed(seed)
-        random.seed(seed)
-
-    segments = []
-    segment_templates = [
-        ("value-driven-lunch-buyer", "Lunch buyers seeking value during weekdays."),
-        ("late-night-craver", "Late night snackers focused on craveable items."),
-        ("family-bundle-planner", "Family buyers preferring bundled meals."),
-    ]
-
-    for i in range(num_segments):
-        segment_id, description = segment_templates[i % len(segment_templates)]
-        segments.append(
-            {
-                "segment_id": segment_id,
-                "segment_description": description,
-                "empirical_metrics": {
-                    "redemption_rate": f"{round(random.uniform(1.6, 2.8), 1)}x",
-                    "lift_estimate": f"{round(random.uniform(8, 22), 1)}%",
-                    "segment_size": f"{random.randint(8, 25)}%",
-                    "channel_preference": random.choice(
-                        ["app", "drive-thru", "delivery", "in-store"]
-                    ),
-                },
-                "behavioral_patterns": [
-                    f"Typical visit time: {random.choice(['weekday lunch', 'late night', 'weekend'])}.",
-                    f"Average order size: ${random.randint(8, 18)}.",
-                    f"Promotion responsiveness: {random.choice(['high', 'medium', 'growing'])}.",
-                ],
-                "sample_customer": {
-                    "name": fake.first_name(),
-                    "city": fake.city(),
-                },
-            }
-        )
+    """Summarize segments from a sample of synthetic transactions.
+
+    The metrics are measured on ``SAMPLE_TRANSACTIONS`` rows drawn by the vectorized
+    transaction generator rather than picked at random.
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    _FAKER.seed_instance(seed)
+    profiles = DEFAULT_PROFILES[: max(1, min(num_segments, len(DEFAULT_PROFILES)))]
+    chunk = generate_chunk(
+        SAMPLE_TRANSACTIONS, seed, num_customers=SAMPLE_CUSTOMERS, profiles=profiles
+    )
+    aggregates = SegmentAggregates.empty(len(profiles))
+    aggregates.add_block(chunk)
+    segments = aggregates.summaries(
+        [profile.segment_id for profile in profiles],
+        [profile.description for profile in profiles],
+    )
+    for segment in segments:
+        segment["sample_customer"] = {"name": _FAKER.first_name(), "city": _FAKER.city()}
     return segments
+
+
+def _transactions_dir() -> Path:
+    return Path(os.getenv(TRANSACTIONS_DIR_ENV_VAR) or DEFAULT_TRANSACTIONS_DIR)
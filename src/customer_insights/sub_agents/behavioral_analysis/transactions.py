@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+import json
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+DAYPARTS = ("breakfast", "lunch", "afternoon", "dinner", "late_night")
+# Start hour and length (hours) of each daypart; late night runs past midnight.
+DAYPART_WINDOWS = ((6, 4), (10, 4), (14, 3), (17, 4), (21, 5))
+CHANNELS = ("app", "drive-thru", "delivery", "in-store")
+
+COLUMNS: Dict[str, str] = {
+    "customer_id": "uint32",
+    "segment": "uint8",
+    "timestamp": "int64",
+    "daypart": "uint8",
+    "channel": "uint8",
+    "basket_cents": "uint32",
+    "items": "uint8",
+    "offer_exposed": "bool",
+    "offer_redeemed": "bool",
+}
+MANIFEST_NAME = "manifest.json"
+PART_PREFIX = "part-"
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_NUM_CUSTOMERS = 2_000_000
+DEFAULT_START_DATE = date(2026, 1, 1)
+AVERAGE_ITEM_CENTS = 450
+
+
+@dataclass(frozen=True)
+class SegmentProfile:
+    """Ground-truth behaviour the generator samples one customer segment from."""
+
+    segment_id: str
+    description: str
+    share: float
+    daypart_probs: Tuple[float, ...]
+    channel_probs: Tuple[float, ...]
+    basket_median_cents: int
+    basket_sigma: float
+    visits_per_week: float
+    offer_exposure_rate: float
+    offer_redemption_rate: float
+    redemption_basket_lift: float
+
+
+DEFAULT_PROFILES: Tuple[SegmentProfile, ...] = (
+    SegmentProfile(
+        segment_id="value-driven-lunch-buyer",
+        description="Lunch buyers seeking value during weekdays.",
+        share=0.45,
+        daypart_probs=(0.08, 0.62, 0.14, 0.12, 0.04),
+        channel_probs=(0.38, 0.34, 0.08, 0.20),
+        basket_median_cents=1050,
+        basket_sigma=0.35,
+        visits_per_week=2.4,
+        offer_exposure_rate=0.55,
+        offer_redemption_rate=0.31,
+        redemption_basket_lift=0.12,
+    ),
+    SegmentProfile(
+        segment_id="late-night-craver",
+        description="Late night snackers focused on craveable items.",
+        share=0.30,
+        daypart_probs=(0.02, 0.10, 0.10, 0.23, 0.55),
+        channel_probs=(0.30, 0.36, 0.26, 0.08),
+        basket_median_cents=1250,
+        basket_sigma=0.40,
+        visits_per_week=1.8,
+        offer_exposure_rate=0.45,
+        offer_redemption_rate=0.24,
+        redemption_basket_lift=0.18,
+    ),
+    SegmentProfile(
+        segment_id="family-bundle-planner",
+        description="Family buyers preferring bundled meals.",
+        share=0.25,
+        daypart_probs=(0.05, 0.18, 0.12, 0.58, 0.07),
+        channel_probs=(0.28, 0.30, 0.22, 0.20),
+        basket_median_cents=2850,
+        basket_sigma=0.30,
+        visits_per_week=1.1,
+        offer_exposure_rate=0.60,
+        offer_redemption_rate=0.36,
+        redemption_basket_lift=0.09,
+    ),
+)
+
+
+def customer_segments(
+    num_customers: int,
+    seed: int,
+    profiles: Sequence[SegmentProfile] = DEFAULT_PROFILES,
+) -> np.ndarray:
+    """Segment index of every customer, fixed by ``seed`` and the profile shares.
+
+    Shares are weighted by visit frequency so each profile's ``share`` is its share
+    of transactions rather than of customers.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+    weights = np.array([profile.share / profile.visits_per_week for profile in profiles])
+    return rng.choice(len(profiles), size=num_customers, p=weights / weights.sum()).astype(
+        np.uint8
+    )
+
+
+def index_segments(
+    segments_by_customer: np.ndarray, num_segments: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """``(customer ids grouped by segment, customers per segment)`` for ``generate_chunk``."""
+    by_segment = np.argsort(segments_by_customer, kind="stable").astype(np.uint32)
+    return by_segment, np.bincount(segments_by_customer, minlength=num_segments)
+
+
+def generate_chunk(
+    rows: int,
+    seed: int,
+    chunk_index: int = 0,
+    *,
+    num_customers: int = DEFAULT_NUM_CUSTOMERS,
+    start_date: date = DEFAULT_START_DATE,
+    days: int = 365,
+    profiles: Sequence[SegmentProfile] = DEFAULT_PROFILES,
+    segments_by_customer: np.ndarray | None = None,
+    segment_index: Tuple[np.ndarray, np.ndarray] | None = None,
+) -> Dict[str, np.ndarray]:
+    """Sample ``rows`` transactions as a dict of column arrays.
+
+    Every column is drawn with vectorized NumPy sampling from a generator seeded by
+    ``(seed, chunk_index)``, so chunks are reproducible and can be produced in any
+    order or in parallel. Pass ``segment_index`` (from ``index_segments``) when
+    generating many chunks for the same customers.
+    """
+    if segment_index is None:
+        if segments_by_customer is None:
+            segments_by_customer = customer_segments(num_customers, seed, profiles)
+        segment_index = index_segments(segments_by_customer, len(profiles))
+    by_segment, counts = segment_index
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 1, chunk_index]))
+
+    # Pick each row's segment by transaction share, then a customer uniformly from
+    # that segment: customers grouped by segment are ``by_segment[offsets[s]:...]``.
+    shares = np.array([profile.share for profile in profiles])
+    segment = rng.choice(len(profiles), size=rows, p=shares / shares.sum()).astype(np.uint8)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    picks = (rng.random(rows) * counts[segment]).astype(np.int64)
+    customer_id = by_segment[offsets[segment] + picks]
+
+    daypart = _sample_categorical(
+        rng, segment, np.array([profile.daypart_probs for profile in profiles])
+    )
+    channel = _sample_categorical(
+        rng, segment, np.array([profile.channel_probs for profile in profiles])
+    )
+
+    window_start = np.array([start for start, _ in DAYPART_WINDOWS], dtype=np.int64) * 3600
+    window_length = np.array([length for _, length in DAYPART_WINDOWS], dtype=np.int64) * 3600
+    epoch = int(
+        datetime(start_date.year, start_date.month, start_date.day, tzinfo=timezone.utc).timestamp()
+    )
+    day = rng.integers(0, days, size=rows, dtype=np.int64)
+    offset = (rng.random(rows) * window_length[daypart]).astype(np.int64)
+    timestamp = epoch + day * 86400 + window_start[daypart] + offset
+
+    medians = np.log([profile.basket_median_cents for profile in profiles])
+    sigmas = np.array([profile.basket_sigma for profile in profiles])
+    basket = np.exp(medians[segment] + sigmas[segment] * rng.standard_normal(rows))
+
+    exposure = np.array([profile.offer_exposure_rate for profile in profiles])
+    redemption = np.array([profile.offer_redemption_rate for profile in profiles])
+    lift = np.array([profile.redemption_basket_lift for profile in profiles])
+    offer_exposed = rng.random(rows) < exposure[segment]
+    offer_redeemed = offer_exposed & (rng.random(rows) < redemption[segment])
+    basket = np.where(offer_redeemed, basket * (1.0 + lift[segment]), basket)
+
+    basket_cents = np.clip(basket, 100, 50_000).astype(np.uint32)
+    items = np.clip(np.rint(basket_cents / AVERAGE_ITEM_CENTS), 1, 40).astype(np.uint8)
+    return {
+        "customer_id": customer_id,
+        "segment": segment,
+        "timestamp": timestamp,
+        "daypart": daypart,
+        "channel": channel,
+        "basket_cents": basket_cents,
+        "items": items,
+        "offer_exposed": offer_exposed,
+        "offer_redeemed": offer_redeemed,
+    }
+
+
+def write_transactions(
+    directory: str | Path,
+    num_rows: int,
+    *,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    num_customers: int = DEFAULT_NUM_CUSTOMERS,
+    start_date: date = DEFAULT_START_DATE,
+    days: int = 365,
+    profiles: Sequence[SegmentProfile] = DEFAULT_PROFILES,
+    workers: int | None = None,
+) -> List[Path]:
+    """Write ``num_rows`` synthetic transactions as chunked columnar ``.npy`` files.
+
+    Each chunk becomes ``part-NNNNN/<column>.npy`` (load with ``read_part`` or
+    ``np.load(..., mmap_mode="r")``) and ``manifest.json`` records the schema, the
+    category labels and the segment profiles. Chunks are generated on ``workers``
+    processes (default: all cores). Returns the part directories.
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    chunk_sizes = [
+        min(chunk_rows, num_rows - start) for start in range(0, num_rows, chunk_rows)
+    ]
+    # Continue after the highest index on disk, counting parts a crash left unfinished.
+    first_index = 1 + max(
+        (
+            int(path.name[len(PART_PREFIX):])
+            for path in root.iterdir()
+            if path.name.startswith(PART_PREFIX) and path.name[len(PART_PREFIX):].isdigit()
+        ),
+        default=-1,
+    )
+    jobs = [
+        (
+            root / f"{PART_PREFIX}{first_index + index:05d}",
+            rows,
+            seed,
+            first_index + index,
+            num_customers,
+            start_date,
+            days,
+            tuple(profiles),
+        )
+        for index, rows in enumerate(chunk_sizes)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with process_pool(min(workers, len(jobs))) as pool:
+            parts = list(pool.map(_write_part, jobs))
+    else:
+        parts = [_write_part(job) for job in jobs]
+    _write_manifest(root, profiles, seed, num_customers)
+    return parts
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Worker processes for the behavioral analysis scans, started with ``spawn``.
+
+    Callers run inside a threaded process (event loops, the LLM governor, tool
+    threads); a forked worker would inherit locks those threads held at fork time.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def list_parts(directory: str | Path) -> List[Path]:
+    """Completed part directories under ``directory`` in write order."""
+    root = Path(directory)
+    if not root.exists():
+        return []
+    return sorted(
+        path
+        for path in root.iterdir()
+        if path.is_dir() and path.name.startswith(PART_PREFIX) and (path / "_SUCCESS").exists()
+    )
+
+
+def read_part(part: str | Path, columns: Sequence[str] | None = None) -> Dict[str, np.ndarray]:
+    """Memory-map the columns of one part; nothing is read until the arrays are used."""
+    part_path = Path(part)
+    return {
+        column: np.load(part_path / f"{column}.npy", mmap_mode="r")
+        for column in (columns or COLUMNS)
+    }
+
+
+def iter_parts(
+    directory: str | Path, columns: Sequence[str] | None = None
+) -> Iterator[Tuple[Path, Dict[str, np.ndarray]]]:
+    for part in list_parts(directory):
+        yield part, read_part(part, columns)
+
+
+def read_manifest(directory: str | Path) -> Dict[str, object]:
+    return json.loads((Path(directory) / MANIFEST_NAME).read_text(encoding="utf-8"))
+
+
+def _sample_categorical(
+    rng: np.random.Generator, groups: np.ndarray, probabilities: np.ndarray
+) -> np.ndarray:
+    """Draw one category per row from the probability row of its group.
+
+    Group ``g``'s cumulative distribution is shifted into ``[g, g + 1)`` so a single
+    ``searchsorted`` over the flattened table samples every row at once.
+    """
+    num_groups, num_categories = probabilities.shape
+    cumulative = np.cumsum(probabilities, axis=1)
+    cumulative /= cumulative[:, -1:]
+    table = (np.arange(num_groups)[:, None] + cumulative).ravel()
+    offsets = groups.astype(np.int64)
+    positions = np.searchsorted(table, offsets + rng.random(groups.shape[0]), side="right")
+    return np.minimum(positions - offsets * num_categories, num_categories - 1).astype(np.uint8)
+
+
+def _write_part(job: tuple) -> Path:
+    part, rows, seed, chunk_index, num_customers, start_date, days, profiles = job
+    segment_index = _cached_segment_index(num_customers, seed, profiles)
+    chunk = generate_chunk(
+        rows,
+        seed,
+        chunk_index,
+        num_customers=num_customers,
+        start_date=start_date,
+        days=days,
+        profiles=profiles,
+        segment_index=segment_index,
+    )
+    part.mkdir(parents=True, exist_ok=True)
+    for column, values in chunk.items():
+        np.save(part / f"{column}.npy", values, allow_pickle=False)
+    # Readers only pick up parts that were written completely.
+    (part / "_SUCCESS").touch()
+    return part
+
+
+_SEGMENTS_CACHE: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _cached_segment_index(
+    num_customers: int, seed: int, profiles: Tuple[SegmentProfile, ...]
+) -> Tuple[np.ndarray, np.ndarray]:
+    # One worker writes many chunks for the same customers; sort them once.
+    key = (num_customers, seed, profiles)
+    if key not in _SEGMENTS_CACHE:
+        _SEGMENTS_CACHE.clear()
+        _SEGMENTS_CACHE[key] = index_segments(
+            customer_segments(num_customers, seed, profiles), len(profiles)
+        )
+    return _SEGMENTS_CACHE[key]
+
+
+def _write_manifest(
+    root: Path, profiles: Sequence[SegmentProfile], seed: int, num_customers: int
+) -> None:
+    manifest = {
+        "columns": COLUMNS,
+        "dayparts": list(DAYPARTS),
+        "channels": list(CHANNELS),
+        "segments": [profile.segment_id for profile in profiles],
+        "profiles": [asdict(profile) for profile in profiles],
+        "seed": seed,
+        "num_customers": num_customers,
+    }
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.adk.agents.llm_agent import LlmAgent
-
-from src.utils.adk_agent_factory import build_llm_agent
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import LlmAgent
 
 NAME = "profile_synthesizer_agent"
 DESCRIPTION = "Creates narrative customer insights from behavioral metrics."
 
 
 def build_agent() -> LlmAgent:
+    from src.utils.adk_agent_factory import build_llm_agent
+    from src.utils.output_schemas import CustomerInsights
+
     instruction_path = Path(__file__).with_name("instruction.txt")
     return build_llm_agent(
         name=NAME,
         description=DESCRIPTION,
         instruction_path=instruction_path,
+        output_schema=CustomerInsights,
     )
@@ -1,39 +1,161 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+from datetime import date
+import os
 from pathlib import Path
 import sys
-from typing import Any, Dict, List
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
-from google.adk.agents import SequentialAgent
-from google.adk.agents.llm_agent import LlmAgent
+if TYPE_CHECKING:
+    from google.adk.agents import SequentialAgent
+    from google.adk.agents.llm_agent import LlmAgent
+
+    from src.event_planner.calendar_agent import EventCalendarAgent
 
 # ADK loads apps with /workspace/src on sys.path; add project root so src.* imports resolve.
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.utils.adk_agent_factory import build_llm_agent
-from src.utils.adk_runner import (
-    coerce_dict,
-    extract_final_responses,
-    parse_json_payload,
-    run_agent,
-)
+from src.event_planner.event_store import EventStore, get_event_store
+from src.utils.agent_registry import get_or_build_agent, lazy_root_agent
 
 ADK_ROOT_NAME = "event_planner"
 AGENT_NAME = "event_planner_agent"
+REFRESH_AGENT_NAME = "event_refresh_agent"
+REFRESH_BACKOFF_ENV_VAR = "EVENT_REFRESH_BACKOFF_S"
+DEFAULT_REFRESH_BACKOFF_S = 900.0
+
+# Refreshes in flight per store file; futures are loop-agnostic so callers on any
+# event loop (UI, service, ``run_sync``) can wait for one.
+_REFRESHES: Dict[Path, "concurrent.futures.Future[List[str]]"] = {}
+_REFRESHES_LOCK = threading.Lock()
+# Last failed refresh per store file: (monotonic time, error). Until the backoff has
+# passed, callers get the same error instead of repeating a failing model call.
+_FAILED_REFRESHES: Dict[Path, Tuple[float, Exception]] = {}
 
 
-def build_event_planner_agent() -> LlmAgent:
+def build_event_refresh_agent() -> LlmAgent:
+    from src.utils.adk_agent_factory import build_llm_agent
+    from src.utils.output_schemas import EventCalendar
+
     instruction_path = Path(__file__).with_name("instruction.txt")
     return build_llm_agent(
-        name=AGENT_NAME,
+        name=REFRESH_AGENT_NAME,
         description=EventManager.description,
         instruction_path=instruction_path,
+        output_schema=EventCalendar,
     )
 
 
+def get_refresh_agent() -> LlmAgent:
+    return get_or_build_agent(REFRESH_AGENT_NAME, build_event_refresh_agent)
+
+
+async def refresh_event_store(store: EventStore | None = None) -> List[str]:
+    """Ask the model to fill in events that are missing or stale; returns their names.
+
+    With an empty store the whole calendar is generated; otherwise only the stale
+    entries are requested and merged back into the store file. Concurrent callers
+    share one refresh: the first runs it and the rest wait for its result. After a
+    failure the error is raised again without a model call for
+    ``EVENT_REFRESH_BACKOFF_S`` (default 15 minutes).
+    """
+    store = store or get_event_store()
+    with _REFRESHES_LOCK:
+        running = _REFRESHES.get(store.path)
+        if running is None:
+            if not store.needs_refresh():
+                return []
+            failed = _FAILED_REFRESHES.get(store.path)
+            if failed is not None and time.monotonic() - failed[0] < _refresh_backoff_s():
+                raise failed[1]
+            running = _REFRESHES[store.path] = concurrent.futures.Future()
+            # A running future cannot be cancelled by one of the callers waiting on it.
+            running.set_running_or_notify_cancel()
+            leader = True
+        else:
+            leader = False
+    if not leader:
+        return await asyncio.wrap_future(running)
+    try:
+        stale = await _refresh(store)
+    except BaseException as error:
+        if not isinstance(error, Exception):
+            error = RuntimeError("event refresh was cancelled")
+        else:
+            with _REFRESHES_LOCK:
+                _FAILED_REFRESHES[store.path] = (time.monotonic(), error)
+        running.set_exception(error)
+        raise
+    else:
+        with _REFRESHES_LOCK:
+            _FAILED_REFRESHES.pop(store.path, None)
+        running.set_result(stale)
+    finally:
+        with _REFRESHES_LOCK:
+            _REFRESHES.pop(store.path, None)
+    return stale
+
+
+def _refresh_backoff_s() -> float:
+    try:
+        return float(os.getenv(REFRESH_BACKOFF_ENV_VAR, DEFAULT_REFRESH_BACKOFF_S))
+    except ValueError:
+        return DEFAULT_REFRESH_BACKOFF_S
+
+
+async def _refresh(store: EventStore) -> List[str]:
+    from src.utils.adk_runner import extract_final_responses, run_agent_async
+    from src.utils.output_schemas import validate_stage_output
+
+    stale = store.needs_refresh()
+    if not stale:
+        return []
+    if stale == ["*"]:
+        prompt = "Compile the 2026 high-velocity event calendar."
+    else:
+        prompt = "Refresh these 2026 events: " + "; ".join(stale) + "."
+    events = await run_agent_async(get_refresh_agent(), prompt)
+    text = extract_final_responses(events).get(REFRESH_AGENT_NAME, "")
+    calendar = validate_stage_output("event_calendar", text)
+    store.upsert(calendar["high_velocity_events"], checked=stale)
+    return stale
+
+
+async def load_event_calendar(logs: List[str] | None = None) -> Dict[str, Any]:
+    """The 2026 calendar from the local store, refreshing stale entries first.
+
+    A failed refresh still serves the stored entries; it only raises when the store
+    has nothing to serve.
+    """
+    store = get_event_store()
+    try:
+        refreshed = await refresh_event_store(store)
+    except Exception as error:
+        if store.needs_refresh() == ["*"]:
+            raise
+        if logs is not None:
+            logs.append(f"Event Planner: refresh failed, serving stored events ({error}).")
+        refreshed = []
+    if logs is not None and refreshed:
+        logs.append(f"Event Planner: refreshed {len(refreshed)} event(s) with the model.")
+    return store.calendar()
+
+
+def build_event_planner_agent() -> EventCalendarAgent:
+    from src.event_planner.calendar_agent import EventCalendarAgent
+
+    return EventCalendarAgent(name=AGENT_NAME, description=EventManager.description)
+
+
 def build_agent() -> SequentialAgent:
+    from google.adk.agents import SequentialAgent
+
     return SequentialAgent(
         name=ADK_ROOT_NAME,
         description=EventManager.description,
@@ -41,8 +163,12 @@ def build_agent() -> SequentialAgent:
     )
 
 
+def get_agent() -> SequentialAgent:
+    return get_or_build_agent(ADK_ROOT_NAME, build_agent)
+
+
 class EventManager:
-    """LlmAgent-style planner that returns a 2026 event calendar."""
+    """Planner that returns the 2026 event calendar from the local event store."""
 
     name = "Event Planner"
     description = (
@@ -51,15 +177,39 @@ class EventManager:
     )
 
     def run(self, query: str, logs: List[str] | None = None) -> Dict[str, Any]:
-        if logs is not None:
-            logs.append("Event Planner: compiling 2026 high-velocity events.")
+        from src.utils.adk_runner import run_sync
 
-        events = run_agent(build_agent(), query)
-        outputs = extract_final_responses(events)
+        return run_sync(self.run_async(query, logs=logs))
 
-        planner_text = outputs.get(AGENT_NAME, "")
-        planner_payload = parse_json_payload(planner_text)
-        return coerce_dict(planner_payload)
+    async def run_async(self, query: str, logs: List[str] | None = None) -> Dict[str, Any]:
+        """The full 2026 calendar; ``query`` is ignored.
 
+        The calendar does not depend on the research topic, ``query`` only keeps the
+        stage interface uniform. Use ``lookup`` to filter by date, market or segment.
+        """
+        from src.utils.adk_runner import coerce_dict
+        from src.utils.tracing import AGENT_SPAN, get_tracer
 
-root_agent = build_agent()
+        if logs is not None:
+            logs.append("Event Planner: compiling 2026 high-velocity events.")
+        # No runner is involved, so open the agent span the runner's plugin would have;
+        # the stage timing summary is built from it.
+        with get_tracer().span(ADK_ROOT_NAME, AGENT_SPAN, agent=ADK_ROOT_NAME):
+            return coerce_dict(await load_event_calendar(logs))
+
+    def lookup(
+        self,
+        *,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        city: str | None = None,
+        region: str | None = None,
+        segment: str | None = None,
+    ) -> Dict[str, Any]:
+        """Indexed lookup, e.g. events in one market this quarter, with no model call."""
+        store = get_event_store()
+        events = store.query(start=start, end=end, city=city, region=region, segment=segment)
+        return store.calendar(events)
+
+
+__getattr__ = lazy_root_agent(__name__, get_agent)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+import json
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+STORE_PATH_ENV_VAR = "EVENT_STORE_PATH"
+MAX_AGE_ENV_VAR = "EVENT_STORE_MAX_AGE_DAYS"
+
+# The packaged calendar is read-only; refreshed entries go to the writable store file.
+SEED_PATH = Path(__file__).with_name("events_2026.json")
+DEFAULT_STORE_PATH = PROJECT_ROOT / ".cache" / "event_store" / "events_2026.json"
+DEFAULT_MAX_AGE_DAYS = 90
+REQUIRED_FIELDS = (
+    "event_name",
+    "host_city",
+    "date",
+    "potential_global_viewership",
+    "past_sales_history",
+    "strategic_opportunity",
+    "target_segment",
+)
+
+# Store bookkeeping that is not part of the calendar handed to other agents.
+_BOOKKEEPING_FIELDS = ("updated_at", "checked_at")
+_KEY_RE = re.compile(r"[^a-z0-9]+")
+_SEGMENT_SPLIT_RE = re.compile(r"[,/;]")
+
+
+class EventStore:
+    """File-backed calendar of high-velocity events with in-memory indexes.
+
+    Entries are read from ``seed_path`` (if given) and from ``path``; an entry in
+    ``path`` overrides the seed entry of the same name, field by field. Refreshes
+    only ever write ``path``, which holds just the entries they touched.
+
+    Lookups by date range, host city / market, region and target segment are served
+    from indexes built at load time. Entries missing a required field, or whose
+    ``updated_at`` is older than ``max_age_days``, are reported by ``needs_refresh``
+    so callers can ask the model to enrich just those. ``checked_at`` records the last
+    refresh attempt, so an entry the model could not fill is not re-requested on
+    every run.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+        seed_path: str | Path | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.seed_path = Path(seed_path) if seed_path is not None else None
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Any] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._overlay: Dict[str, Dict[str, Any]] = {}
+        self._dates: List[str] = []
+        self._max_span_days = 0
+        self._by_city: Dict[str, Set[int]] = {}
+        self._by_region: Dict[str, Set[int]] = {}
+        self._by_segment: Dict[str, Set[int]] = {}
+        self._stamp: Tuple[Tuple[int, int] | None, ...] = ()
+        self.reload()
+
+    def reload(self) -> None:
+        seed_meta, seed_events = _read_calendar(self.seed_path)
+        meta, events = _read_calendar(self.path)
+        by_name = {_key(event.get("event_name", "")): event for event in seed_events}
+        overlay = {}
+        for event in events:
+            name_key = _key(event.get("event_name", ""))
+            merged = {**by_name.get(name_key, {})}
+            merged.update({field: value for field, value in event.items() if value})
+            by_name[name_key] = overlay[name_key] = merged
+        with self._lock:
+            self._meta = {**seed_meta, **meta}
+            self._overlay = overlay
+            self._index(list(by_name.values()))
+            self._stamp = self._file_stamp()
+
+    def is_current(self) -> bool:
+        """Whether the in-memory copy still matches the files on disk."""
+        return self._stamp == self._file_stamp()
+
+    def query(
+        self,
+        *,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        city: str | None = None,
+        region: str | None = None,
+        segment: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Events overlapping ``[start, end]`` that match every given filter, by date."""
+        start_text = _iso(start)
+        end_text = _iso(end)
+        with self._lock:
+            # Events are sorted by start date; one that overlaps ``start`` began at most
+            # the longest event span earlier.
+            earliest = _shift(start_text, -self._max_span_days) if start_text else ""
+            low = bisect_left(self._dates, earliest) if earliest else 0
+            high = bisect_right(self._dates, end_text) if end_text else len(self._dates)
+            candidates: Iterable[int] = range(low, high)
+            for index, value in (
+                (self._by_city, city),
+                (self._by_region, region),
+                (self._by_segment, segment),
+            ):
+                if value:
+                    matches = index.get(_key(value), set())
+                    candidates = [position for position in candidates if position in matches]
+            results = []
+            for position in candidates:
+                event = self._events[position]
+                if start_text and (event.get("end_date") or event.get("date", "")) < start_text:
+                    continue
+                results.append(dict(event))
+            return results
+
+    def calendar(self, events: Sequence[Dict[str, Any]] | None = None) -> Dict[str, Any]:
+        """The store (or ``events``) in the Event Planner's output format."""
+        with self._lock:
+            meta = dict(self._meta)
+            source = self._events if events is None else events
+            selected = [
+                {field: value for field, value in event.items() if field not in _BOOKKEEPING_FIELDS}
+                for event in source
+            ]
+        selected.sort(key=lambda event: event.get("date", ""))
+        return {**meta, "high_velocity_events": selected}
+
+    def needs_refresh(self, today: date | None = None) -> List[str]:
+        """Names of events that are missing required fields or are older than the max age.
+
+        An empty store returns ``["*"]``: the whole calendar has to be generated.
+        """
+        cutoff = ((today or date.today()) - timedelta(days=self.max_age_days)).isoformat()
+        with self._lock:
+            if not self._events:
+                return ["*"]
+            return [
+                event.get("event_name") or "(unnamed event)"
+                for event in self._events
+                if (
+                    any(not event.get(field) for field in REQUIRED_FIELDS)
+                    or str(event.get("updated_at", "")) < cutoff
+                )
+                and str(event.get("checked_at", "")) < cutoff
+            ]
+
+    def upsert(
+        self,
+        events: Iterable[Dict[str, Any]],
+        checked: Sequence[str] = (),
+        today: date | None = None,
+    ) -> int:
+        """Merge model-produced events into the store by name and persist them to ``path``.
+
+        Non-empty incoming fields overwrite stored ones. Events named in ``checked``
+        were requested from the model and are marked as checked even if it returned
+        nothing for them. Returns the number of entries added or updated.
+        """
+        stamp = (today or date.today()).isoformat()
+        with self._lock:
+            by_name = {_key(event.get("event_name", "")): dict(event) for event in self._events}
+            changed = 0
+            for event in events:
+                if not isinstance(event, dict) or not event.get("event_name"):
+                    continue
+                name_key = _key(event["event_name"])
+                merged = by_name.get(name_key, {})
+                merged.update({field: value for field, value in event.items() if value})
+                merged["updated_at"] = stamp
+                merged["checked_at"] = stamp
+                by_name[name_key] = self._overlay[name_key] = merged
+                changed += 1
+            for name in checked:
+                if _key(name) in by_name:
+                    by_name[_key(name)]["checked_at"] = stamp
+                    self._overlay[_key(name)] = by_name[_key(name)]
+            if not changed and not checked:
+                return 0
+            self._index(list(by_name.values()))
+            payload = {"high_velocity_events": list(self._overlay.values())}
+        self._write(payload)
+        return changed
+
+    def _index(self, events: List[Dict[str, Any]]) -> None:
+        events.sort(key=lambda event: str(event.get("date", "")))
+        self._events = events
+        self._dates = [str(event.get("date", "")) for event in events]
+        self._max_span_days = max((_span_days(event) for event in events), default=0)
+        self._by_city = {}
+        self._by_region = {}
+        self._by_segment = {}
+        for position, event in enumerate(events):
+            for city in _cities(event):
+                self._by_city.setdefault(city, set()).add(position)
+            if event.get("region"):
+                self._by_region.setdefault(_key(event["region"]), set()).add(position)
+            for segment in _SEGMENT_SPLIT_RE.split(str(event.get("target_segment", ""))):
+                if segment.strip():
+                    self._by_segment.setdefault(_key(segment), set()).add(position)
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        stamp = self._file_stamp()
+        with self._lock:
+            self._stamp = stamp
+
+    def _file_stamp(self) -> Tuple[Tuple[int, int] | None, ...]:
+        return tuple(_stat(path) for path in (self.seed_path, self.path))
+
+
+_STORE: EventStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_event_store() -> EventStore:
+    """Process-wide store over the packaged seed, re-read only when a file changes."""
+    global _STORE
+    path = Path(os.getenv(STORE_PATH_ENV_VAR) or DEFAULT_STORE_PATH)
+    with _STORE_LOCK:
+        if _STORE is None or _STORE.path != path:
+            max_age_days = int(os.getenv(MAX_AGE_ENV_VAR, DEFAULT_MAX_AGE_DAYS))
+            _STORE = EventStore(path, max_age_days=max_age_days, seed_path=SEED_PATH)
+        elif not _STORE.is_current():
+            _STORE.reload()
+        return _STORE
+
+
+def _read_calendar(path: Path | None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    if path is None:
+        return {}, []
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}, []
+    if not isinstance(payload, dict):
+        return {}, []
+    events = payload.get("high_velocity_events")
+    meta = {key: value for key, value in payload.items() if key != "high_velocity_events"}
+    return meta, [event for event in events or [] if isinstance(event, dict)]
+
+
+def _stat(path: Path | None) -> Tuple[int, int] | None:
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _key(value: str) -> str:
+    return _KEY_RE.sub(" ", str(value).lower()).strip()
+
+
+def _cities(event: Dict[str, Any]) -> Set[str]:
+    cities = {_key(market) for market in event.get("markets") or [] if market}
+    host_city = str(event.get("host_city", ""))
+    if host_city:
+        # "Santa Clara, CA" is indexed as "santa clara ca" and "santa clara".
+        cities.add(_key(host_city))
+        cities.add(_key(host_city.split(",")[0]))
+    return cities
+
+
+def _iso(value: date | str | None) -> str:
+    if value is None:
+        return ""
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _shift(iso_date: str, days: int) -> str:
+    try:
+        return (date.fromisoformat(iso_date) + timedelta(days=days)).isoformat()
+    except ValueError:
+        return ""
+
+
+def _span_days(event: Dict[str, Any]) -> int:
+    try:
+        start = date.fromisoformat(str(event.get("date")))
+        end = date.fromisoformat(str(event.get("end_date") or event.get("date")))
+    except ValueError:
+        return 0
+    return max((end - start).days, 0)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.utils.response_cache import ResponseCache
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+
+SEARCH_CACHE_ENV_VAR = "SEARCH_CACHE"
+SEARCH_CACHE_DIR_ENV_VAR = "SEARCH_CACHE_DIR"
+SEARCH_CACHE_TTL_ENV_VAR = "SEARCH_CACHE_TTL_S"
+
+DEFAULT_SEARCH_CACHE_DIR = PROJECT_ROOT / ".cache" / "search_results"
+DEFAULT_SEARCH_TTL_S = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 1024
+# Queries whose term sets overlap at least this much (Jaccard) share results.
+RELATED_QUERY_MIN_OVERLAP = 0.5
+
+EXACT_STATS_NAME = "google_search"
+RELATED_STATS_NAME = "google_search_related"
+
+STOPWORDS = frozenset(
+    """
+    a about an and are as at be by for from how in into is it latest new news of on
+    or the this to top what when where which who why with vs
+    """.split()
+)
+_TERM_RE = re.compile(r"[a-z0-9]+")
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref"})
+
+
+def search_cache_enabled() -> bool:
+    return os.getenv(SEARCH_CACHE_ENV_VAR, "true").strip().lower() not in (
+        "0",
+        "false",
+        "no",
+        "off",
+    )
+
+
+def normalize_query(query: str) -> FrozenSet[str]:
+    """Case-, whitespace-, stopword- and order-insensitive form of a search query."""
+    tokens = _TERM_RE.findall(query.lower().replace("'", ""))
+    terms = frozenset(token for token in tokens if token not in STOPWORDS)
+    return terms or frozenset(tokens)
+
+
+def normalize_url(url: str) -> str:
+    """Identity of a URL for deduplication: no scheme, ``www.``, fragment or tracking."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+        ]
+    )
+    path = parts.path.rstrip("/")
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def merge_results(result_lists: Iterable[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """Concatenate result lists in order, keeping the first occurrence of each URL."""
+    seen: Set[str] = set()
+    merged: List[Dict[str, str]] = []
+    for results in result_lists:
+        for item in results:
+            identity = normalize_url(item.get("url", ""))
+            if identity and identity not in seen:
+                seen.add(identity)
+                merged.append(item)
+    return merged
+
+
+class SearchCache:
+    """TTL cache of search results keyed by normalized query.
+
+    Entries live in a ``ResponseCache`` (memory LRU plus disk), so they survive
+    across runs. A term index over cached queries lets ``related`` find earlier
+    searches that overlap the current one.
+    """
+
+    def __init__(
+        self, store: ResponseCache, min_overlap: float = RELATED_QUERY_MIN_OVERLAP
+    ) -> None:
+        self.store = store
+        self.min_overlap = min_overlap
+        self._lock = threading.Lock()
+        self._terms: Dict[str, FrozenSet[str]] = {}
+        self._by_term: Dict[str, Set[str]] = {}
+        self._related_merges = 0
+        self._index_loaded = False
+
+    def get(self, terms: FrozenSet[str]) -> List[Dict[str, str]] | None:
+        payload = self.store.get(_query_key(terms), EXACT_STATS_NAME)
+        return list(payload["results"]) if payload is not None else None
+
+    def put(self, terms: FrozenSet[str], results: List[Dict[str, str]]) -> None:
+        key = _query_key(terms)
+        self.store.put(key, {"terms": sorted(terms), "results": results})
+        with self._lock:
+            self._index(key, terms)
+
+    def related(self, terms: FrozenSet[str]) -> List[List[Dict[str, str]]]:
+        """Cached results of other queries, most similar first."""
+        self._ensure_index()
+        own_key = _query_key(terms)
+        with self._lock:
+            candidates = {key for term in terms for key in self._by_term.get(term, ())}
+            scored = []
+            for key in candidates - {own_key}:
+                other = self._terms[key]
+                overlap = len(terms & other) / len(terms | other)
+                if overlap >= self.min_overlap:
+                    scored.append((overlap, key))
+        related = []
+        for _, key in sorted(scored, reverse=True):
+            payload = self.store.get(key, RELATED_STATS_NAME)
+            if payload is not None:
+                related.append(list(payload["results"]))
+        if related:
+            with self._lock:
+                self._related_merges += 1
+        return related
+
+    def stats(self) -> Dict[str, int]:
+        counts = self.store.stats()
+        exact = counts.get(EXACT_STATS_NAME, {})
+        related = counts.get(RELATED_STATS_NAME, {})
+        with self._lock:
+            return {
+                "hits": exact.get("hits", 0),
+                "misses": exact.get("misses", 0),
+                "related_hits": related.get("hits", 0),
+                "related_merges": self._related_merges,
+                "indexed_queries": len(self._terms),
+            }
+
+    def _index(self, key: str, terms: FrozenSet[str]) -> None:
+        self._terms[key] = terms
+        for term in terms:
+            self._by_term.setdefault(term, set()).add(key)
+
+    def _ensure_index(self) -> None:
+        # Queries cached by earlier runs are indexed from disk on first use.
+        with self._lock:
+            if self._index_loaded:
+                return
+            self._index_loaded = True
+        directory = self.store.directory
+        if directory is None or not directory.exists():
+            return
+        cutoff = time.time() - self.store.ttl_s
+        for path in directory.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    continue
+                terms = frozenset(json.loads(path.read_text(encoding="utf-8"))["terms"])
+            except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                continue
+            with self._lock:
+                self._index(path.stem, terms)
+
+
+_SEARCH_CACHE: SearchCache | None = None
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Process-wide search cache configured from the ``SEARCH_CACHE_*`` environment."""
+    global _SEARCH_CACHE
+    with _SEARCH_CACHE_LOCK:
+        if _SEARCH_CACHE is None:
+            _SEARCH_CACHE = SearchCache(
+                ResponseCache(
+                    directory=os.getenv(SEARCH_CACHE_DIR_ENV_VAR) or DEFAULT_SEARCH_CACHE_DIR,
+                    max_entries=DEFAULT_MAX_ENTRIES,
+                    ttl_s=float(os.getenv(SEARCH_CACHE_TTL_ENV_VAR, DEFAULT_SEARCH_TTL_S)),
+                )
+            )
+        return _SEARCH_CACHE
+
+
+def search_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of the process-wide search cache."""
+    return get_search_cache().stats() if _SEARCH_CACHE is not None else {}
+
+
+def _query_key(terms: FrozenSet[str]) -> str:
+    return hashlib.sha256(" ".join(sorted(terms)).encode("utf-8")).hexdigest()
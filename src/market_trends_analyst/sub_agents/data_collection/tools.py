@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import os
 import random
 from typing import Dict, List
+from urllib.parse import urlparse
 
 try:
-    from google.adk.tools import google_search as adk_google_search
+    import httpx
 except Exception:  # pragma: no cover - optional dependency
-    adk_google_search = None
+    httpx = None
 
+from src.market_trends_analyst.sub_agents.data_collection.search_cache import (
+    get_search_cache,
+    merge_results,
+    normalize_query,
+    search_cache_enabled,
+)
+
+SEARCH_API_KEY_ENV_VAR = "GOOGLE_SEARCH_API_KEY"
+SEARCH_ENGINE_ID_ENV_VAR = "GOOGLE_SEARCH_ENGINE_ID"
+SEARCH_API_URL = "https://www.googleapis.com/customsearch/v1"
+SEARCH_TIMEOUT_S = 8.0
+# The Custom Search JSON API returns at most 10 results per request.
+SEARCH_RESULTS_PER_QUERY = 10
+_SOCIAL_HOSTS = ("reddit.com", "x.com", "twitter.com", "threads.net", "facebook.com")
 
 SAMPLE_SOURCES = [
     {"url": "https://www.qsrmagazine.com/menu/", "source_type": "news"},
@@ -36,23 +52,55 @@ def _fallback_results(query: str, limit: int) -> List[Dict[str, str]]:
     return sources[:limit]
 
 
-def google_search(query: str, limit: int = 12) -> List[Dict[str, str]]:
+async def _live_search(query: str) -> List[Dict[str, str]]:
+    """Results from the Programmable Search (Custom Search JSON) API, when configured.
+
+    ADK's ``google_search`` is a built-in tool that the model runs itself and cannot
+    be called from a function tool, so live results need ``GOOGLE_SEARCH_API_KEY``
+    and ``GOOGLE_SEARCH_ENGINE_ID``. HTTP and network errors return no results.
+    """
+    api_key = os.getenv(SEARCH_API_KEY_ENV_VAR, "").strip()
+    engine_id = os.getenv(SEARCH_ENGINE_ID_ENV_VAR, "").strip()
+    if httpx is None or not api_key or not engine_id:
+        return []
+    params = {"key": api_key, "cx": engine_id, "q": query, "num": SEARCH_RESULTS_PER_QUERY}
+    try:
+        async with httpx.AsyncClient(timeout=SEARCH_TIMEOUT_S) as client:
+            response = await client.get(SEARCH_API_URL, params=params)
+            response.raise_for_status()
+    except httpx.HTTPError:
+        return []
+    return [
+        {"url": item["link"], "source_type": _source_type(item["link"])}
+        for item in response.json().get("items", [])
+        if item.get("link")
+    ]
+
+
+def _source_type(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    social = any(host == name or host.endswith("." + name) for name in _SOCIAL_HOSTS)
+    return "social_media" if social else "news"
+
+
+async def google_search(query: str, limit: int = 12) -> List[Dict[str, str]]:
     """Return a list of URLs and source types.
 
-    If Google ADK tools are available, attempt to use them. Otherwise, fall back
-    to a curated sample list for demo purposes.
+    Live results come from the Custom Search JSON API when it is configured;
+    otherwise a curated sample list is returned for demo purposes. Results are
+    cached by normalized query (see ``search_cache``) and merged with those of
+    related cached queries.
     """
-    if adk_google_search is not None:
-        try:
-            results = adk_google_search(query)
-            normalized: List[Dict[str, str]] = []
-            for item in results or []:
-                url = item.get("url") or item.get("link")
-                if not url:
-                    continue
-                normalized.append({"url": url, "source_type": item.get("source_type", "news")})
-            if normalized:
-                return normalized[:limit]
-        except Exception:
-            pass
-    return _fallback_results(query, limit)
+    if not search_cache_enabled():
+        results = await _live_search(query)
+        return merge_results([results])[:limit] or _fallback_results(query, limit)
+
+    cache = get_search_cache()
+    terms = normalize_query(query)
+    results = cache.get(terms)
+    if results is None:
+        results = await _live_search(query)
+        if results:
+            cache.put(terms, results)
+    merged = merge_results([results or [], *cache.related(terms)])
+    return merged[:limit] or _fallback_results(query, limit)
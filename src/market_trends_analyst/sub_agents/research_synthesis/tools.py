@@ -1,12 +1,42 @@
 from __future__ import annotations
 
-from typing import Dict
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+import re
+from typing import Any, Dict, List, Tuple
 
 try:
     from google.adk.tools import web_scraper_tool as adk_web_scraper_tool
 except Exception:  # pragma: no cover - optional dependency
     adk_web_scraper_tool = None
 
+try:
+    import httpx
+except Exception:  # pragma: no cover - optional dependency
+    httpx = None
+
+MAX_BATCH_URLS = 20
+MAX_CONCURRENT_FETCHES = 8
+PER_URL_TIMEOUT_S = 8.0
+MAX_PAGE_BYTES = 512 * 1024
+MAX_CONTENT_CHARS = 4000
+USER_AGENT = "Mozilla/5.0 (compatible; market-trends-research/1.0)"
+
+PLACEHOLDER_CONTENT = (
+    "Sample content placeholder for trend analysis. "
+    "Focuses on value offers, bundles, and app-exclusive deals."
+)
+
+# Page furniture whose text is not part of the main content.
+_SKIPPED_TAGS = {
+    "script", "style", "noscript", "svg", "template",
+    "nav", "header", "footer", "aside", "form", "iframe",
+}
+_WHITESPACE_RE = re.compile(r"\s+")
+# Parsing is pure Python, so more threads only fight the event loop for the GIL.
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-parser")
+
 
 def web_scraper_tool(url: str) -> Dict[str, str]:
     """Fetch web content for a URL.
@@ -20,8 +50,131 @@ def web_scraper_tool(url: str) -> Dict[str, str]:
             pass
     return {
         "url": url,
-        "content": (
-            "Sample content placeholder for trend analysis. "
-            "Focuses on value offers, bundles, and app-exclusive deals."
-        ),
+        "content": PLACEHOLDER_CONTENT,
     }
+
+
+async def web_scraper_batch_tool(urls: List[str]) -> Dict[str, Any]:
+    """Fetch several URLs concurrently and return the main text of each page.
+
+    Pass every URL from data collection in one call. Each page gets its own timeout
+    and size cap; a failed page is reported with an ``error`` and placeholder content
+    instead of failing the batch.
+    """
+    unique_urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+    unique_urls = unique_urls[:MAX_BATCH_URLS]
+    if httpx is None:
+        return {"pages": [web_scraper_tool(url) for url in unique_urls]}
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    limits = httpx.Limits(
+        max_connections=MAX_CONCURRENT_FETCHES,
+        max_keepalive_connections=MAX_CONCURRENT_FETCHES,
+    )
+    async with httpx.AsyncClient(
+        limits=limits,
+        timeout=PER_URL_TIMEOUT_S,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    ) as client:
+
+        async def _fetch_limited(url: str) -> Dict[str, Any]:
+            try:
+                async with semaphore:
+                    fetched = await asyncio.wait_for(_fetch_page(client, url), PER_URL_TIMEOUT_S)
+                if isinstance(fetched, dict):
+                    return fetched
+                # Parsing a large page takes hundreds of milliseconds: do it off the event
+                # loop, after the fetch has given back its slot and its timeout.
+                return await asyncio.get_running_loop().run_in_executor(
+                    _PARSE_EXECUTOR, _page_from_body, url, *fetched
+                )
+            except Exception as error:
+                detail = f": {error}" if str(error) else ""
+                return {
+                    "url": url,
+                    "content": PLACEHOLDER_CONTENT,
+                    "error": f"{type(error).__name__}{detail}",
+                }
+
+        pages = await asyncio.gather(*(_fetch_limited(url) for url in unique_urls))
+    return {"pages": list(pages)}
+
+
+async def _fetch_page(
+    client: "httpx.AsyncClient", url: str
+) -> Tuple[bytes, str, str] | Dict[str, Any]:
+    """``(body, encoding, content type)`` of ``url``, or its error page on an HTTP error."""
+    async with client.stream("GET", url) as response:
+        if response.is_error:
+            return {
+                "url": url,
+                "content": PLACEHOLDER_CONTENT,
+                "error": f"HTTP {response.status_code}",
+            }
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) >= MAX_PAGE_BYTES:
+                del body[MAX_PAGE_BYTES:]
+                break
+        encoding = response.encoding or "utf-8"
+        content_type = response.headers.get("content-type", "")
+    return bytes(body), encoding, content_type
+
+
+def _page_from_body(url: str, body: bytes, encoding: str, content_type: str) -> Dict[str, Any]:
+    text = body.decode(encoding, errors="replace")
+    if "html" in content_type or text.lstrip()[:1] == "<":
+        title, text = extract_main_text(text)
+    else:
+        title = ""
+    page: Dict[str, Any] = {"url": url, "content": _clip(_WHITESPACE_RE.sub(" ", text).strip())}
+    if title:
+        page["title"] = title
+    return page
+
+
+def extract_main_text(html: str) -> tuple[str, str]:
+    """Return ``(title, text)`` from an HTML page, dropping scripts and page chrome."""
+    parser = _MainTextParser()
+    parser.feed(html)
+    parser.close()
+    return parser.title.strip(), " ".join(parser.chunks)
+
+
+def _clip(text: str) -> str:
+    if len(text) <= MAX_CONTENT_CHARS:
+        return text
+    return text[:MAX_CONTENT_CHARS].rsplit(" ", 1)[0] + " ..."
+
+
+class _MainTextParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.chunks: List[str] = []
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag == "title":
+            self._in_title = True
+        elif tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        elif tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        text = _WHITESPACE_RE.sub(" ", data).strip()
+        if text:
+            self.chunks.append(text)
@@ -0,0 +1,768 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import sys
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from google.adk.agents import SequentialAgent
+from google.adk.agents.base_agent import BaseAgent
+
+# ADK loads apps with /workspace/src on sys.path; add project root so src.* imports resolve.
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.customer_insights.agent import (
+    ADK_ROOT_NAME as CUSTOMER_INSIGHTS_ROOT_NAME,
+    CustomerInsightsManagerAgent,
+    build_agent as build_customer_insights_agent,
+    get_agent as get_customer_insights_agent,
+)
+from src.customer_insights.sub_agents.profile_synthesizer.agent import (
+    NAME as PROFILE_SYNTHESIZER_NAME,
+)
+from src.event_planner.agent import (
+    ADK_ROOT_NAME as EVENT_PLANNER_ROOT_NAME,
+    AGENT_NAME as EVENT_PLANNER_AGENT_NAME,
+    EventManager,
+    build_agent as build_event_planner_agent,
+)
+from src.market_trends_analyst.agent import (
+    ADK_ROOT_NAME as MARKET_TRENDS_ROOT_NAME,
+    MarketTrendsAnalystRoot,
+    build_agent as build_market_trends_agent,
+    get_agent as get_market_trends_agent,
+)
+from src.market_trends_analyst.sub_agents.research_synthesis.agent import (
+    NAME as RESEARCH_SYNTHESIS_NAME,
+)
+from src.offer_design.agent import (
+    OfferDesignRootAgent,
+    build_agent as build_offer_design_agent,
+    get_agent as get_offer_design_agent,
+)
+from src.offer_design.sub_agents.simplified_offer_design.agent import (
+    NAME as SIMPLIFIED_OFFER_DESIGN_NAME,
+)
+from src.orchestrator.agent import (
+    AGENT_NAME as OFFER_ORCHESTRATOR_AGENT_NAME,
+    OFFER_PAYLOAD_STATE_KEY,
+    build_agent as build_offer_orchestrator_agent,
+    merge_offer_payload,
+)
+from src.utils.adk_runner import (
+    coerce_dict,
+    coerce_list,
+    extract_final_responses,
+    iterate_sync,
+    parse_json_payload,
+    run_sync,
+    stream_agent_events,
+)
+from src.utils.agent_registry import get_or_build_agent
+from src.utils.llm_governor import BATCH_LANE, run_in_lane
+from src.utils.output_schemas import STAGE_SCHEMAS, OutputValidationError, validate_stage_output
+from src.utils.parallel_stage import branch_failure, build_parallel_stage
+from src.utils.stage_checkpoints import (
+    CheckpointStore,
+    agent_fingerprint,
+    checkpoint_key,
+    checkpoints_enabled,
+    content_hash,
+    get_checkpoint_store,
+)
+from src.utils.tracing import get_tracer, stage_timings
+
+ADK_ROOT_NAME = "marketing_orchestrator"
+BATCH_ROOT_NAME = "marketing_orchestrator_batch"
+UPSTREAM_STAGE_NAME = "upstream_research"
+PARALLEL_ENV_VAR = "MARKETING_ORCHESTRATOR_PARALLEL"
+OFFER_DESIGN_LABEL = "Offer Design"
+WORKFLOW_RESULT_KEYS = ("trend_briefs", "customer_insights", "event_calendar", "offer_concepts")
+DEFAULT_BATCH_CONCURRENCY = 4
+# The event calendar does not depend on the research topic, so a batch asks once.
+SHARED_EVENT_QUERY = "Compile the 2026 high-velocity event calendar."
+
+# Final-response author -> (stage label, output key) for the stages the UI renders.
+STAGE_OUTPUTS: Dict[str, Tuple[str, str]] = {
+    RESEARCH_SYNTHESIS_NAME: ("Market Trends Analyst", "trend_briefs"),
+    PROFILE_SYNTHESIZER_NAME: ("Customer Insights", "customer_insights"),
+    EVENT_PLANNER_AGENT_NAME: ("Event Planner", "event_calendar"),
+    OFFER_ORCHESTRATOR_AGENT_NAME: ("Offer Orchestrator", "offer_payload"),
+    SIMPLIFIED_OFFER_DESIGN_NAME: (OFFER_DESIGN_LABEL, "offer_concepts"),
+}
+_BRANCH_STAGE_AUTHORS = {
+    MARKET_TRENDS_ROOT_NAME: RESEARCH_SYNTHESIS_NAME,
+    CUSTOMER_INSIGHTS_ROOT_NAME: PROFILE_SYNTHESIZER_NAME,
+    EVENT_PLANNER_ROOT_NAME: EVENT_PLANNER_AGENT_NAME,
+}
+# Agent whose span covers each stage -> stage label, for the timing summary.
+_TIMED_STAGES = {
+    **{root: STAGE_OUTPUTS[author][0] for root, author in _BRANCH_STAGE_AUTHORS.items()},
+    OFFER_ORCHESTRATOR_AGENT_NAME: STAGE_OUTPUTS[OFFER_ORCHESTRATOR_AGENT_NAME][0],
+    SIMPLIFIED_OFFER_DESIGN_NAME: OFFER_DESIGN_LABEL,
+}
+TIMINGS_KEY = "stage_timings"
+WORKFLOW_LABEL = "Workflow"
+_DICT_OUTPUT_KEYS = ("event_calendar", "offer_payload")
+# Key that identifies the right top-level object when a response holds several.
+_PREFERRED_PAYLOAD_KEYS = {
+    "event_calendar": "high_velocity_events",
+    "offer_payload": "research_topic",
+}
+# Output key -> output keys the stage reads, in the order stages are started.
+STAGE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "trend_briefs": (),
+    "customer_insights": (),
+    "event_calendar": (),
+    "offer_concepts": ("trend_briefs", "customer_insights", "event_calendar"),
+}
+# Agent tree whose prompts and models decide each checkpointed stage's output. The
+# event calendar comes from its own local store and is cheap to reload, so it is
+# not checkpointed; its content still keys offer design.
+_CHECKPOINT_AGENTS = {
+    "trend_briefs": get_market_trends_agent,
+    "customer_insights": get_customer_insights_agent,
+    "offer_concepts": get_offer_design_agent,
+}
+
+
+@dataclass(frozen=True)
+class StageUpdate:
+    """Parsed output of one workflow stage, emitted as soon as that stage finishes."""
+
+    stage: str
+    output_key: str
+    value: Any
+    elapsed_s: float
+    error: str | None = None
+    cached: bool = False
+
+    @property
+    def log(self) -> str:
+        if self.error:
+            return f"{self.stage} failed after {self.elapsed_s:.1f}s: {self.error}"
+        if self.cached:
+            return f"{self.stage} reused from checkpoint (inputs unchanged)."
+        return f"{self.stage} completed in {self.elapsed_s:.1f}s."
+
+
+def parse_stage_output(output_key: str, text: str) -> Any:
+    """Parsed stage output; schema-backed outputs raise ``OutputValidationError``."""
+    if output_key in STAGE_SCHEMAS:
+        return validate_stage_output(output_key, text)
+    prefer_key = _PREFERRED_PAYLOAD_KEYS.get(output_key, output_key)
+    payload = parse_json_payload(text, prefer_keys=(prefer_key,))
+    if output_key in _DICT_OUTPUT_KEYS:
+        return coerce_dict(payload)
+    return coerce_list(payload, key=output_key)
+
+
+def _empty_output(output_key: str) -> Any:
+    return {} if output_key in _DICT_OUTPUT_KEYS else []
+
+
+def parallel_enabled(parallel: bool | None = None) -> bool:
+    if parallel is not None:
+        return parallel
+    return os.getenv(PARALLEL_ENV_VAR, "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def build_agent(parallel: bool | None = None) -> SequentialAgent:
+    # Market trends, customer insights and events never read each other's output,
+    # so by default they fan out concurrently ahead of the offer stages.
+    return _build_pipeline(
+        ADK_ROOT_NAME,
+        [build_market_trends_agent(), build_customer_insights_agent(), build_event_planner_agent()],
+        parallel,
+    )
+
+
+def build_batch_agent(parallel: bool | None = None) -> SequentialAgent:
+    """Per-query pipeline for batches; the event calendar arrives via session state."""
+    return _build_pipeline(
+        BATCH_ROOT_NAME,
+        [build_market_trends_agent(), build_customer_insights_agent()],
+        parallel,
+    )
+
+
+def _build_pipeline(
+    name: str, upstream_agents: List[BaseAgent], parallel: bool | None
+) -> SequentialAgent:
+    if parallel_enabled(parallel):
+        upstream_stages: List[BaseAgent] = [
+            build_parallel_stage(
+                name=UPSTREAM_STAGE_NAME,
+                description="Runs the independent upstream research stages concurrently.",
+                sub_agents=upstream_agents,
+            )
+        ]
+    else:
+        upstream_stages = upstream_agents
+    return SequentialAgent(
+        name=name,
+        description=MarketingOrchestrator.description,
+        sub_agents=[
+            *upstream_stages,
+            build_offer_orchestrator_agent(),
+            build_offer_design_agent(),
+        ],
+    )
+
+
+def get_agent(parallel: bool | None = None) -> SequentialAgent:
+    enabled = parallel_enabled(parallel)
+    return get_or_build_agent((ADK_ROOT_NAME, enabled), lambda: build_agent(parallel=enabled))
+
+
+def get_batch_agent(parallel: bool | None = None) -> SequentialAgent:
+    enabled = parallel_enabled(parallel)
+    return get_or_build_agent(
+        (BATCH_ROOT_NAME, enabled), lambda: build_batch_agent(parallel=enabled)
+    )
+
+
+class MarketingOrchestrator:
+    """Root agent that runs the upstream stages concurrently, then offer design."""
+
+    name = "Marketing Orchestrator"
+    description = (
+        "Coordinates the market trends, customer insights and event planning "
+        "agents, then hands their outputs to offer design."
+    )
+
+    def __init__(self, parallel: bool | None = None) -> None:
+        self.parallel = parallel_enabled(parallel)
+
+    def run(self, query: str) -> Tuple[Dict[str, Any], List[str]]:
+        return run_sync(self.run_async(query))
+
+    async def run_async(self, query: str) -> Tuple[Dict[str, Any], List[str]]:
+        mode = "in parallel" if self.parallel else "in sequence"
+        logs: List[str] = [
+            f"Workflow started; Market Trends, Customer Insights and Event Planner run {mode}."
+        ]
+        output: Dict[str, Any] = {key: _empty_output(key) for key in WORKFLOW_RESULT_KEYS}
+        async for update in self.stream_async(query):
+            logs.append(update.log)
+            if update.output_key in output:
+                output[update.output_key] = update.value
+        return output, logs
+
+    async def stream_async(self, query: str) -> AsyncIterator[StageUpdate]:
+        async for update in _stream_stage_updates(get_agent(parallel=self.parallel), query):
+            yield update
+
+
+async def _stream_stage_updates(
+    agent: BaseAgent, query: str, state: Dict[str, Any] | None = None
+) -> AsyncIterator[StageUpdate]:
+    started = time.perf_counter()
+    async for event in stream_agent_events(agent, query, state=state):
+        failure = branch_failure(event)
+        if failure is not None:
+            branch_name, error = failure
+            author = _BRANCH_STAGE_AUTHORS.get(branch_name, branch_name)
+            stage, output_key = STAGE_OUTPUTS.get(author, (branch_name, branch_name))
+            yield StageUpdate(
+                stage=stage,
+                output_key=output_key,
+                value=_empty_output(output_key),
+                elapsed_s=time.perf_counter() - started,
+                error=error,
+            )
+            continue
+        if event.author not in STAGE_OUTPUTS or not event.is_final_response():
+            continue
+        stage, output_key = STAGE_OUTPUTS[event.author]
+        # The offer payload message is compacted for the model; state has it in full.
+        state_payload = event.actions.state_delta.get(OFFER_PAYLOAD_STATE_KEY)
+        if event.author == OFFER_ORCHESTRATOR_AGENT_NAME and state_payload is not None:
+            value = state_payload
+        else:
+            text = extract_final_responses([event]).get(event.author, "")
+            if not text:
+                continue
+            try:
+                value = parse_stage_output(output_key, text)
+            except OutputValidationError as error:
+                yield StageUpdate(
+                    stage=stage,
+                    output_key=output_key,
+                    value=_empty_output(output_key),
+                    elapsed_s=time.perf_counter() - started,
+                    error=f"invalid output: {error}",
+                )
+                continue
+        yield StageUpdate(
+            stage=stage,
+            output_key=output_key,
+            value=value,
+            elapsed_s=time.perf_counter() - started,
+        )
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of one query in a workflow batch.
+
+    ``error`` is set when the query failed or one of its stages did; ``results`` then
+    holds whatever the remaining stages produced.
+    """
+
+    index: int
+    query: str
+    results: Dict[str, Any]
+    logs: List[str]
+    elapsed_s: float
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class BatchReport:
+    queries: int
+    failed: int
+    elapsed_s: float
+    # Shared-stage runs skipped by running them once, and the stage time that saved.
+    stage_runs_saved: int
+    stage_time_saved_s: float
+
+    @property
+    def queries_per_minute(self) -> float:
+        return self.queries * 60.0 / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def log(self) -> str:
+        return (
+            f"Batch of {self.queries} queries finished in {self.elapsed_s:.1f}s "
+            f"({self.queries_per_minute:.1f} queries/min, {self.failed} failed); "
+            f"shared stages saved {self.stage_runs_saved} stage runs "
+            f"(~{self.stage_time_saved_s:.1f}s of stage time)."
+        )
+
+
+class WorkflowBatch:
+    """Runs the Marketing Orchestrator workflow for many research topics.
+
+    Query-independent stages (the 2026 event calendar) run once for the whole batch;
+    the remaining stages run per query, at most ``max_concurrency`` at a time.
+    Iterating yields each query's ``BatchResult`` in completion order, and ``report``
+    is filled in once every query has finished.
+    """
+
+    def __init__(
+        self,
+        queries: Iterable[str],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        parallel: bool | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.queries = list(queries)
+        self.max_concurrency = max_concurrency
+        self.parallel = parallel_enabled(parallel)
+        self.report: BatchReport | None = None
+
+    def __iter__(self) -> Iterator[BatchResult]:
+        return iterate_sync(self.stream_async())
+
+    async def stream_async(self) -> AsyncIterator[BatchResult]:
+        started = time.perf_counter()
+        if not self.queries:
+            self.report = BatchReport(
+                queries=0, failed=0, elapsed_s=0.0, stage_runs_saved=0, stage_time_saved_s=0.0
+            )
+            return
+
+        # Batch calls queue behind interactive ones in the LLM governor.
+        shared_update = await run_in_lane(BATCH_LANE, self._run_shared_stages())
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _run_limited(index: int, query: str) -> BatchResult:
+            async with semaphore:
+                return await run_in_lane(
+                    BATCH_LANE, self._run_query(index, query, shared_update)
+                )
+
+        tasks = [
+            asyncio.create_task(_run_limited(index, query))
+            for index, query in enumerate(self.queries)
+        ]
+        failed = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                failed += result.error is not None
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        runs_saved = 0 if shared_update.error else len(self.queries) - 1
+        self.report = BatchReport(
+            queries=len(self.queries),
+            failed=failed,
+            elapsed_s=time.perf_counter() - started,
+            stage_runs_saved=runs_saved,
+            stage_time_saved_s=shared_update.elapsed_s * runs_saved,
+        )
+
+    async def _run_shared_stages(self) -> StageUpdate:
+        started = time.perf_counter()
+        try:
+            calendar = await EventManager().run_async(SHARED_EVENT_QUERY)
+        except Exception as error:
+            return StageUpdate(
+                stage=STAGE_OUTPUTS[EVENT_PLANNER_AGENT_NAME][0],
+                output_key="event_calendar",
+                value={},
+                elapsed_s=time.perf_counter() - started,
+                error=f"{type(error).__name__}: {error}",
+            )
+        return StageUpdate(
+            stage=STAGE_OUTPUTS[EVENT_PLANNER_AGENT_NAME][0],
+            output_key="event_calendar",
+            value=calendar,
+            elapsed_s=time.perf_counter() - started,
+        )
+
+    async def _run_query(self, index: int, query: str, shared: StageUpdate) -> BatchResult:
+        started = time.perf_counter()
+        logs = [f"Shared stage: {shared.log}"]
+        results: Dict[str, Any] = {key: _empty_output(key) for key in WORKFLOW_RESULT_KEYS}
+        results[shared.output_key] = shared.value
+        stage_error = shared.error
+        try:
+            async for update in _stream_stage_updates(
+                get_batch_agent(parallel=self.parallel),
+                query,
+                state={shared.output_key: shared.value},
+            ):
+                logs.append(update.log)
+                stage_error = stage_error or update.error
+                if update.output_key in results:
+                    results[update.output_key] = update.value
+        except Exception as error:
+            message = f"{type(error).__name__}: {error}"
+            logs.append(f"Workflow failed: {message}")
+            return BatchResult(
+                index, query, results, logs, time.perf_counter() - started, error=message
+            )
+        return BatchResult(
+            index, query, results, logs, time.perf_counter() - started, error=stage_error
+        )
+
+
+_SINGLE_STAGE_AGENTS = {
+    MarketTrendsAnalystRoot.name: (MarketTrendsAnalystRoot, "trend_briefs"),
+    CustomerInsightsManagerAgent.name: (CustomerInsightsManagerAgent, "customer_insights"),
+    EventManager.name: (EventManager, "event_calendar"),
+}
+_STAGE_AGENTS = {output_key: agent_cls for agent_cls, output_key in _SINGLE_STAGE_AGENTS.values()}
+# Names ``run_workflow`` runs as themselves; anything else falls back to the orchestrator.
+WORKFLOW_AGENT_NAMES = (MarketingOrchestrator.name, *_SINGLE_STAGE_AGENTS, OFFER_DESIGN_LABEL)
+_STAGE_LABELS = {output_key: stage for stage, output_key in STAGE_OUTPUTS.values()}
+
+
+def run_workflow(
+    query: str, agent_name: str | None = None, parallel: bool | None = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Convenience function for the UI.
+
+    ``parallel`` overrides the ``MARKETING_ORCHESTRATOR_PARALLEL`` switch; pass
+    ``False`` to run the upstream stages in their original sequential order.
+    """
+    return run_sync(run_workflow_async(query, agent_name, parallel=parallel))
+
+
+def stream_workflow(
+    query: str,
+    agent_name: str | None = None,
+    parallel: bool | None = None,
+    recompute: bool = False,
+) -> Iterator[StageUpdate]:
+    """Synchronous counterpart of ``stream_workflow_async`` for the Streamlit UI."""
+    return iterate_sync(
+        stream_workflow_async(query, agent_name, parallel=parallel, recompute=recompute)
+    )
+
+
+async def stream_workflow_async(
+    query: str,
+    agent_name: str | None = None,
+    parallel: bool | None = None,
+    recompute: bool = False,
+) -> AsyncIterator[StageUpdate]:
+    """Yield a ``StageUpdate`` each time a stage of the selected workflow finishes.
+
+    Offer Design and unknown agent names need every upstream stage, so those are
+    streamed as well. With ``STAGE_CHECKPOINTS`` on (off by default) the stages run
+    through ``stream_stage_graph_async`` and only those whose inputs changed are
+    recomputed (``recompute=True`` ignores the checkpoints); otherwise the full
+    Marketing Orchestrator runs. The run is traced; a last update under
+    ``stage_timings`` carries the per-stage timing summary.
+    """
+    single_stage = _SINGLE_STAGE_AGENTS.get(agent_name or "")
+    if single_stage is not None:
+        targets: Tuple[str, ...] = (single_stage[1],)
+    elif agent_name == OFFER_DESIGN_LABEL:
+        targets = ("offer_concepts",)
+    else:
+        targets = WORKFLOW_RESULT_KEYS
+    started = time.perf_counter()
+    with get_tracer().trace(
+        "run_workflow", query=query, agent=agent_name or MarketingOrchestrator.name
+    ) as trace:
+        if checkpoints_enabled():
+            async for update in stream_stage_graph_async(
+                query, targets, force=STAGE_DEPENDENCIES if recompute else (), parallel=parallel
+            ):
+                yield update
+        elif single_stage is None:
+            async for update in MarketingOrchestrator(parallel=parallel).stream_async(query):
+                yield update
+        else:
+            agent_cls, output_key = single_stage
+            yield await _run_single_stage(
+                agent_cls.name, output_key, agent_cls().run_async(query), started
+            )
+    yield StageUpdate(
+        stage=WORKFLOW_LABEL,
+        output_key=TIMINGS_KEY,
+        value=stage_timings(trace.spans, _TIMED_STAGES, root=trace.root),
+        elapsed_s=time.perf_counter() - started,
+    )
+
+
+async def stream_stage_graph_async(
+    query: str,
+    targets: Sequence[str] = WORKFLOW_RESULT_KEYS,
+    *,
+    force: Iterable[str] = (),
+    parallel: bool | None = None,
+    store: CheckpointStore | None = None,
+) -> AsyncIterator[StageUpdate]:
+    """Run the stages ``targets`` depend on, reusing checkpoints whose inputs are unchanged.
+
+    Stages follow ``STAGE_DEPENDENCIES``. A checkpointed stage's output is stored
+    under a hash of its agent fingerprint, the query and its upstream outputs as soon
+    as it succeeds, so a failed run resumes from its last good stage and offer design
+    on top of unchanged research costs a single model call. Stages in ``force`` are
+    recomputed regardless; a stage whose dependency failed is reported as failed
+    without running.
+    """
+    store = store or get_checkpoint_store()
+    forced = set(force)
+    started = time.perf_counter()
+    tasks: Dict[str, asyncio.Future[StageUpdate]] = {}
+
+    async def run(output_key: str) -> StageUpdate:
+        upstream: Dict[str, Any] = {}
+        for dependency in STAGE_DEPENDENCIES[output_key]:
+            update = await tasks[dependency]
+            if update.error:
+                return StageUpdate(
+                    stage=_STAGE_LABELS[output_key],
+                    output_key=output_key,
+                    value=_empty_output(output_key),
+                    elapsed_s=time.perf_counter() - started,
+                    error=f"skipped because {update.stage} failed",
+                )
+            upstream[dependency] = update.value
+        return await _run_checkpointed_stage(
+            output_key, query, upstream, store, output_key in forced, started
+        )
+
+    try:
+        if parallel_enabled(parallel):
+            for output_key in _with_dependencies(targets):
+                tasks[output_key] = asyncio.ensure_future(run(output_key))
+            for finished in asyncio.as_completed(list(tasks.values())):
+                yield await finished
+        else:
+            for output_key in _with_dependencies(targets):
+                tasks[output_key] = asyncio.ensure_future(run(output_key))
+                yield await tasks[output_key]
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+
+async def retry_stage_async(
+    output_key: str, query: str, results: Dict[str, Any] | None = None
+) -> StageUpdate:
+    """Re-run only the stage that produces ``output_key``.
+
+    Offer design is rebuilt from the upstream outputs in ``results`` (a previous
+    run's results), so a bad offer answer does not repeat the research stages. A
+    successful retry replaces the stage's checkpoint.
+    """
+    if output_key not in STAGE_DEPENDENCIES:
+        raise ValueError(f"No stage produces '{output_key}'.")
+    results = results or {}
+    upstream = {
+        dependency: results.get(dependency) for dependency in STAGE_DEPENDENCIES[output_key]
+    }
+    store = get_checkpoint_store() if checkpoints_enabled() else None
+    return await _run_checkpointed_stage(
+        output_key, query, upstream, store, True, time.perf_counter()
+    )
+
+
+def retry_stage(
+    output_key: str, query: str, results: Dict[str, Any] | None = None
+) -> StageUpdate:
+    """Synchronous counterpart of ``retry_stage_async`` for the Streamlit UI."""
+    return run_sync(retry_stage_async(output_key, query, results))
+
+
+def _with_dependencies(targets: Iterable[str]) -> List[str]:
+    needed = set()
+    pending = list(targets)
+    while pending:
+        output_key = pending.pop()
+        if output_key not in STAGE_DEPENDENCIES:
+            raise ValueError(f"No stage produces '{output_key}'.")
+        if output_key not in needed:
+            needed.add(output_key)
+            pending.extend(STAGE_DEPENDENCIES[output_key])
+    return [output_key for output_key in STAGE_DEPENDENCIES if output_key in needed]
+
+
+def _stage_call(output_key: str, query: str, upstream: Dict[str, Any]) -> Awaitable[Any]:
+    if output_key == "offer_concepts":
+        payload = merge_offer_payload(
+            query,
+            upstream.get("trend_briefs"),
+            upstream.get("customer_insights"),
+            upstream.get("event_calendar"),
+        )
+        return OfferDesignRootAgent().run_async(payload)
+    return _STAGE_AGENTS[output_key]().run_async(query)
+
+
+async def _run_checkpointed_stage(
+    output_key: str,
+    query: str,
+    upstream: Dict[str, Any],
+    store: CheckpointStore | None,
+    force: bool,
+    started: float,
+) -> StageUpdate:
+    label = _STAGE_LABELS[output_key]
+    key = None
+    build = _CHECKPOINT_AGENTS.get(output_key)
+    if store is not None and build is not None:
+        key = checkpoint_key(
+            output_key,
+            agent_fingerprint(build()),
+            {"query": query, **{name: content_hash(value) for name, value in upstream.items()}},
+        )
+        checkpoint = None if force else store.get(key, output_key)
+        if checkpoint is not None:
+            return StageUpdate(
+                stage=label,
+                output_key=output_key,
+                value=checkpoint["value"],
+                elapsed_s=time.perf_counter() - started,
+                cached=True,
+            )
+    try:
+        update = await _run_single_stage(
+            label, output_key, _stage_call(output_key, query, upstream), started
+        )
+    except Exception as error:
+        return StageUpdate(
+            stage=label,
+            output_key=output_key,
+            value=_empty_output(output_key),
+            elapsed_s=time.perf_counter() - started,
+            error=f"{type(error).__name__}: {error}",
+        )
+    if store is not None and key is not None and update.error is None:
+        store.put(key, output_key, update.value)
+    return update
+
+
+async def _run_single_stage(
+    stage: str, output_key: str, run: Awaitable[Any], started: float
+) -> StageUpdate:
+    try:
+        value = await run
+    except OutputValidationError as error:
+        return StageUpdate(
+            stage=stage,
+            output_key=output_key,
+            value=_empty_output(output_key),
+            elapsed_s=time.perf_counter() - started,
+            error=f"invalid output: {error}",
+        )
+    return StageUpdate(
+        stage=stage, output_key=output_key, value=value, elapsed_s=time.perf_counter() - started
+    )
+
+
+async def run_workflow_async(
+    query: str, agent_name: str | None = None, parallel: bool | None = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Awaitable variant of ``run_workflow`` for callers that already run an event loop."""
+    selected = agent_name or MarketingOrchestrator.name
+    logs: List[str] = [f"Selected agent: {selected}."]
+    if selected == OFFER_DESIGN_LABEL:
+        logs.append("Offer Design requires upstream insights; running dependencies.")
+    elif selected != MarketingOrchestrator.name and selected not in _SINGLE_STAGE_AGENTS:
+        logs.append(f"Unknown agent '{selected}'. Falling back to Marketing Orchestrator.")
+
+    results: Dict[str, Any] = {}
+    async for update in stream_workflow_async(query, agent_name, parallel=parallel):
+        logs.append(update.log)
+        results[update.output_key] = update.value
+    return select_workflow_results(selected, results), logs
+
+
+def run_workflow_batch(
+    queries: Sequence[str],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    parallel: bool | None = None,
+) -> WorkflowBatch:
+    """Run the full workflow for every query, computing shared stages once.
+
+    Iterate the returned ``WorkflowBatch`` to receive each ``BatchResult`` as its
+    query completes (a failing query does not affect the others), then read
+    ``batch.report`` for throughput and the shared-stage runs (and stage time) saved.
+    """
+    return WorkflowBatch(queries, max_concurrency=max_concurrency, parallel=parallel)
+
+
+def select_workflow_results(agent_name: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape accumulated stage outputs into what ``run_workflow`` returns for an agent.
+
+    The per-stage timing summary is passed through under ``stage_timings``.
+    """
+    single_stage = _SINGLE_STAGE_AGENTS.get(agent_name)
+    if single_stage is not None:
+        output_key = single_stage[1]
+        selected = {output_key: results.get(output_key, _empty_output(output_key))}
+    elif agent_name == OFFER_DESIGN_LABEL:
+        selected = {"offer_concepts": results.get("offer_concepts", [])}
+    else:
+        selected = {key: results.get(key, _empty_output(key)) for key in WORKFLOW_RESULT_KEYS}
+    if TIMINGS_KEY in results:
+        selected[TIMINGS_KEY] = results[TIMINGS_KEY]
+    return selected
+
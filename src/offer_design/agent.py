@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 import sys
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-from google.adk.agents import SequentialAgent
+if TYPE_CHECKING:
+    from google.adk.agents import SequentialAgent
 
 # ADK loads apps with /workspace/src on sys.path; add project root so src.* imports resolve.
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -18,17 +18,20 @@ from src.offer_design.sub_agents.simplified_offer_design.agent import (
 from src.offer_design.sub_agents.simplified_offer_design.agent import (
     build_agent as build_simplified_offer_agent,
 )
-from src.utils.adk_runner import (
-    coerce_list,
-    extract_final_responses,
-    parse_json_payload,
-    run_agent,
+from src.utils.agent_registry import get_or_build_agent, lazy_root_agent
+from src.utils.prompt_budget import (
+    OFFER_DESIGN_REQUEST,
+    OFFER_DESIGN_STAGE,
+    compact_prompt,
+    stage_token_budget,
 )
 
 ADK_ROOT_NAME = "offer_design_root"
 
 
 def build_agent() -> SequentialAgent:
+    from google.adk.agents import SequentialAgent
+
     return SequentialAgent(
         name=ADK_ROOT_NAME,
         description=OfferDesignRootAgent.description,
@@ -36,6 +39,10 @@ def build_agent() -> SequentialAgent:
     )
 
 
+def get_agent() -> SequentialAgent:
+    return get_or_build_agent(ADK_ROOT_NAME, build_agent)
+
+
 class OfferDesignRootAgent:
     """Root agent that delegates to the simplified offer design agent."""
 
@@ -45,19 +52,36 @@ class OfferDesignRootAgent:
     def run(
         self, orchestrator_payload: Dict[str, Any], logs: List[str] | None = None
     ) -> List[Dict[str, Any]]:
+        from src.utils.adk_runner import run_sync
+
+        return run_sync(self.run_async(orchestrator_payload, logs=logs))
+
+    async def run_async(
+        self, orchestrator_payload: Dict[str, Any], logs: List[str] | None = None
+    ) -> List[Dict[str, Any]]:
+        from google.genai import types
+
+        from src.utils.adk_runner import extract_final_responses, run_agent_async
+        from src.utils.output_schemas import validate_stage_output
+
+        prompt = compact_prompt(orchestrator_payload, budget=stage_token_budget(OFFER_DESIGN_STAGE))
         if logs is not None:
             logs.append("Offer Design: SimplifiedOfferDesignAgent running.")
+            logs.append(f"Offer Design: prompt {prompt.log}.")
 
-        payload_text = json.dumps(orchestrator_payload, indent=2)
-        events = run_agent(build_agent(), payload_text)
+        # Payload and request in separate parts: reruns on the same upstream context
+        # reuse the payload from the model's context cache.
+        message = types.Content(
+            role="user",
+            parts=[types.Part(text=prompt.text), types.Part(text=OFFER_DESIGN_REQUEST)],
+        )
+        events = await run_agent_async(get_agent(), message)
         outputs = extract_final_responses(events)
 
-        offer_text = outputs.get(SIMPLIFIED_OFFER_DESIGN_NAME, "")
-        offer_payload = parse_json_payload(offer_text)
-        offer_concepts = coerce_list(offer_payload, key="offer_concepts")
-        if not offer_concepts and offer_payload is None:
-            offer_concepts = []
-        return offer_concepts
+        # Raises OutputValidationError instead of returning an empty list.
+        return validate_stage_output(
+            "offer_concepts", outputs.get(SIMPLIFIED_OFFER_DESIGN_NAME, "")
+        )
 
 
-root_agent = build_agent()
+__getattr__ = lazy_root_agent(__name__, get_agent)
@@ -1,19 +1,26 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.adk.agents.llm_agent import LlmAgent
-
-from src.utils.adk_agent_factory import build_llm_agent
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import LlmAgent
 
 NAME = "simplified_offer_design_agent"
 DESCRIPTION = "Synthesizes insights into 3 prioritized offer concepts."
 
 
 def build_agent() -> LlmAgent:
+    from src.utils.adk_agent_factory import build_llm_agent
+    from src.utils.output_schemas import OfferConcepts
+
     instruction_path = Path(__file__).with_name("instruction.txt")
     return build_llm_agent(
         name=NAME,
         description=DESCRIPTION,
         instruction_path=instruction_path,
+        output_schema=OfferConcepts,
+        # Only the current turn: the compacted payload message from the offer
+        # orchestrator (or the caller), not every upstream stage's transcript.
+        include_contents="none",
     )
@@ -1,40 +1,52 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 import sys
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-from google.adk.agents import SequentialAgent
-from google.adk.agents.llm_agent import LlmAgent
+if TYPE_CHECKING:
+    from google.adk.agents import SequentialAgent
+
+    from src.orchestrator.merge_agent import OfferPayloadMergeAgent
 
 # ADK loads apps with /workspace/src on sys.path; add project root so src.* imports resolve.
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.utils.adk_agent_factory import build_llm_agent
-from src.utils.adk_runner import (
-    coerce_dict,
-    extract_final_responses,
-    parse_json_payload,
-    run_agent,
-)
+from src.utils.agent_registry import get_or_build_agent, lazy_root_agent
 
 ADK_ROOT_NAME = "offer_orchestrator"
 AGENT_NAME = "offer_orchestrator_agent"
+OFFER_PAYLOAD_STATE_KEY = "offer_orchestrator_payload"
+
+
+def merge_offer_payload(
+    query: str,
+    trend_briefs: List[Dict[str, Any]] | None,
+    customer_insights: List[Dict[str, Any]] | None,
+    event_calendar: Dict[str, Any] | None,
+) -> Dict[str, Any]:
+    return {
+        "research_topic": query,
+        "trend_briefs": list(trend_briefs or []),
+        "customer_insights": list(customer_insights or []),
+        "event_calendar": dict(event_calendar or {}),
+    }
 
 
-def build_offer_orchestrator_agent() -> LlmAgent:
-    instruction_path = Path(__file__).with_name("instruction.txt")
-    return build_llm_agent(
+def build_offer_orchestrator_agent() -> OfferPayloadMergeAgent:
+    from src.orchestrator.merge_agent import OfferPayloadMergeAgent
+
+    return OfferPayloadMergeAgent(
         name=AGENT_NAME,
         description=OfferOrchestratorAgent.description,
-        instruction_path=instruction_path,
     )
 
 
 def build_agent() -> SequentialAgent:
+    from google.adk.agents import SequentialAgent
+
     return SequentialAgent(
         name=ADK_ROOT_NAME,
         description=OfferOrchestratorAgent.description,
@@ -42,6 +54,10 @@ def build_agent() -> SequentialAgent:
     )
 
 
+def get_agent() -> SequentialAgent:
+    return get_or_build_agent(ADK_ROOT_NAME, build_agent)
+
+
 class OfferOrchestratorAgent:
     """Combines all upstream outputs into a single payload."""
 
@@ -55,18 +71,7 @@ class OfferOrchestratorAgent:
         customer_insights: List[Dict[str, Any]],
         event_calendar: Dict[str, Any],
     ) -> Dict[str, Any]:
-        payload = {
-            "research_topic": query,
-            "trend_briefs": trend_briefs,
-            "customer_insights": customer_insights,
-            "event_calendar": event_calendar,
-        }
-        payload_text = json.dumps(payload, indent=2)
-        events = run_agent(build_agent(), payload_text)
-        outputs = extract_final_responses(events)
-        orchestrator_text = outputs.get(AGENT_NAME, "")
-        orchestrator_payload = parse_json_payload(orchestrator_text)
-        return coerce_dict(orchestrator_payload)
-
-
-root_agent = build_agent()
+        return merge_offer_payload(query, trend_briefs, customer_insights, event_calendar)
+
+
+__getattr__ = lazy_root_agent(__name__, get_agent)
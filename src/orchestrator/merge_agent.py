@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import AsyncGenerator
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from src.customer_insights.sub_agents.profile_synthesizer.agent import (
+    NAME as PROFILE_SYNTHESIZER_NAME,
+)
+from src.event_planner.agent import AGENT_NAME as EVENT_PLANNER_AGENT_NAME
+from src.market_trends_analyst.sub_agents.research_synthesis.agent import (
+    NAME as RESEARCH_SYNTHESIS_NAME,
+)
+from src.orchestrator.agent import OFFER_PAYLOAD_STATE_KEY, merge_offer_payload
+from src.utils.adk_runner import (
+    coerce_dict,
+    coerce_list,
+    extract_final_responses,
+    parse_json_payload,
+)
+from src.utils.prompt_budget import (
+    OFFER_DESIGN_REQUEST,
+    OFFER_DESIGN_STAGE,
+    compact_prompt,
+    stage_token_budget,
+)
+
+
+class OfferPayloadMergeAgent(BaseAgent):
+    """Merges upstream stage outputs into the offer design payload without an LLM call.
+
+    Inside the marketing orchestrator pipeline the payload is built from the final
+    responses of the research synthesis, profile synthesizer and event planner agents.
+    Outputs missing from the current invocation are read from session state under
+    their payload key (how batch runs pass in a stage computed once per batch), and
+    finally from the user message, which run on its own is expected to already be a
+    payload in the same shape.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        user_text = _content_text(ctx.user_content)
+        provided = coerce_dict(parse_json_payload(user_text, prefer_keys=("research_topic",)))
+        query = provided.get("research_topic") or user_text
+
+        state = ctx.session.state
+        outputs = extract_final_responses(
+            event for event in ctx.session.events if event.invocation_id == ctx.invocation_id
+        )
+        trend_briefs = (
+            coerce_list(
+                parse_json_payload(
+                    outputs.get(RESEARCH_SYNTHESIS_NAME, ""), prefer_keys=("trend_briefs",)
+                ),
+                key="trend_briefs",
+            )
+            or coerce_list(state.get("trend_briefs"))
+            or coerce_list(provided.get("trend_briefs"))
+        )
+        customer_insights = (
+            coerce_list(
+                parse_json_payload(
+                    outputs.get(PROFILE_SYNTHESIZER_NAME, ""), prefer_keys=("customer_insights",)
+                ),
+                key="customer_insights",
+            )
+            or coerce_list(state.get("customer_insights"))
+            or coerce_list(provided.get("customer_insights"))
+        )
+        event_calendar = (
+            coerce_dict(
+                parse_json_payload(
+                    outputs.get(EVENT_PLANNER_AGENT_NAME, ""),
+                    prefer_keys=("high_velocity_events",),
+                )
+            )
+            or coerce_dict(state.get("event_calendar"))
+            or coerce_dict(provided.get("event_calendar"))
+        )
+
+        payload = merge_offer_payload(query, trend_briefs, customer_insights, event_calendar)
+        # Offer design reads this message, so it is sent compacted to the stage budget;
+        # the full payload stays in session state. The request is a separate last part
+        # so the payload stays in the cacheable prefix of offer design's model call.
+        prompt = compact_prompt(payload, budget=stage_token_budget(OFFER_DESIGN_STAGE))
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=prompt.text), types.Part(text=OFFER_DESIGN_REQUEST)],
+            ),
+            actions=EventActions(state_delta={OFFER_PAYLOAD_STATE_KEY: payload}),
+        )
+
+
+def _content_text(content: types.Content | None) -> str:
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text).strip()
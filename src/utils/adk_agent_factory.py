@@ -1,18 +1,73 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 import secrets
-from typing import Sequence
+from typing import Literal, Sequence, Tuple, Type
+import zlib
 
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
+from pydantic import BaseModel
 
-from src.utils.instruction_loader import load_instruction
+from src.utils.context_cache import (
+    CONTEXT_CACHE_ENV_VAR,
+    CONTEXT_CACHE_MIN_TOKENS_ENV_VAR,
+    with_context_cache,
+)
+from src.utils.instruction_loader import InstructionFile
+from src.utils.llm_governor import GOVERNOR_ENV_VAR, with_governor
+from src.utils.llm_replay import (
+    REPLAY_ENV_VAR,
+    REPLAY_LATENCY_ENV_VAR,
+    REPLAY_STRICT_ENV_VAR,
+    replay_mode,
+    with_replay,
+)
+from src.utils.llm_wrappers import resolve_model
+from src.utils.model_tiers import (
+    ADVANCED_MODEL_ENV_VAR,
+    ADVANCED_TIER,
+    ESCALATION_ENV_VAR,
+    FAST_MODEL_ENV_VAR,
+    FAST_TIER,
+    OUTPUT_ATTEMPTS_ENV_VAR,
+    EscalatingLlm,
+    OutputCheckFn,
+    RetryingLlm,
+    agent_tier,
+    escalation_enabled,
+    output_attempts,
+    tier_model,
+)
+from src.utils.output_schemas import SchemaCheck
+from src.utils.response_cache import (
+    CACHE_ENV_VAR,
+    CachedLlm,
+    get_response_cache,
+    response_cache_enabled,
+)
 
-DEFAULT_MODEL = "gemini-2.5-flash"
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_TOP_P = 0.9
 DEFAULT_TOP_K = 40
+DETERMINISTIC_SEED_ENV_VAR = "LLM_DETERMINISTIC_SEED"
+# Read when an agent is built rather than per call, together with ``<NAME>_MODEL_TIER``.
+BUILD_ENV_VARS = (
+    CACHE_ENV_VAR,
+    REPLAY_ENV_VAR,
+    REPLAY_LATENCY_ENV_VAR,
+    REPLAY_STRICT_ENV_VAR,
+    DETERMINISTIC_SEED_ENV_VAR,
+    FAST_MODEL_ENV_VAR,
+    ADVANCED_MODEL_ENV_VAR,
+    ESCALATION_ENV_VAR,
+    OUTPUT_ATTEMPTS_ENV_VAR,
+    GOVERNOR_ENV_VAR,
+    CONTEXT_CACHE_ENV_VAR,
+    CONTEXT_CACHE_MIN_TOKENS_ENV_VAR,
+)
 
 
 def build_llm_agent(
@@ -21,27 +76,113 @@ def build_llm_agent(
     description: str,
     instruction_path: Path,
     tools: Sequence[object] | None = None,
-    model: str = DEFAULT_MODEL,
+    model: str | BaseLlm | None = None,
+    tier: str = FAST_TIER,
+    output_schema: Type[BaseModel] | None = None,
+    output_check: OutputCheckFn | None = None,
     response_mime_type: str | None = "application/json",
     temperature: float = DEFAULT_TEMPERATURE,
     top_p: float = DEFAULT_TOP_P,
     top_k: int = DEFAULT_TOP_K,
+    response_cache: bool | None = None,
+    deterministic_seed: bool | None = None,
+    include_contents: Literal["default", "none"] = "default",
 ) -> LlmAgent:
-    instruction = load_instruction(instruction_path)
+    """Build an ``LlmAgent`` on its tier's model unless ``model`` is given.
+
+    ``output_schema`` is sent to the model as a structured-output constraint and, by
+    default, is also the ``output_check``. An answer failing the check is re-asked
+    with the validation error (``OUTPUT_VALIDATION_ATTEMPTS`` calls in total), then
+    fast-tier agents retry once on the advanced model (``MODEL_ESCALATION=false``
+    turns this off). All model calls go through the ``LLM_*`` governor, and Gemini
+    calls reuse model-side cached content for prefixes sent repeatedly
+    (``LLM_CONTEXT_CACHE``). ``include_contents="none"`` limits the request to the
+    current turn instead of the session history.
+    """
+    if response_cache is None:
+        response_cache = response_cache_enabled()
+    mode = replay_mode()
+    if deterministic_seed is None:
+        # A random seed is part of the request, so it would make every cache or replay
+        # lookup miss.
+        deterministic_seed = (
+            response_cache or mode is not None or _env_flag(DETERMINISTIC_SEED_ENV_VAR)
+        )
     config_kwargs = {
         "temperature": temperature,
         "topP": top_p,
         "topK": top_k,
-        "seed": secrets.randbelow(2**31),
+        "seed": agent_seed(name) if deterministic_seed else secrets.randbelow(2**31),
     }
     if response_mime_type:
         config_kwargs["responseMimeType"] = response_mime_type
     generate_content_config = types.GenerateContentConfig(**config_kwargs)
+    if output_check is None and output_schema is not None:
+        output_check = SchemaCheck(output_schema)
+    tier = agent_tier(name, tier)
+    if model is None:
+        model = tier_model(tier)
+    model_name = model if isinstance(model, str) else model.model
+    # Every real model call queues in the process-wide governor; replay never reaches it.
+    # Context caching sits innermost so recordings and cache keys hold the full request.
+    agent_model: str | BaseLlm = with_replay(
+        with_governor(with_context_cache(resolve_model(model))), mode
+    )
+    if output_check is not None:
+        agent_model = RetryingLlm(
+            model=model_name,
+            inner=resolve_model(agent_model),
+            check=output_check,
+            max_attempts=output_attempts(),
+        )
+    advanced_model = tier_model(ADVANCED_TIER)
+    if (
+        output_check is not None
+        and tier == FAST_TIER
+        and advanced_model != model_name
+        and escalation_enabled()
+    ):
+        agent_model = EscalatingLlm(
+            model=model_name,
+            inner=resolve_model(agent_model),
+            advanced=with_replay(
+                with_governor(with_context_cache(resolve_model(advanced_model))), mode
+            ),
+            check=output_check,
+        )
+    if response_cache:
+        agent_model = CachedLlm(
+            model=model_name,
+            inner=resolve_model(agent_model),
+            cache=get_response_cache(),
+        )
     return LlmAgent(
         name=name,
         description=description,
-        model=model,
-        instruction=instruction,
+        model=agent_model,
+        instruction=InstructionFile(instruction_path),
         tools=list(tools) if tools else [],
+        output_schema=output_schema,
         generate_content_config=generate_content_config,
+        include_contents=include_contents,
+    )
+
+
+def build_settings() -> Tuple[Tuple[str, str], ...]:
+    """The environment ``build_llm_agent`` bakes into an agent, as a hashable snapshot."""
+    return tuple(
+        sorted(
+            (name, value.strip())
+            for name, value in os.environ.items()
+            if name in BUILD_ENV_VARS or name.endswith("_MODEL_TIER")
+        )
     )
+
+
+def agent_seed(name: str) -> int:
+    """Stable per-agent seed used in deterministic mode."""
+    return zlib.crc32(name.encode("utf-8")) % 2**31
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").strip().lower() in ("1", "true", "yes", "on")
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict
+import concurrent.futures
 import json
+import os
 from pathlib import Path
-import re
+import queue
 import threading
 import uuid
-from typing import Any, Dict, Iterable
+from typing import (
+    Any,
+    AsyncIterator,
+    Coroutine,
+    Dict,
+    Iterable,
+    Iterator,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 from dotenv import load_dotenv
 from google.adk.agents.base_agent import BaseAgent
@@ -14,61 +27,233 @@ from google.adk.events import Event
 from google.adk.runners import InMemoryRunner
 from google.genai import types
 
+from src.utils.json_extract import JsonExtraction, extract_json
+from src.utils.llm_governor import LlmThrottledError
+from src.utils.tracing import tracing_plugins
+
 USER_ID = "local-user"
+ISOLATED_LOOP_ENV_VAR = "ADK_RUNNER_ISOLATED_LOOP"
+RUNNER_POOL_SIZE = 32
+
+T = TypeVar("T")
 
-_JSON_BLOCK_RE = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
 # Ensure local `.env` settings are available for direct Python/Streamlit runs.
 load_dotenv(PROJECT_ROOT / ".env", override=False)
 
+_RUNNER_POOL: "OrderedDict[int, Tuple[BaseAgent, InMemoryRunner]]" = OrderedDict()
+_RUNNER_POOL_LOCK = threading.Lock()
+
 
-def build_user_content(message: str) -> types.Content:
+def build_user_content(message: str | types.Content) -> types.Content:
+    if isinstance(message, types.Content):
+        return message
     return types.Content(role="user", parts=[types.Part(text=message)])
 
 
-def run_agent(agent: BaseAgent, query: str) -> list[Event]:
+def run_agent(
+    agent: BaseAgent, query: str | types.Content, *, isolated_loop: bool | None = None
+) -> list[Event]:
+    return run_sync(run_agent_async(agent, query), isolated_loop=isolated_loop)
+
+
+async def run_agent_async(
+    agent: BaseAgent, query: str | types.Content, *, state: Dict[str, Any] | None = None
+) -> list[Event]:
+    events = [event async for event in stream_agent_events(agent, query, state=state)]
+    if not events:
+        raise RuntimeError(
+            "Agent execution produced no events. Verify LLM credentials/configuration."
+        )
+    return events
+
+
+async def stream_agent_events(
+    agent: BaseAgent, query: str | types.Content, *, state: Dict[str, Any] | None = None
+) -> AsyncIterator[Event]:
+    """Yield the agent's events as they are produced instead of after the run.
+
+    ``query`` is the user message, or its ``Content`` when it has several parts.
+    ``state`` seeds the session state, e.g. with stage outputs computed elsewhere.
+    """
     try:
-        return _run_agent_in_thread(agent, query)
+        async for event in _stream_agent_events(agent, query, state=state):
+            yield event
     except Exception as error:
         raise _normalize_runner_error(error) from error
 
 
-async def _run_agent_async(agent: BaseAgent, query: str) -> list[Event]:
-    runner = InMemoryRunner(agent=agent)
+def run_sync(coro: Coroutine[Any, Any, T], *, isolated_loop: bool | None = None) -> T:
+    """Run a coroutine to completion from synchronous code.
+
+    By default the coroutine is scheduled on a long-lived background event loop.
+    ``isolated_loop=True`` (or ``ADK_RUNNER_ISOLATED_LOOP=true``) keeps the original
+    behaviour of a fresh thread and event loop per call.
+    """
+    if isolated_loop is None:
+        isolated_loop = _env_flag(ISOLATED_LOOP_ENV_VAR)
+    if isolated_loop or _BACKGROUND_LOOP.owns_current_thread():
+        # Blocking on the shared loop from one of its own callbacks would deadlock.
+        return _run_in_thread(coro)
+    return _BACKGROUND_LOOP.run(coro)
+
+
+def iterate_sync(
+    stream: AsyncIterator[T], *, isolated_loop: bool | None = None
+) -> Iterator[T]:
+    """Consume an async iterator from synchronous code, one item at a time.
+
+    The stream is driven by a single task (so context variables set by ADK's tracing
+    stay in one context) and each item is handed over as soon as it is produced.
+    """
+    if isolated_loop is None:
+        isolated_loop = _env_flag(ISOLATED_LOOP_ENV_VAR)
+    items: "queue.Queue[Tuple[bool, Any]]" = queue.Queue()
+    stop = threading.Event()
+
+    async def _pump() -> None:
+        try:
+            async for item in stream:
+                items.put((False, item))
+                if stop.is_set():
+                    break
+        except Exception as error:
+            items.put((True, error))
+            return
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        items.put((True, None))
+
+    future = None
+    if isolated_loop or _BACKGROUND_LOOP.owns_current_thread():
+        threading.Thread(target=asyncio.run, args=(_pump(),), daemon=True).start()
+    else:
+        future = _BACKGROUND_LOOP.submit(_pump())
+
+    try:
+        while True:
+            finished, value = items.get()
+            if not finished:
+                yield value
+            elif value is not None:
+                raise value
+            else:
+                return
+    finally:
+        stop.set()
+        if future is not None:
+            future.cancel()
+
+
+async def _stream_agent_events(
+    agent: BaseAgent, query: str | types.Content, *, state: Dict[str, Any] | None = None
+) -> AsyncIterator[Event]:
+    runner, pooled = _get_runner(agent)
     session_id = str(uuid.uuid4())
     await runner.session_service.create_session(
         app_name=runner.app_name,
         user_id=USER_ID,
         session_id=session_id,
-        state={},
+        state=dict(state or {}),
     )
 
-    events: list[Event] = []
-    async for event in runner.run_async(
-        user_id=USER_ID,
-        session_id=session_id,
-        new_message=build_user_content(query),
-    ):
-        events.append(event)
-
-    if not events:
-        raise RuntimeError(
-            "Agent execution produced no events. Verify LLM credentials/configuration."
+    try:
+        async for event in runner.run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=build_user_content(query),
+        ):
+            yield event
+    finally:
+        await runner.session_service.delete_session(
+            app_name=runner.app_name,
+            user_id=USER_ID,
+            session_id=session_id,
         )
-    return events
-
-
-def _run_agent_in_thread(agent: BaseAgent, query: str) -> list[Event]:
-    events: list[Event] = []
+        if not pooled:
+            await runner.close()
+
+
+def _get_runner(agent: BaseAgent) -> Tuple[InMemoryRunner, bool]:
+    """The runner for ``agent`` on the running loop, and whether it is pooled.
+
+    Runners are bound to the event loop they first run on. Only the long-lived background
+    loop reuses them; a per-call loop (``isolated_loop``, ``asyncio.run``) gets a
+    throwaway runner so short-lived loops never evict or pin pool entries.
+    """
+    loop = asyncio.get_running_loop()
+    if loop is not _BACKGROUND_LOOP.loop:
+        return InMemoryRunner(agent=agent, plugins=tracing_plugins()), False
+    # Entries keep the agent alive so its id cannot be reused by another tree.
+    key = id(agent)
+    with _RUNNER_POOL_LOCK:
+        entry = _RUNNER_POOL.get(key)
+        if entry is not None:
+            _RUNNER_POOL.move_to_end(key)
+            return entry[1], True
+        runner = InMemoryRunner(agent=agent, plugins=tracing_plugins())
+        _RUNNER_POOL[key] = (agent, runner)
+        while len(_RUNNER_POOL) > RUNNER_POOL_SIZE:
+            _RUNNER_POOL.popitem(last=False)
+        return runner, True
+
+
+def clear_runner_pool() -> None:
+    with _RUNNER_POOL_LOCK:
+        _RUNNER_POOL.clear()
+
+
+class _BackgroundLoop:
+    """A daemon thread running one asyncio loop for the lifetime of the process."""
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop | None:
+        return self._loop
+
+    def owns_current_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self.submit(coro).result()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                # Runners pooled for a dead loop can never run again.
+                clear_runner_pool()
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="adk-runner-loop", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+
+_BACKGROUND_LOOP = _BackgroundLoop()
+
+
+def _run_in_thread(coro: Coroutine[Any, Any, T]) -> T:
+    result: Any = None
     run_error: Exception | None = None
 
     def _target() -> None:
-        nonlocal events, run_error
+        nonlocal result, run_error
         loop = asyncio.new_event_loop()
         try:
             asyncio.set_event_loop(loop)
-            events = loop.run_until_complete(_run_agent_async(agent, query))
+            result = loop.run_until_complete(coro)
         except Exception as error:
             run_error = error
         finally:
@@ -84,7 +269,11 @@ def _run_agent_in_thread(agent: BaseAgent, query: str) -> list[Event]:
 
     if run_error is not None:
         raise run_error
-    return events
+    return result
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
 
 
 def _normalize_runner_error(error: Exception) -> RuntimeError:
@@ -101,6 +290,13 @@ def _normalize_runner_error(error: Exception) -> RuntimeError:
             "LLM credentials are missing. Set GOOGLE_API_KEY or configure Vertex AI "
             "(GOOGLE_GENAI_USE_VERTEXAI=true, GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION)."
         )
+    if isinstance(error, LlmThrottledError):
+        return RuntimeError(f"Gemini rate limit exceeded: {message}")
+    if "RESOURCE_EXHAUSTED" in message:
+        return RuntimeError(
+            "Gemini quota exhausted (429). Enable the LLM governor (LLM_GOVERNOR=true) or lower "
+            "LLM_REQUESTS_PER_MIN / LLM_MAX_CONCURRENCY and retry."
+        )
     if "API key not valid" in message or "PERMISSION_DENIED" in message:
         return RuntimeError(
             "LLM request was rejected. Verify GOOGLE_API_KEY/Vertex credentials and model access."
@@ -121,23 +317,14 @@ def extract_final_responses(events: Iterable[Event]) -> Dict[str, str]:
     return outputs
 
 
-def parse_json_payload(text: str) -> Any:
-    if not text:
-        return None
-    cleaned = _strip_code_fences(text).strip()
-    if not cleaned:
-        return None
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        match = _JSON_BLOCK_RE.search(cleaned)
-        if match:
-            snippet = match.group(0)
-            try:
-                return json.loads(snippet)
-            except json.JSONDecodeError:
-                return None
-    return None
+def parse_json_payload(text: str, prefer_keys: Sequence[str] = ()) -> Any:
+    extraction = extract_json_payload(text, prefer_keys)
+    return extraction.value if extraction is not None else None
+
+
+def extract_json_payload(text: str, prefer_keys: Sequence[str] = ()) -> JsonExtraction | None:
+    """Like ``parse_json_payload`` but also reports which local repairs were applied."""
+    return extract_json(text, prefer_keys)
 
 
 def coerce_list(payload: Any, key: str | None = None) -> list:
@@ -163,14 +350,3 @@ def _event_text(event: Event) -> str:
         part.text for part in event.content.parts if part.text and not part.thought
     ]
     return "\n".join(text_parts).strip()
-
-
-def _strip_code_fences(text: str) -> str:
-    if "```" not in text:
-        return text
-    lines = text.strip().splitlines()
-    if lines and lines[0].startswith("```"):
-        lines = lines[1:]
-    if lines and lines[-1].startswith("```"):
-        lines = lines[:-1]
-    return "\n".join(lines)
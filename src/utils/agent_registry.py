@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    from google.adk.agents.base_agent import BaseAgent
+
+AgentT = TypeVar("AgentT", bound="BaseAgent")
+
+_AGENTS: Dict[Hashable, "BaseAgent"] = {}
+_LOCK = threading.Lock()
+
+
+def get_or_build_agent(key: Hashable, builder: Callable[[], AgentT]) -> AgentT:
+    """Return the agent tree cached under ``key``, building it on first use.
+
+    Built trees are immutable configuration, so one instance is shared by every
+    request and thread. Instruction text is resolved per model call through
+    ``InstructionFile``, so edits to instruction files do not require a rebuild.
+    Model wrappers are chosen from the environment at build time, so the cache is
+    also keyed by those settings and changing e.g. ``LLM_REPLAY`` builds a new tree.
+    """
+    # Imported here: the factory pulls in ADK, which ``lazy_root_agent`` defers.
+    from src.utils.adk_agent_factory import build_settings
+
+    key = (key, build_settings())
+    agent = _AGENTS.get(key)
+    if agent is not None:
+        return agent  # type: ignore[return-value]
+    with _LOCK:
+        agent = _AGENTS.get(key)
+        if agent is None:
+            agent = builder()
+            _AGENTS[key] = agent
+        return agent  # type: ignore[return-value]
+
+
+def lazy_root_agent(module_name: str, get_agent: Callable[[], BaseAgent]) -> Callable[[str], Any]:
+    """A module ``__getattr__`` (PEP 562) that builds ``root_agent`` on first access.
+
+    ADK discovery reads ``root_agent`` from an app's ``agent`` module; resolving it
+    there instead of at import keeps imports free of file reads and agent building.
+    Agent modules import Google ADK inside their builders for the same reason.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name == "root_agent":
+            return get_agent()
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
+
+
+def clear_agent_registry() -> None:
+    with _LOCK:
+        _AGENTS.clear()
@@ -0,0 +1,533 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Set, Tuple
+import uuid
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+
+from src.utils.llm_wrappers import WrappedLlm
+from src.utils.prompt_budget import estimate_tokens
+from src.utils.response_cache import strip_call_ids
+
+CONTEXT_CACHE_ENV_VAR = "LLM_CONTEXT_CACHE"
+CONTEXT_CACHE_TTL_ENV_VAR = "LLM_CONTEXT_CACHE_TTL_S"
+CONTEXT_CACHE_MIN_TOKENS_ENV_VAR = "LLM_CONTEXT_CACHE_MIN_TOKENS"
+CONTEXT_CACHE_MIN_USES_ENV_VAR = "LLM_CONTEXT_CACHE_MIN_USES"
+CONTEXT_CACHE_MAX_ENTRIES_ENV_VAR = "LLM_CONTEXT_CACHE_MAX_ENTRIES"
+
+DEFAULT_TTL_S = 1800.0
+DEFAULT_MIN_USES = 2
+DEFAULT_MAX_ENTRIES = 64
+# Gemini rejects explicit caches below these sizes.
+DEFAULT_MIN_TOKENS = 2048
+_MIN_TOKENS_BY_MODEL = (("gemini-2.5-", 2048), ("gemini-3", 4096))
+CONTEXT_CACHE_METADATA_KEY = "context_cache"
+
+# A cache in use is extended once less than this share of its TTL is left.
+_REFRESH_FRACTION = 0.5
+# Caches this close to expiry are not handed out; the call could outlive them.
+_EXPIRY_MARGIN_S = 30.0
+_MAX_TRACKED_PREFIXES = 4096
+_MISSING_CACHE_CODES = {403, 404}
+
+
+def context_cache_enabled() -> bool:
+    return os.getenv(CONTEXT_CACHE_ENV_VAR, "true").strip().lower() not in (
+        "0",
+        "false",
+        "no",
+        "off",
+    )
+
+
+def min_cache_tokens(model: str) -> int:
+    """Smallest prefix worth caching for ``model`` (``LLM_CONTEXT_CACHE_MIN_TOKENS`` overrides)."""
+    configured = os.getenv(CONTEXT_CACHE_MIN_TOKENS_ENV_VAR, "").strip()
+    if configured:
+        return int(configured)
+    name = model.rsplit("/", maxsplit=1)[-1]
+    for model_prefix, tokens in _MIN_TOKENS_BY_MODEL:
+        if name.startswith(model_prefix):
+            return tokens
+    return DEFAULT_MIN_TOKENS
+
+
+@dataclass(frozen=True)
+class CachePrefix:
+    """The stable head of a request: what a model-side cache would hold."""
+
+    key: str
+    model: str
+    system_instruction: Any
+    tools: Any
+    tool_config: Any
+    contents: List[types.Content]
+    tokens: int
+
+
+def split_cache_prefix(llm_request: LlmRequest) -> Tuple[CachePrefix, List[types.Content]] | None:
+    """Split a request into its cacheable prefix and the contents sent each time.
+
+    The prefix is the system instruction, tools and everything before the request's
+    final part: earlier turns plus the leading parts of the last one. Callers that
+    want an upstream payload cached send it as its own part ahead of a short ask.
+    """
+    if not llm_request.contents:
+        return None
+    config = llm_request.config or types.GenerateContentConfig()
+    *earlier, last = llm_request.contents
+    parts = list(last.parts or ())
+    if len(parts) > 1:
+        prefix_contents = [*earlier, last.model_copy(update={"parts": parts[:-1]})]
+        rest = [last.model_copy(update={"parts": parts[-1:]})]
+    else:
+        prefix_contents, rest = list(earlier), [last]
+    model = llm_request.model or ""
+    material = {
+        "model": model,
+        "system_instruction": _dump(config.system_instruction),
+        "tools": [_dump(tool) for tool in config.tools or ()],
+        "tool_config": _dump(config.tool_config),
+        "contents": [strip_call_ids(_dump(content)) for content in prefix_contents],
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    # Counted like ``prompt_tokens``; the service has the final say when creating.
+    texts = [_text(config.system_instruction)]
+    for content in prefix_contents:
+        texts.extend(part.text for part in content.parts or () if part.text)
+    prefix = CachePrefix(
+        key=hashlib.sha256(encoded.encode("utf-8")).hexdigest(),
+        model=model,
+        system_instruction=config.system_instruction,
+        tools=config.tools,
+        tool_config=config.tool_config,
+        contents=prefix_contents,
+        tokens=estimate_tokens("\n".join(text for text in texts if text)),
+    )
+    return prefix, rest
+
+
+class GeminiContextCacheBackend:
+    """Explicit Gemini caches (``cachedContents``) managed through a model's ``api_client``."""
+
+    def __init__(self, model: Gemini) -> None:
+        self.model = model
+
+    async def create(self, prefix: CachePrefix, ttl_s: float) -> Tuple[str, float]:
+        """Create a cache for ``prefix``; returns its name and expiry (``time.time()``)."""
+        cached = await self.model.api_client.aio.caches.create(
+            model=prefix.model or self.model.model,
+            config=types.CreateCachedContentConfig(
+                contents=prefix.contents or None,
+                system_instruction=prefix.system_instruction,
+                tools=prefix.tools,
+                tool_config=prefix.tool_config,
+                ttl=f"{int(ttl_s)}s",
+                display_name=f"prefix-{prefix.key[:16]}",
+            ),
+        )
+        if not cached.name:
+            raise RuntimeError("The cache service returned no cache name.")
+        return cached.name, _expiry(cached.expire_time, ttl_s)
+
+    async def refresh(self, name: str, ttl_s: float) -> float:
+        cached = await self.model.api_client.aio.caches.update(
+            name=name, config=types.UpdateCachedContentConfig(ttl=f"{int(ttl_s)}s")
+        )
+        return _expiry(cached.expire_time, ttl_s)
+
+    async def delete(self, name: str) -> None:
+        await self.model.api_client.aio.caches.delete(name=name)
+
+
+class LocalContextCacheBackend:
+    """In-process stand-in for Gemini's cache service, for tests and benchmarks.
+
+    Pair it with ``StubLlm(context_cache=backend)``: the stub then answers requests
+    naming one of these caches with the cached tokens in its usage metadata, and
+    with 404 once the cache expired or was deleted, like the real service.
+    """
+
+    def __init__(self) -> None:
+        self._caches: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"created": 0, "refreshed": 0, "deleted": 0}
+
+    async def create(self, prefix: CachePrefix, ttl_s: float) -> Tuple[str, float]:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        expires_at = time.time() + ttl_s
+        with self._lock:
+            self._caches[name] = (prefix.tokens, expires_at)
+            self.stats["created"] += 1
+        return name, expires_at
+
+    async def refresh(self, name: str, ttl_s: float) -> float:
+        with self._lock:
+            if self._live(name) is None:
+                raise _not_found(name)
+            expires_at = time.time() + ttl_s
+            self._caches[name] = (self._caches[name][0], expires_at)
+            self.stats["refreshed"] += 1
+        return expires_at
+
+    async def delete(self, name: str) -> None:
+        with self._lock:
+            if self._caches.pop(name, None) is None:
+                raise _not_found(name)
+            self.stats["deleted"] += 1
+
+    def cached_tokens(self, name: str) -> int:
+        """Tokens held by cache ``name``; raises the service's 404 if it is gone."""
+        with self._lock:
+            tokens = self._live(name)
+        if tokens is None:
+            raise _not_found(name)
+        return tokens
+
+    def _live(self, name: str) -> int | None:
+        entry = self._caches.get(name)
+        if entry is None or entry[1] <= time.time():
+            self._caches.pop(name, None)
+            return None
+        return entry[0]
+
+
+@dataclass
+class _CacheEntry:
+    name: str
+    backend: Any
+    tokens: int
+    expires_at: float
+    hits: int = 0
+
+
+@dataclass
+class _PrefixUse:
+    uses: int = 0
+    # Latest latency of a call that sent the whole prefix; baseline for savings.
+    uncached_latency_s: float | None = None
+    retry_at: float = 0.0
+
+
+class ContextCacheRegistry:
+    """Lifetimes of the model-side caches this process created, keyed by prefix.
+
+    A prefix gets a cache the ``min_uses``-th time it is seen, so one-off prompts
+    never pay for cache storage. Caches live ``ttl_s`` and are extended while in
+    use; the least recently used are deleted beyond ``max_entries``. A prefix whose
+    cache could not be created is sent uncached for one TTL before trying again.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_s: float = DEFAULT_TTL_S,
+        min_uses: int = DEFAULT_MIN_USES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_s = max(ttl_s, 2 * _EXPIRY_MARGIN_S)
+        self.min_uses = max(min_uses, 1)
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._prefixes: "OrderedDict[str, _PrefixUse]" = OrderedDict()
+        self._creating: Set[str] = set()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "created": 0,
+            "create_failures": 0,
+            "refreshed": 0,
+            "expired": 0,
+            "evicted": 0,
+            "cached_tokens": 0,
+            "latency_saved_s": 0.0,
+        }
+
+    async def lookup(self, prefix: CachePrefix, backend: Any) -> _CacheEntry | None:
+        """The live cache for ``prefix``, creating it once the prefix is reused enough."""
+        now = time.time()
+        refresh = False
+        with self._lock:
+            use = self._prefixes.get(prefix.key) or _PrefixUse()
+            self._prefixes[prefix.key] = use
+            self._prefixes.move_to_end(prefix.key)
+            while len(self._prefixes) > _MAX_TRACKED_PREFIXES:
+                self._prefixes.popitem(last=False)
+            use.uses += 1
+            entry = self._entries.get(prefix.key)
+            if entry is not None and entry.expires_at - now <= _EXPIRY_MARGIN_S:
+                del self._entries[prefix.key]
+                self._counters["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(prefix.key)
+                entry.hits += 1
+                self._counters["hits"] += 1
+                refresh = entry.expires_at - now < self.ttl_s * _REFRESH_FRACTION
+            elif use.uses < self.min_uses or now < use.retry_at or prefix.key in self._creating:
+                self._counters["misses"] += 1
+                return None
+            else:
+                self._creating.add(prefix.key)
+        if entry is not None:
+            if refresh:
+                try:
+                    entry.expires_at = await entry.backend.refresh(entry.name, self.ttl_s)
+                    self._count("refreshed")
+                except Exception:
+                    # Still valid until its old expiry; the next lookup tries again.
+                    pass
+            return entry
+        return await self._create(prefix, backend)
+
+    def record(self, key: str, latency_s: float, *, cached: bool) -> float | None:
+        """Note a finished call's latency; returns the estimated time a cache hit saved."""
+        with self._lock:
+            use = self._prefixes.get(key)
+            if use is None:
+                return None
+            if not cached:
+                use.uncached_latency_s = latency_s
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._counters["cached_tokens"] += entry.tokens
+            if use.uncached_latency_s is None:
+                return None
+            saved_s = max(use.uncached_latency_s - latency_s, 0.0)
+            self._counters["latency_saved_s"] += saved_s
+            return saved_s
+
+    def discard(self, key: str) -> None:
+        """Forget a cache the service no longer has (expired or deleted elsewhere)."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._counters["expired"] += 1
+
+    async def clear(self) -> None:
+        """Delete every cache this registry created."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            await _delete_quietly(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **{
+                    name: round(value, 4) if isinstance(value, float) else int(value)
+                    for name, value in self._counters.items()
+                },
+                "live": len(self._entries),
+                "cached_tokens_live": sum(entry.tokens for entry in self._entries.values()),
+            }
+
+    async def _create(self, prefix: CachePrefix, backend: Any) -> _CacheEntry | None:
+        try:
+            name, expires_at = await backend.create(prefix, self.ttl_s)
+        except Exception:
+            with self._lock:
+                self._creating.discard(prefix.key)
+                self._prefixes[prefix.key].retry_at = time.time() + self.ttl_s
+                self._counters["create_failures"] += 1
+                self._counters["misses"] += 1
+            return None
+        evicted = []
+        with self._lock:
+            self._creating.discard(prefix.key)
+            entry = _CacheEntry(
+                name=name, backend=backend, tokens=prefix.tokens, expires_at=expires_at
+            )
+            self._entries[prefix.key] = entry
+            self._counters["created"] += 1
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1])
+                self._counters["evicted"] += 1
+        for old in evicted:
+            await _delete_quietly(old)
+        return entry
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+class ContextCachingLlm(WrappedLlm):
+    """Sends a request's stable prefix to ``inner`` as model-side cached content.
+
+    Requests whose prefix (see ``split_cache_prefix``) reaches ``min_tokens`` are
+    looked up in ``registry``; on a hit the system instruction, tools and prefix
+    contents are replaced by the cache's name. A cache the service has dropped is
+    forgotten and the call is sent in full. The final response records the cached
+    tokens and the estimated latency saved in ``custom_metadata``.
+    """
+
+    registry: Any
+    backend: Any
+    min_tokens: int = DEFAULT_MIN_TOKENS
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        split = split_cache_prefix(llm_request)
+        if split is None or split[0].tokens < self.min_tokens:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+        prefix, rest = split
+        registry: ContextCacheRegistry = self.registry
+        entry = await registry.lookup(prefix, self.backend)
+        if entry is not None:
+            started = time.monotonic()
+            yielded = False
+            try:
+                async for response in self.inner.generate_content_async(
+                    _with_cached_content(llm_request, entry.name, rest), stream=stream
+                ):
+                    if not response.partial:
+                        saved_s = registry.record(
+                            prefix.key, time.monotonic() - started, cached=True
+                        )
+                        response = _annotate(response, cache=entry.name, saved_s=saved_s)
+                    yielded = True
+                    yield response
+                return
+            except Exception as error:
+                if yielded or not _is_missing_cache(error):
+                    raise
+                registry.discard(prefix.key)
+        started = time.monotonic()
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            if not response.partial:
+                registry.record(prefix.key, time.monotonic() - started, cached=False)
+            yield response
+
+
+_DEFAULT_REGISTRY: ContextCacheRegistry | None = None
+_DEFAULT_REGISTRY_LOCK = threading.Lock()
+
+
+def get_context_cache_registry() -> ContextCacheRegistry:
+    """Process-wide registry configured from the ``LLM_CONTEXT_CACHE_*`` settings."""
+    global _DEFAULT_REGISTRY
+    with _DEFAULT_REGISTRY_LOCK:
+        if _DEFAULT_REGISTRY is None:
+            _DEFAULT_REGISTRY = ContextCacheRegistry(
+                ttl_s=float(os.getenv(CONTEXT_CACHE_TTL_ENV_VAR, DEFAULT_TTL_S)),
+                min_uses=int(os.getenv(CONTEXT_CACHE_MIN_USES_ENV_VAR, DEFAULT_MIN_USES)),
+                max_entries=int(os.getenv(CONTEXT_CACHE_MAX_ENTRIES_ENV_VAR, DEFAULT_MAX_ENTRIES)),
+            )
+        return _DEFAULT_REGISTRY
+
+
+def context_cache_stats() -> Dict[str, Any]:
+    """Hits, misses, live caches, cached tokens and latency saved by the process-wide registry."""
+    return get_context_cache_registry().stats() if _DEFAULT_REGISTRY is not None else {}
+
+
+async def release_context_caches() -> None:
+    """Delete the process-wide registry's caches instead of waiting for them to expire."""
+    if _DEFAULT_REGISTRY is not None:
+        await _DEFAULT_REGISTRY.clear()
+
+
+def with_context_cache(model: BaseLlm) -> BaseLlm:
+    """Cache ``model``'s stable prefixes on Gemini (unless ``LLM_CONTEXT_CACHE=false``)."""
+    if not context_cache_enabled() or not isinstance(model, Gemini):
+        return model
+    return ContextCachingLlm(
+        model=model.model,
+        inner=model,
+        registry=get_context_cache_registry(),
+        backend=GeminiContextCacheBackend(model),
+        min_tokens=min_cache_tokens(model.model),
+    )
+
+
+def _with_cached_content(
+    llm_request: LlmRequest, cache_name: str, contents: List[types.Content]
+) -> LlmRequest:
+    # The API rejects a system instruction, tools or tool config next to a cache.
+    config = (llm_request.config or types.GenerateContentConfig()).model_copy(
+        update={
+            "system_instruction": None,
+            "tools": None,
+            "tool_config": None,
+            "cached_content": cache_name,
+        }
+    )
+    return llm_request.model_copy(update={"config": config, "contents": contents})
+
+
+def _annotate(response: LlmResponse, *, cache: str, saved_s: float | None) -> LlmResponse:
+    return response.model_copy(
+        update={
+            "custom_metadata": {
+                **(response.custom_metadata or {}),
+                CONTEXT_CACHE_METADATA_KEY: {
+                    "cache": cache,
+                    "saved_s": round(saved_s, 4) if saved_s is not None else None,
+                },
+            },
+        }
+    )
+
+
+def _is_missing_cache(error: Exception) -> bool:
+    if not isinstance(error, errors.APIError) or error.code not in _MISSING_CACHE_CODES:
+        return False
+    return "cache" in str(error).lower()
+
+
+def _not_found(name: str) -> errors.ClientError:
+    return errors.ClientError(
+        404,
+        {
+            "error": {
+                "code": 404,
+                "message": f"CachedContent not found: {name}",
+                "status": "NOT_FOUND",
+            }
+        },
+    )
+
+
+async def _delete_quietly(entry: _CacheEntry) -> None:
+    try:
+        await entry.backend.delete(entry.name)
+    except Exception:
+        # Already gone; the service drops it at expiry either way.
+        pass
+
+
+def _expiry(expire_time: Any, ttl_s: float) -> float:
+    if expire_time is not None and hasattr(expire_time, "timestamp"):
+        return expire_time.timestamp()
+    return time.time() + ttl_s
+
+
+def _dump(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(_dump(value), default=str)
@@ -1,11 +1,52 @@
 from __future__ import annotations
 
 from pathlib import Path
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    from google.adk.agents.readonly_context import ReadonlyContext
+
+_CACHE: Dict[Path, Tuple[int, int, str]] = {}
+_CACHE_LOCK = threading.Lock()
 
 
 def load_instruction(path: str | Path) -> str:
-    """Load an instruction text file with safe defaults."""
+    """Load an instruction text file with safe defaults.
+
+    Contents are cached per path and re-read only when the file's mtime or size changes.
+    """
     file_path = Path(path)
-    if not file_path.exists():
+    try:
+        stat = file_path.stat()
+    except OSError:
         return ""
-    return file_path.read_text(encoding="utf-8").strip()
+    with _CACHE_LOCK:
+        cached = _CACHE.get(file_path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    text = file_path.read_text(encoding="utf-8").strip()
+    with _CACHE_LOCK:
+        _CACHE[file_path] = (stat.st_mtime_ns, stat.st_size, text)
+    return text
+
+
+def clear_instruction_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+class InstructionFile:
+    """ADK instruction provider that serves the current contents of an instruction file.
+
+    Lets a cached agent tree pick up edits to ``instruction.txt`` without a rebuild.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def __call__(self, context: ReadonlyContext) -> str:
+        return load_instruction(self.path)
+
+    def __repr__(self) -> str:
+        return f"InstructionFile({str(self.path)!r})"
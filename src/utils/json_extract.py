@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import re
+from typing import Any, Iterable, List, Sequence, Tuple
+
+_FENCE_LINE_RE = re.compile(r"^[ \t]*```[\w-]*[ \t]*$", re.MULTILINE)
+_OPENER_RE = re.compile(r"[{\[]")
+# Characters the bracket scanner has to look at; everything else is skipped in bulk.
+_STRUCTURAL_RE = re.compile(r"[\"'{}\[\]]")
+_STRING_END_RE = re.compile(r"[\"\\]")
+_SINGLE_STRING_END_RE = re.compile(r"['\\]")
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<punct>[{}\[\]:,])
+      | (?P<double>"(?:[^"\\]|\\.)*(?:"|\\?\Z))
+      | (?P<single>'(?:[^'\\]|\\.)*(?:'|\\?\Z))
+      | (?P<literal>[^\s{}\[\]:,"']+)
+    )""",
+    re.VERBOSE | re.DOTALL,
+)
+_JSON_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_JSON_LITERALS = {"true", "false", "null"}
+_SINGLE_QUOTE_OPENERS = "{[,:"
+_DECODER = json.JSONDecoder(strict=False)
+
+
+@dataclass(frozen=True)
+class JsonExtraction:
+    """Result of pulling a JSON value out of model output.
+
+    ``repairs`` names every local fix applied (for example ``trailing_commas`` or
+    ``closed_brackets``); it is empty when the text parsed as-is.
+    """
+
+    value: Any
+    repairs: Tuple[str, ...] = ()
+    start: int = 0
+    end: int = 0
+
+
+def extract_json(text: str, prefer_keys: Sequence[str] = ()) -> JsonExtraction | None:
+    """Find and parse the top-level JSON value in ``text``, repairing common defects.
+
+    Runs in linear time. Each top-level ``{`` / ``[`` is first handed to the C JSON
+    decoder; only when that fails is its span found by a bracket-balancing scan (which
+    ignores brackets inside strings) and locally repaired. Spans never overlap, so
+    every character is examined a bounded number of times. When several spans parse,
+    an object containing one of ``prefer_keys`` wins, then a span that parsed without
+    repairs, then the longest span.
+    """
+    if not text:
+        return None
+    repairs: List[str] = []
+    cleaned = text
+    if "```" in cleaned:
+        cleaned = _FENCE_LINE_RE.sub("", cleaned)
+        repairs.append("stripped_code_fences")
+    cleaned = cleaned.strip()
+    if not cleaned:
+        return None
+
+    best: Tuple[Tuple[int, int, int], JsonExtraction] | None = None
+    position = 0
+    while True:
+        opener = _OPENER_RE.search(cleaned, position)
+        if opener is None:
+            break
+        start = opener.start()
+        try:
+            value, end = _DECODER.raw_decode(cleaned, start)
+            extraction: JsonExtraction | None = JsonExtraction(value, (), start, end)
+        except (json.JSONDecodeError, RecursionError):
+            end = _span_end(cleaned, start)
+            extraction = _parse_repaired(cleaned, start, end)
+        position = max(end, start + 1)
+        if extraction is None:
+            continue
+        rank = (
+            int(_has_preferred_key(extraction.value, prefer_keys)),
+            int(not extraction.repairs),
+            end - start,
+        )
+        if best is None or rank > best[0]:
+            best = (rank, extraction)
+
+    if best is None:
+        return None
+    extraction = best[1]
+    return JsonExtraction(
+        extraction.value,
+        tuple(repairs) + extraction.repairs,
+        extraction.start,
+        extraction.end,
+    )
+
+
+def repair_json(snippet: str) -> Tuple[str, Tuple[str, ...]]:
+    """Rewrite a JSON-like snippet into valid JSON where a local fix exists.
+
+    Handles single-quoted strings, Python literals, unquoted keys, missing, doubled
+    and trailing commas, unterminated strings, dangling members and unclosed brackets.
+    """
+    repairs: List[str] = []
+    out: List[str] = []
+    stack: List[str] = []
+    for token, kind in _tokenize(snippet, repairs):
+        if kind == "close":
+            if not stack:
+                break
+            if out and out[-1] == ",":
+                out.pop()
+                _note(repairs, "trailing_commas")
+            expected = "}" if stack[-1] == "{" else "]"
+            if token != expected:
+                _note(repairs, "mismatched_brackets")
+            stack.pop()
+            out.append(expected)
+            if not stack:
+                break
+            continue
+        if token == "," and (not out or out[-1] in ("{", "[", ",")):
+            _note(repairs, "extra_commas")
+            continue
+        if kind in ("value", "open") and out and _ends_value(out[-1]):
+            out.append(",")
+            _note(repairs, "missing_commas")
+        if kind == "open":
+            stack.append(token)
+        out.append(token)
+
+    if stack:
+        _drop_dangling_tail(out, stack, repairs)
+        while stack:
+            out.append("}" if stack.pop() == "{" else "]")
+        _note(repairs, "closed_brackets")
+    return "".join(out), tuple(repairs)
+
+
+def _parse_repaired(text: str, start: int, end: int) -> JsonExtraction | None:
+    repaired, repairs = repair_json(text[start:end])
+    try:
+        value = json.loads(repaired, strict=False)
+    except (json.JSONDecodeError, RecursionError):
+        # Nesting beyond the interpreter's recursion limit is noise, not a payload.
+        return None
+    return JsonExtraction(value, repairs, start, end)
+
+
+def _span_end(text: str, start: int) -> int:
+    """Index just past the bracket that balances ``text[start]``, or ``len(text)``."""
+    depth = 0
+    position = start
+    length = len(text)
+    while position < length:
+        match = _STRUCTURAL_RE.search(text, position)
+        if match is None:
+            break
+        char = match.group(0)
+        position = match.end()
+        if char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return position
+        elif char == '"':
+            position = _skip_string(text, position, _STRING_END_RE, '"')
+        elif _previous_significant(text, match.start()) in _SINGLE_QUOTE_OPENERS:
+            # Apostrophes in unquoted text (e.g. Wendy's) do not open a string.
+            position = _skip_string(text, position, _SINGLE_STRING_END_RE, "'")
+    return length
+
+
+def _skip_string(text: str, position: int, end_re: re.Pattern[str], quote: str) -> int:
+    while True:
+        match = end_re.search(text, position)
+        if match is None:
+            return len(text)
+        if match.group(0) == quote:
+            return match.end()
+        position = match.end() + 1
+
+
+def _previous_significant(text: str, index: int) -> str:
+    index -= 1
+    while index >= 0 and text[index].isspace():
+        index -= 1
+    return text[index] if index >= 0 else ""
+
+
+def _tokenize(snippet: str, repairs: List[str]) -> Iterable[Tuple[str, str]]:
+    length = len(snippet)
+    for match in _TOKEN_RE.finditer(snippet):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        token = match.group(kind)
+        if kind == "punct":
+            if token in "{[":
+                yield token, "open"
+            elif token in "}]":
+                yield token, "close"
+            else:
+                yield token, "punct"
+        elif kind == "double":
+            if len(token) < 2 or not _closes_string(token, '"'):
+                # A dangling backslash would escape the quote we add.
+                token = token[:-1] if _odd_trailing_backslashes(token) else token
+                token += '"'
+                _note(repairs, "closed_string")
+            yield token, "value"
+        elif kind == "single":
+            closed = len(token) >= 2 and _closes_string(token, "'")
+            body = token[1:-1] if closed else token[1:]
+            if not closed:
+                body = body[:-1] if _odd_trailing_backslashes(body) else body
+                _note(repairs, "closed_string")
+            _note(repairs, "single_quotes")
+            yield json.dumps(body.replace("\\'", "'")), "value"
+        elif match.end() >= length and not _is_json_literal(token):
+            # Cut off mid-token (e.g. ``tru``); left raw so the tail repair drops it.
+            yield token, "value"
+        else:
+            yield _normalize_literal(token, repairs), "value"
+
+
+def _closes_string(token: str, quote: str) -> bool:
+    return token.endswith(quote) and not _odd_trailing_backslashes(token[:-1])
+
+
+def _odd_trailing_backslashes(token: str) -> bool:
+    return (len(token) - len(token.rstrip("\\"))) % 2 == 1
+
+
+def _normalize_literal(literal: str, repairs: List[str]) -> str:
+    if _is_json_literal(literal):
+        return literal
+    if literal in _PYTHON_LITERALS:
+        _note(repairs, "python_literals")
+        return _PYTHON_LITERALS[literal]
+    _note(repairs, "unquoted_strings")
+    return json.dumps(literal)
+
+
+def _is_json_literal(token: str) -> bool:
+    return token in _JSON_LITERALS or bool(_JSON_NUMBER_RE.fullmatch(token))
+
+
+def _ends_value(token: str) -> bool:
+    return token not in ("{", "[", ",", ":")
+
+
+def _drop_dangling_tail(out: List[str], stack: List[str], repairs: List[str]) -> None:
+    """Remove a trailing comma, colon, key or partial literal left by a truncation."""
+    while out:
+        last = out[-1]
+        if last in (",", ":"):
+            out.pop()
+        elif stack[-1] == "{" and last.startswith('"') and len(out) >= 2 and out[-2] in ("{", ","):
+            out.pop()
+        elif last not in ("{", "[", "}", "]") and not last.startswith('"') and not _is_json_literal(last):
+            out.pop()
+        else:
+            return
+        _note(repairs, "dropped_incomplete_member")
+
+
+def _has_preferred_key(value: Any, prefer_keys: Sequence[str]) -> bool:
+    return isinstance(value, dict) and any(key in value for key in prefer_keys)
+
+
+def _note(repairs: List[str], repair: str) -> None:
+    if repair not in repairs:
+        repairs.append(repair)
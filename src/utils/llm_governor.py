@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncGenerator, Awaitable, Deque, Dict, List, Tuple, TypeVar
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors
+
+from src.utils.llm_wrappers import WrappedLlm
+from src.utils.prompt_budget import prompt_tokens
+
+GOVERNOR_ENV_VAR = "LLM_GOVERNOR"
+REQUESTS_PER_MIN_ENV_VAR = "LLM_REQUESTS_PER_MIN"
+TOKENS_PER_MIN_ENV_VAR = "LLM_TOKENS_PER_MIN"
+INITIAL_CONCURRENCY_ENV_VAR = "LLM_INITIAL_CONCURRENCY"
+MAX_CONCURRENCY_ENV_VAR = "LLM_MAX_CONCURRENCY"
+THROTTLE_RETRIES_ENV_VAR = "LLM_THROTTLE_RETRIES"
+
+INTERACTIVE_LANE = "interactive"
+BATCH_LANE = "batch"
+# Highest priority first; a free slot always goes to the first non-empty lane.
+LANES = (INTERACTIVE_LANE, BATCH_LANE)
+
+DEFAULT_REQUESTS_PER_MIN = 300
+DEFAULT_TOKENS_PER_MIN = 1_000_000
+DEFAULT_INITIAL_CONCURRENCY = 8
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_THROTTLE_RETRIES = 4
+# Reserved for the answer when the request sets no ``max_output_tokens``; the bucket
+# is settled against the reported usage afterwards.
+DEFAULT_OUTPUT_TOKENS = 1024
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 32.0
+GOVERNOR_METADATA_KEY = "governor"
+
+_THROTTLE_CODES = {429, 503}
+_THROTTLE_STATUSES = {"429", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE"}
+_WAIT_SAMPLES = 512
+
+T = TypeVar("T")
+
+_LANE: ContextVar[str] = ContextVar("llm_lane", default=INTERACTIVE_LANE)
+
+
+class LlmThrottledError(RuntimeError):
+    """The model kept answering 429/503 after every backoff retry."""
+
+
+def governor_enabled() -> bool:
+    return os.getenv(GOVERNOR_ENV_VAR, "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def current_lane() -> str:
+    return _LANE.get()
+
+
+async def run_in_lane(lane: str, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable`` in its own task, so the model calls it makes queue in ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane '{lane}'; expected one of {', '.join(LANES)}.")
+
+    async def _run() -> T:
+        _LANE.set(lane)
+        return await awaitable
+
+    return await asyncio.ensure_future(_run())
+
+
+class TokenBucket:
+    """Refills ``per_min / 60`` units per second up to ``capacity``; ``per_min=0`` is unlimited.
+
+    The level may go negative when a request used more than it reserved; later
+    requests then wait for the debt to refill.
+    """
+
+    def __init__(self, per_min: float, capacity: float | None = None) -> None:
+        self.rate_per_s = max(per_min, 0) / 60
+        self.capacity = capacity if capacity is not None else max(per_min / 4, 1)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate_per_s == 0
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate_per_s
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level = min(self.level + amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.level + (now - self._updated) * self.rate_per_s, self.capacity)
+        self._updated = now
+
+
+class _LaneMetrics:
+    def __init__(self) -> None:
+        self.queued = 0
+        self.max_queued = 0
+        self.requests = 0
+        self.throttles = 0
+        self.retries = 0
+        self.wait_s_total = 0.0
+        self.waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.waits)
+        return {
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "requests": self.requests,
+            "throttles": self.throttles,
+            "retries": self.retries,
+            "wait_s_total": round(self.wait_s_total, 4),
+            "wait_p50_s": round(_percentile(ordered, 0.5), 4),
+            "wait_p95_s": round(_percentile(ordered, 0.95), 4),
+            "wait_max_s": round(ordered[-1], 4) if ordered else 0.0,
+        }
+
+
+class LlmGovernor:
+    """Admission control for every model call in the process.
+
+    A call first takes a concurrency slot; free slots go to the highest-priority
+    lane with waiters, first come first served within a lane. It then waits for
+    the request and token buckets. The slot limit adapts AIMD-style: +1 per limit's
+    worth of successful calls, halved on a throttled call (once per round of calls
+    already in flight when the limit last dropped). Slots are shared across event
+    loops, so the UI's background loop and a service loop draw from one budget.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_min: float = DEFAULT_REQUESTS_PER_MIN,
+        tokens_per_min: float = DEFAULT_TOKENS_PER_MIN,
+        initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_THROTTLE_RETRIES,
+    ) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = float(min(max(initial_concurrency, 1), self.max_concurrency))
+        self.max_retries = max(max_retries, 0)
+        self.requests = TokenBucket(requests_per_min)
+        self.tokens = TokenBucket(tokens_per_min)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: Dict[str, Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {
+            lane: deque() for lane in LANES
+        }
+        self._metrics = {lane: _LaneMetrics() for lane in LANES}
+        self._lock = threading.Lock()
+
+    async def acquire(self, lane: str, tokens: int) -> float:
+        """Wait for a slot and rate budget for a call of ``tokens``; returns the wait."""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        waiter: asyncio.Future | None = None
+        with self._lock:
+            metrics = self._metrics[lane]
+            if self.in_flight < int(self.limit) and not self._waiting_ahead(lane):
+                self.in_flight += 1
+            else:
+                waiter = loop.create_future()
+                self._waiters[lane].append((loop, waiter))
+                metrics.queued += 1
+                metrics.max_queued = max(metrics.max_queued, metrics.queued)
+        if waiter is not None:
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if (loop, waiter) in self._waiters[lane]:
+                        self._waiters[lane].remove((loop, waiter))
+                        metrics.queued -= 1
+                    elif waiter.done() and not waiter.cancelled():
+                        self._release_slot()
+                raise
+        try:
+            while True:
+                with self._lock:
+                    delay = max(self.requests.delay_for(1), self.tokens.delay_for(tokens))
+                    if delay == 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        break
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._release_slot()
+            raise
+        waited = time.monotonic() - started
+        with self._lock:
+            metrics.requests += 1
+            metrics.wait_s_total += waited
+            metrics.waits.append(waited)
+        return waited
+
+    def release(
+        self, lane: str, started: float, *, throttled: bool, tokens_reserved: int, tokens_used: int
+    ) -> None:
+        """Return the slot of a call started at ``started`` (``time.monotonic()``)."""
+        with self._lock:
+            if tokens_used > tokens_reserved:
+                self.tokens.take(tokens_used - tokens_reserved)
+            else:
+                self.tokens.give_back(tokens_reserved - tokens_used)
+            if throttled:
+                self._metrics[lane].throttles += 1
+                # Throttles from calls sent before the last cut describe the old limit.
+                if started >= self._last_decrease:
+                    self.limit = max(self.limit / 2, 1.0)
+                    self._last_decrease = time.monotonic()
+            else:
+                self.limit = min(self.limit + 1 / self.limit, float(self.max_concurrency))
+            self._release_slot()
+
+    def count_retry(self, lane: str) -> None:
+        with self._lock:
+            self._metrics[lane].retries += 1
+
+    def backoff_s(self, attempt: int, retry_after_s: float | None = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's retry hint."""
+        delay = random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (attempt - 1)))
+        return max(delay, retry_after_s or 0.0)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "requests_available": (
+                    None if self.requests.unlimited else round(self.requests.level, 2)
+                ),
+                "tokens_available": None if self.tokens.unlimited else int(self.tokens.level),
+                "lanes": {lane: metrics.snapshot() for lane, metrics in self._metrics.items()},
+            }
+
+    def _waiting_ahead(self, lane: str) -> bool:
+        for other in LANES:
+            if self._waiters[other]:
+                return True
+            if other == lane:
+                return False
+        return False
+
+    def _release_slot(self) -> None:
+        # Called with the lock held.
+        self.in_flight -= 1
+        while self.in_flight < int(self.limit):
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.in_flight += 1
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._hand_over, future)
+
+    def _next_waiter(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Future] | None:
+        for lane in LANES:
+            if self._waiters[lane]:
+                self._metrics[lane].queued -= 1
+                return self._waiters[lane].popleft()
+        return None
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        if future.done():
+            # The waiter was cancelled after its slot was granted.
+            with self._lock:
+                self._release_slot()
+            return
+        future.set_result(None)
+
+
+class GovernedLlm(WrappedLlm):
+    """Sends every call to ``inner`` through ``governor``, retrying throttled calls.
+
+    A 429/503 before any response was yielded is retried with jittered backoff, up
+    to the governor's ``max_retries``, then raised as ``LlmThrottledError``. The
+    final response records the lane, queue wait and retries in ``custom_metadata``.
+    """
+
+    governor: Any
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        governor: LlmGovernor = self.governor
+        lane = current_lane()
+        config = llm_request.config
+        reserved = prompt_tokens(llm_request) + (
+            (config.max_output_tokens if config else None) or DEFAULT_OUTPUT_TOKENS
+        )
+        waited_s = 0.0
+        retries = 0
+        while True:
+            waited_s += await governor.acquire(lane, reserved)
+            started = time.monotonic()
+            used = reserved
+            throttled = False
+            yielded = False
+            try:
+                async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                    if not yielded and _is_throttle_response(response):
+                        throttled = True
+                        break
+                    if not response.partial:
+                        usage = response.usage_metadata
+                        if usage is not None and usage.total_token_count:
+                            used = usage.total_token_count
+                        response = response.model_copy(
+                            update={
+                                "custom_metadata": {
+                                    **(response.custom_metadata or {}),
+                                    GOVERNOR_METADATA_KEY: {
+                                        "lane": lane,
+                                        "wait_s": round(waited_s, 4),
+                                        "retries": retries,
+                                    },
+                                },
+                            }
+                        )
+                    yielded = True
+                    yield response
+            except Exception as error:
+                if yielded or not _is_throttle(error):
+                    raise
+                throttled = True
+                retry_after_s = _retry_after_s(error)
+            else:
+                retry_after_s = None
+            finally:
+                governor.release(
+                    lane, started, throttled=throttled, tokens_reserved=reserved, tokens_used=used
+                )
+            if not throttled:
+                return
+            if retries >= governor.max_retries:
+                raise LlmThrottledError(
+                    f"Model '{llm_request.model or self.model}' is still rate limited after "
+                    f"{retries} retries; lower {REQUESTS_PER_MIN_ENV_VAR} or "
+                    f"{MAX_CONCURRENCY_ENV_VAR}, or retry later."
+                )
+            retries += 1
+            governor.count_retry(lane)
+            delay = governor.backoff_s(retries, retry_after_s)
+            waited_s += delay
+            await asyncio.sleep(delay)
+
+
+_DEFAULT_GOVERNOR: LlmGovernor | None = None
+_DEFAULT_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_llm_governor() -> LlmGovernor:
+    """Process-wide governor configured from the ``LLM_*`` rate and concurrency settings."""
+    global _DEFAULT_GOVERNOR
+    with _DEFAULT_GOVERNOR_LOCK:
+        if _DEFAULT_GOVERNOR is None:
+            _DEFAULT_GOVERNOR = LlmGovernor(
+                requests_per_min=float(
+                    os.getenv(REQUESTS_PER_MIN_ENV_VAR, DEFAULT_REQUESTS_PER_MIN)
+                ),
+                tokens_per_min=float(os.getenv(TOKENS_PER_MIN_ENV_VAR, DEFAULT_TOKENS_PER_MIN)),
+                initial_concurrency=int(
+                    os.getenv(INITIAL_CONCURRENCY_ENV_VAR, DEFAULT_INITIAL_CONCURRENCY)
+                ),
+                max_concurrency=int(os.getenv(MAX_CONCURRENCY_ENV_VAR, DEFAULT_MAX_CONCURRENCY)),
+                max_retries=int(os.getenv(THROTTLE_RETRIES_ENV_VAR, DEFAULT_THROTTLE_RETRIES)),
+            )
+        return _DEFAULT_GOVERNOR
+
+
+def governor_metrics() -> Dict[str, Any]:
+    """Concurrency limit, bucket levels and per-lane queue depth, waits and throttles."""
+    return get_llm_governor().metrics() if _DEFAULT_GOVERNOR is not None else {}
+
+
+def with_governor(model: BaseLlm) -> BaseLlm:
+    """Route ``model``'s calls through the process-wide governor (unless ``LLM_GOVERNOR=false``)."""
+    if not governor_enabled():
+        return model
+    return GovernedLlm(model=model.model, inner=model, governor=get_llm_governor())
+
+
+def _is_throttle(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in _THROTTLE_CODES or str(error.status) in _THROTTLE_STATUSES
+    return "RESOURCE_EXHAUSTED" in str(error)
+
+
+def _is_throttle_response(response: LlmResponse) -> bool:
+    return str(response.error_code or "") in _THROTTLE_STATUSES
+
+
+def _retry_after_s(error: Exception) -> float | None:
+    # Gemini 429s carry a google.rpc.RetryInfo detail such as {"retryDelay": "17s"}.
+    match = re.search(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s", str(error))
+    return float(match.group(1)) if match else None
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(math.ceil(fraction * len(ordered)) - 1, len(ordered) - 1)]
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.utils.llm_wrappers import WrappedLlm, request_agent_name
+from src.utils.response_cache import dump_config, request_cache_key, strip_call_ids
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+REPLAY_ENV_VAR = "LLM_REPLAY"
+REPLAY_DIR_ENV_VAR = "LLM_REPLAY_DIR"
+REPLAY_LATENCY_ENV_VAR = "LLM_REPLAY_LATENCY_SCALE"
+REPLAY_STRICT_ENV_VAR = "LLM_REPLAY_STRICT"
+
+RECORD_MODE = "record"
+REPLAY_MODE = "replay"
+REPLAY_MODES = (RECORD_MODE, REPLAY_MODE)
+
+DEFAULT_REPLAY_DIR = PROJECT_ROOT / ".cache" / "llm_replay"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+# Request fields that never change the model's answer and would only bloat the archive.
+_CONFIG_RECORD_EXCLUDE = {"labels", "http_options"}
+
+
+class ReplayMissError(LookupError):
+    """A replayed run asked for a model response that was never recorded."""
+
+
+def replay_mode() -> str | None:
+    """``record`` or ``replay`` from ``LLM_REPLAY``; anything else disables it."""
+    mode = os.getenv(REPLAY_ENV_VAR, "").strip().lower()
+    return mode if mode in REPLAY_MODES else None
+
+
+def replay_key(llm_request: LlmRequest) -> str:
+    """``request_cache_key`` with the contents taken in a canonical order.
+
+    Parallel stages finish in any order, so the same run can put its sub-agents'
+    outputs into a later agent's history in a different order each time.
+    """
+    contents = sorted(
+        llm_request.contents,
+        key=lambda content: json.dumps(
+            strip_call_ids(content.model_dump(mode="json", exclude_none=True)), sort_keys=True
+        ),
+    )
+    return request_cache_key(llm_request.model_copy(update={"contents": contents}))
+
+
+def request_turn(llm_request: LlmRequest) -> int:
+    """Number of model turns already in the request; 0 for an agent's first call."""
+    return sum(1 for content in llm_request.contents if content.role == "model")
+
+
+class ReplayArchive:
+    """Recorded model exchanges, one gzip-compressed JSONL file per agent.
+
+    Each line holds the request (without labels), its content hash, the agent's turn
+    number and every response the model yielded with its offset from the start of
+    the call. Records are appended as new gzip members, so recording never rewrites
+    the file; the latest record for a key wins on replay.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_REPLAY_DIR) -> None:
+        self.directory = Path(directory)
+        self._by_key: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_turn: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, agent_name: str, key: str, turn: int, *, strict: bool = True
+    ) -> Dict[str, Any] | None:
+        """Record for ``key``; unless ``strict``, fall back to the agent's same turn.
+
+        The fallback covers requests whose tool results differ from the recording
+        (e.g. live search), which would otherwise change every later hash. It can
+        serve a response recorded for another query, so it is opt-in.
+        """
+        with self._lock:
+            self._ensure_loaded(agent_name)
+            record = self._by_key[agent_name].get(key)
+            if record is None and not strict:
+                record = self._by_turn[agent_name].get(turn)
+            return record
+
+    def append(self, record: Dict[str, Any]) -> None:
+        agent_name = record["agent"]
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._ensure_loaded(agent_name)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self._path(agent_name), "at", encoding="utf-8") as handle:
+                handle.write(line)
+            self._index(record)
+
+    def agents(self) -> List[str]:
+        return sorted(
+            path.name[: -len(ARCHIVE_SUFFIX)] for path in self.directory.glob(f"*{ARCHIVE_SUFFIX}")
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_key.clear()
+            self._by_turn.clear()
+            for path in self.directory.glob(f"*{ARCHIVE_SUFFIX}"):
+                path.unlink(missing_ok=True)
+
+    def _path(self, agent_name: str) -> Path:
+        return self.directory / f"{agent_name or 'unknown'}{ARCHIVE_SUFFIX}"
+
+    def _ensure_loaded(self, agent_name: str) -> None:
+        if agent_name in self._by_key:
+            return
+        self._by_key[agent_name] = {}
+        self._by_turn[agent_name] = {}
+        path = self._path(agent_name)
+        if not path.exists():
+            return
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        self._index(json.loads(line))
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue
+        except (OSError, EOFError):
+            # A run killed mid-write leaves a truncated last member; keep what was read.
+            return
+
+    def _index(self, record: Dict[str, Any]) -> None:
+        agent_name = record["agent"]
+        self._by_key[agent_name][record["key"]] = record
+        self._by_turn[agent_name][int(record["turn"])] = record
+
+
+class RecordingLlm(WrappedLlm):
+    """Calls ``inner`` and appends every request/response exchange to ``archive``."""
+
+    archive: ReplayArchive
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        started = time.perf_counter()
+        responses: List[Dict[str, Any]] = []
+        failed = False
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            failed = failed or bool(response.error_code)
+            responses.append(
+                {
+                    "offset_s": round(time.perf_counter() - started, 4),
+                    "response": response.model_dump(mode="json", exclude_none=True),
+                }
+            )
+            yield response
+        if responses and not failed:
+            self.archive.append(_record(llm_request, responses))
+
+
+class ReplayLlm(WrappedLlm):
+    """Serves recorded responses from ``archive`` without calling ``inner``.
+
+    ``latency_scale`` replays each response at its recorded offset multiplied by the
+    scale (``0`` for full speed, ``1`` for the original timing).
+    """
+
+    archive: ReplayArchive
+    latency_scale: float = 0.0
+    strict: bool = True
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        agent_name = request_agent_name(llm_request)
+        key = replay_key(llm_request)
+        record = self.archive.lookup(
+            agent_name, key, request_turn(llm_request), strict=self.strict
+        )
+        if record is None:
+            raise ReplayMissError(
+                f"No recorded response for agent '{agent_name or 'unknown'}' "
+                f"(request {key[:12]}) in {self.archive.directory}. "
+                f"Record it first with {REPLAY_ENV_VAR}={RECORD_MODE}."
+            )
+        elapsed = 0.0
+        for item in record["responses"]:
+            if self.latency_scale > 0:
+                delay = item["offset_s"] * self.latency_scale - elapsed
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    elapsed += delay
+            yield LlmResponse.model_validate(item["response"])
+
+
+_ARCHIVES: Dict[Path, ReplayArchive] = {}
+_ARCHIVES_LOCK = threading.Lock()
+
+
+def get_replay_archive(directory: str | Path | None = None) -> ReplayArchive:
+    """Process-wide archive for ``directory`` (default: ``LLM_REPLAY_DIR``)."""
+    path = Path(directory or os.getenv(REPLAY_DIR_ENV_VAR) or DEFAULT_REPLAY_DIR).resolve()
+    with _ARCHIVES_LOCK:
+        archive = _ARCHIVES.get(path)
+        if archive is None:
+            archive = ReplayArchive(path)
+            _ARCHIVES[path] = archive
+        return archive
+
+
+def with_replay(model: BaseLlm, mode: str | None = None) -> BaseLlm:
+    """Wrap ``model`` for recording or replay according to ``mode`` / ``LLM_REPLAY``."""
+    mode = mode or replay_mode()
+    if mode == RECORD_MODE:
+        return RecordingLlm(model=model.model, inner=model, archive=get_replay_archive())
+    if mode == REPLAY_MODE:
+        return ReplayLlm(
+            model=model.model,
+            inner=model,
+            archive=get_replay_archive(),
+            latency_scale=_latency_scale(),
+            strict=os.getenv(REPLAY_STRICT_ENV_VAR, "true").strip().lower()
+            not in ("0", "false", "no", "off"),
+        )
+    return model
+
+
+def _record(llm_request: LlmRequest, responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "agent": request_agent_name(llm_request),
+        "key": replay_key(llm_request),
+        "turn": request_turn(llm_request),
+        "recorded_at": round(time.time(), 3),
+        "request": {
+            "model": llm_request.model,
+            "config": dump_config(llm_request.config, exclude=_CONFIG_RECORD_EXCLUDE),
+            "contents": [
+                content.model_dump(mode="json", exclude_none=True)
+                for content in llm_request.contents
+            ],
+        },
+        "responses": responses,
+    }
+
+
+def _latency_scale() -> float:
+    raw = os.getenv(REPLAY_LATENCY_ENV_VAR, "").strip().lower()
+    if raw in ("original", "recorded"):
+        return 1.0
+    try:
+        return max(float(raw), 0.0) if raw else 0.0
+    except ValueError:
+        return 0.0
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+AGENT_NAME_LABEL = "adk_agent_name"
+
+
+class WrappedLlm(BaseLlm):
+    """Base for models that add behaviour around another model's calls.
+
+    Subclasses override ``generate_content_async`` and delegate to ``inner``.
+    """
+
+    inner: BaseLlm
+
+    @property
+    def capabilities(self):  # type: ignore[override]
+        return self.inner.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            yield response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+def resolve_model(model: str | BaseLlm) -> BaseLlm:
+    if isinstance(model, BaseLlm):
+        return model
+    return LLMRegistry.new_llm(model)
+
+
+def request_agent_name(llm_request: LlmRequest) -> str:
+    labels = llm_request.config.labels if llm_request.config else None
+    return (labels or {}).get(AGENT_NAME_LABEL, "")
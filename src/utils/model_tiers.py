@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, dataclass
+import os
+import threading
+import time
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from src.utils.json_extract import extract_json
+from src.utils.llm_wrappers import WrappedLlm, request_agent_name
+
+FAST_TIER = "fast"
+ADVANCED_TIER = "advanced"
+MODEL_TIERS = (FAST_TIER, ADVANCED_TIER)
+
+FAST_MODEL_ENV_VAR = "GEN_FAST_MODEL"
+ADVANCED_MODEL_ENV_VAR = "GEN_ADVANCED_MODEL"
+ESCALATION_ENV_VAR = "MODEL_ESCALATION"
+OUTPUT_ATTEMPTS_ENV_VAR = "OUTPUT_VALIDATION_ATTEMPTS"
+
+DEFAULT_FAST_MODEL = "gemini-2.5-flash"
+DEFAULT_ADVANCED_MODEL = "gemini-2.5-pro"
+_TIER_DEFAULTS = {
+    FAST_TIER: (FAST_MODEL_ENV_VAR, DEFAULT_FAST_MODEL),
+    ADVANCED_TIER: (ADVANCED_MODEL_ENV_VAR, DEFAULT_ADVANCED_MODEL),
+}
+
+ESCALATION_METADATA_KEY = "escalation"
+RETRIES_METADATA_KEY = "output_retries"
+DEFAULT_OUTPUT_ATTEMPTS = 2
+MAX_ESCALATION_RECORDS = 256
+
+RETRY_PROMPT = (
+    "Your previous answer did not pass validation: {reason}. "
+    "Reply again with only the corrected JSON in the required format."
+)
+
+# Repairs that mean the model stopped mid-answer rather than formatted it loosely.
+_TRUNCATION_REPAIRS = {"closed_brackets", "closed_string", "dropped_incomplete_member"}
+
+OutputCheckFn = Callable[[str], Optional[str]]
+
+
+def tier_model(tier: str) -> str:
+    """Model name for ``tier`` from ``GEN_FAST_MODEL`` / ``GEN_ADVANCED_MODEL``."""
+    env_var, default = _TIER_DEFAULTS[tier]
+    return os.getenv(env_var, "").strip() or default
+
+
+def agent_tier(name: str, default: str = FAST_TIER) -> str:
+    """Tier for agent ``name``; ``<NAME>_MODEL_TIER`` overrides the agent's default."""
+    tier = os.getenv(f"{name.upper()}_MODEL_TIER", "").strip().lower()
+    return tier if tier in MODEL_TIERS else default
+
+
+def escalation_enabled() -> bool:
+    return os.getenv(ESCALATION_ENV_VAR, "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def output_attempts() -> int:
+    """Model calls allowed per answer that fails validation (``OUTPUT_VALIDATION_ATTEMPTS``)."""
+    try:
+        return max(int(os.getenv(OUTPUT_ATTEMPTS_ENV_VAR, DEFAULT_OUTPUT_ATTEMPTS)), 1)
+    except ValueError:
+        return DEFAULT_OUTPUT_ATTEMPTS
+
+
+@dataclass(frozen=True)
+class OutputCheck:
+    """Validates an agent's final text; returns the failure reason or ``None``.
+
+    The text must hold a JSON object that was not cut off. With ``key`` set, that key
+    must be present; when its value is a list it needs ``min_items`` entries, each
+    with non-empty ``item_fields``.
+    """
+
+    key: str | None = None
+    min_items: int = 0
+    item_fields: Tuple[str, ...] = ()
+
+    def __call__(self, text: str) -> str | None:
+        extraction = extract_json(text, prefer_keys=(self.key,) if self.key else ())
+        if extraction is None or not isinstance(extraction.value, dict):
+            return "no JSON object in output"
+        truncated = _TRUNCATION_REPAIRS.intersection(extraction.repairs)
+        if truncated:
+            return f"truncated JSON ({', '.join(sorted(truncated))})"
+        if self.key is None:
+            return None
+        value = extraction.value.get(self.key)
+        if value is None:
+            return f"missing '{self.key}'"
+        if not isinstance(value, list):
+            return None
+        if len(value) < self.min_items:
+            return f"'{self.key}' has {len(value)} item(s), expected {self.min_items}"
+        for index, item in enumerate(value):
+            if not isinstance(item, dict):
+                return f"'{self.key}[{index}]' is not an object"
+            missing = [field for field in self.item_fields if not item.get(field)]
+            if missing:
+                return f"'{self.key}[{index}]' missing {', '.join(missing)}"
+        return None
+
+
+@dataclass(frozen=True)
+class Escalation:
+    """One fast-model answer that failed its check and was retried on the advanced tier."""
+
+    agent: str
+    reason: str
+    fast_model: str
+    advanced_model: str
+    fast_latency_s: float
+    advanced_latency_s: float
+    fast_input_tokens: int
+    fast_output_tokens: int
+    advanced_input_tokens: int
+    advanced_output_tokens: int
+    resolved: bool
+    timestamp: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RetryingLlm(WrappedLlm):
+    """Re-asks ``inner`` when its final answer fails ``check``, up to ``max_attempts`` calls.
+
+    A retry appends the rejected answer and the validation error to the request, so
+    only this stage's last model turn is repeated and the model repairs its answer.
+    The returned response carries the token usage of every attempt.
+    """
+
+    check: OutputCheckFn
+    max_attempts: int = DEFAULT_OUTPUT_ATTEMPTS
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        request = llm_request
+        input_tokens = output_tokens = 0
+        attempt = 1
+        _ESCALATIONS.count_call(request_agent_name(llm_request))
+        while True:
+            responses = [
+                response
+                async for response in self.inner.generate_content_async(request, stream=stream)
+            ]
+            final = _final_response(responses)
+            reason = _failure_reason(final, self.check)
+            if reason is None or final is None or attempt >= self.max_attempts:
+                break
+            usage = _usage(final)
+            input_tokens += usage[0]
+            output_tokens += usage[1]
+            _ESCALATIONS.count_retry(request_agent_name(llm_request))
+            request = request.model_copy(
+                update={
+                    "contents": [
+                        *request.contents,
+                        final.content,
+                        types.Content(
+                            role="user",
+                            parts=[types.Part(text=RETRY_PROMPT.format(reason=reason))],
+                        ),
+                    ]
+                }
+            )
+            attempt += 1
+
+        for response in responses:
+            if response is final and attempt > 1:
+                usage = _usage(final)
+                response = final.model_copy(
+                    update={
+                        "usage_metadata": types.GenerateContentResponseUsageMetadata(
+                            prompt_token_count=input_tokens + usage[0],
+                            candidates_token_count=output_tokens + usage[1],
+                        ),
+                        "custom_metadata": {
+                            **(final.custom_metadata or {}),
+                            RETRIES_METADATA_KEY: attempt - 1,
+                        },
+                    }
+                )
+            yield response
+
+
+class EscalatingLlm(WrappedLlm):
+    """Answers with ``inner`` (the fast tier) and re-asks ``advanced`` when ``check`` fails.
+
+    Tool-call turns pass straight through; only final text answers are checked, so
+    the fast model's response is held back until it is complete. An escalated
+    response carries the combined token usage of both calls and an ``escalation``
+    entry in ``custom_metadata``.
+    """
+
+    advanced: BaseLlm
+    check: OutputCheckFn
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        started = time.perf_counter()
+        responses = [
+            response
+            async for response in self.inner.generate_content_async(llm_request, stream=stream)
+        ]
+        fast_latency_s = time.perf_counter() - started
+        final = _final_response(responses)
+        reason = _failure_reason(final, self.check)
+        agent_name = request_agent_name(llm_request)
+        if reason is None:
+            for response in responses:
+                yield response
+            return
+
+        started = time.perf_counter()
+        advanced_request = llm_request.model_copy(update={"model": self.advanced.model})
+        advanced_final: LlmResponse | None = None
+        try:
+            async for response in self.advanced.generate_content_async(
+                advanced_request, stream=False
+            ):
+                if not response.partial:
+                    advanced_final = response
+        except Exception as error:
+            # The fast answer may still be usable after local JSON repair.
+            reason = f"{reason}; advanced call failed: {error}"
+        advanced_latency_s = time.perf_counter() - started
+
+        fast_usage = _usage(final)
+        advanced_usage = _usage(advanced_final)
+        escalation = Escalation(
+            agent=agent_name,
+            reason=reason,
+            fast_model=llm_request.model or self.inner.model,
+            advanced_model=self.advanced.model,
+            fast_latency_s=round(fast_latency_s, 4),
+            advanced_latency_s=round(advanced_latency_s, 4),
+            fast_input_tokens=fast_usage[0],
+            fast_output_tokens=fast_usage[1],
+            advanced_input_tokens=advanced_usage[0],
+            advanced_output_tokens=advanced_usage[1],
+            resolved=advanced_final is not None
+            and not advanced_final.error_code
+            and _failure_reason(advanced_final, self.check) is None,
+            timestamp=round(time.time(), 3),
+        )
+        _ESCALATIONS.add(escalation)
+        if advanced_final is None or advanced_final.error_code:
+            for response in responses:
+                yield response
+            return
+        yield advanced_final.model_copy(
+            update={
+                "usage_metadata": types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=fast_usage[0] + advanced_usage[0],
+                    candidates_token_count=fast_usage[1] + advanced_usage[1],
+                ),
+                "custom_metadata": {
+                    **(advanced_final.custom_metadata or {}),
+                    ESCALATION_METADATA_KEY: escalation.to_dict(),
+                },
+            }
+        )
+
+
+class _EscalationLog:
+    def __init__(self, max_records: int) -> None:
+        self.records: Deque[Escalation] = deque(maxlen=max_records)
+        self.calls: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.escalations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count_call(self, agent_name: str) -> None:
+        name = agent_name or "unknown"
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count_retry(self, agent_name: str) -> None:
+        name = agent_name or "unknown"
+        with self._lock:
+            self.retries[name] = self.retries.get(name, 0) + 1
+
+    def add(self, escalation: Escalation) -> None:
+        with self._lock:
+            self.records.append(escalation)
+            name = escalation.agent or "unknown"
+            self.escalations[name] = self.escalations.get(name, 0) + 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [escalation.to_dict() for escalation in self.records]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": self.calls.get(name, 0),
+                    "retries": self.retries.get(name, 0),
+                    "escalations": self.escalations.get(name, 0),
+                }
+                for name in {**self.calls, **self.retries, **self.escalations}
+            }
+
+
+_ESCALATIONS = _EscalationLog(MAX_ESCALATION_RECORDS)
+
+
+def escalation_log() -> List[Dict[str, Any]]:
+    """The most recent escalations, oldest first."""
+    return _ESCALATIONS.snapshot()
+
+
+def escalation_stats() -> Dict[str, Dict[str, int]]:
+    """Checked model calls, same-tier retries and escalations per agent name."""
+    return _ESCALATIONS.stats()
+
+
+def _final_response(responses: List[LlmResponse]) -> LlmResponse | None:
+    return next((response for response in reversed(responses) if not response.partial), None)
+
+
+def _failure_reason(response: LlmResponse | None, check: OutputCheckFn) -> str | None:
+    if response is None or response.error_code or response.content is None:
+        # Errors are surfaced as they are; escalation only covers bad answers.
+        return None
+    parts = response.content.parts or []
+    if any(part.function_call for part in parts):
+        return None
+    return check("".join(part.text for part in parts if part.text and not part.thought))
+
+
+def _usage(response: LlmResponse | None) -> Tuple[int, int]:
+    usage = response.usage_metadata if response is not None else None
+    if usage is None:
+        return 0, 0
+    return usage.prompt_token_count or 0, usage.candidates_token_count or 0
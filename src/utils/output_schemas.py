@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+from src.utils.json_extract import extract_json
+
+# Typed shapes of the stage outputs. They are sent to the model as structured-output
+# constraints (``LlmAgent.output_schema``) and checked again locally, so they only use
+# what Gemini's response schemas support: no free-form dict fields.
+
+
+class TrendBrief(BaseModel):
+    title: str = Field(min_length=1)
+    summary: str = Field(min_length=1)
+    evidence_snippets: List[str] = []
+    signal_strength: str = ""
+    velocity: str = ""
+    recommended_directions: List[str] = []
+
+
+class TrendBriefs(BaseModel):
+    trend_briefs: List[TrendBrief] = Field(min_length=1)
+
+
+class SegmentMetrics(BaseModel):
+    redemption_rate: Optional[str] = None
+    lift_estimate: Optional[str] = None
+    segment_size: Optional[str] = None
+    channel_preference: Optional[str] = None
+    average_order_value: Optional[str] = None
+    items_per_order: Optional[float] = None
+    visits_per_customer: Optional[float] = None
+    transactions: Optional[int] = None
+    customers: Optional[int] = None
+
+
+class CustomerInsight(BaseModel):
+    segment_id: str = Field(min_length=1)
+    description: str = Field(min_length=1)
+    preferred_mechanics: List[str] = []
+    key_messaging_phrases: List[str] = []
+    empirical_metrics: SegmentMetrics = SegmentMetrics()
+
+
+class CustomerInsights(BaseModel):
+    customer_insights: List[CustomerInsight] = Field(min_length=1)
+
+
+class HighVelocityEvent(BaseModel):
+    event_name: str = Field(min_length=1)
+    host_city: str = ""
+    markets: List[str] = []
+    region: str = ""
+    date: str = Field(min_length=1)
+    end_date: Optional[str] = None
+    potential_global_viewership: str = ""
+    past_sales_history: str = ""
+    strategic_opportunity: str = ""
+    target_segment: str = ""
+
+
+class EventCalendar(BaseModel):
+    year: int = 2026
+    brand_focus: str = ""
+    high_velocity_events: List[HighVelocityEvent] = Field(min_length=1)
+
+
+class OfferConcept(BaseModel):
+    priority_rank: int
+    title: str = Field(min_length=1)
+    offer_summary: str = Field(min_length=1)
+    success_hypothesis: str = Field(min_length=1)
+    evidence_map: List[str] = []
+    justification_points: List[str] = []
+
+
+class OfferConcepts(BaseModel):
+    offer_concepts: List[OfferConcept] = Field(min_length=3)
+
+
+# Workflow output key -> schema of the stage that produces it.
+STAGE_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "trend_briefs": TrendBriefs,
+    "customer_insights": CustomerInsights,
+    "event_calendar": EventCalendar,
+    "offer_concepts": OfferConcepts,
+}
+
+
+class OutputValidationError(ValueError):
+    """A stage answer that does not match its schema, even after local JSON repair."""
+
+
+def validate_output(schema: Type[BaseModel], text: str) -> Dict[str, Any]:
+    """Parse ``text`` and validate it against ``schema``; returns the cleaned object.
+
+    A bare list is accepted for single-list schemas (``[...]`` for
+    ``{"offer_concepts": [...]}``). Unknown fields are dropped.
+    """
+    key = _list_key(schema)
+    extraction = extract_json(text, prefer_keys=(key,) if key else ())
+    if extraction is None:
+        raise OutputValidationError("no JSON in output")
+    value = extraction.value
+    if isinstance(value, list) and key is not None:
+        value = {key: value}
+    try:
+        return schema.model_validate(value).model_dump(exclude_none=True)
+    except ValidationError as error:
+        raise OutputValidationError(_summarize(error)) from error
+
+
+def validate_stage_output(output_key: str, text: str) -> Any:
+    """Validated value of a workflow output.
+
+    That is the list under ``output_key``, or the whole object for ``event_calendar``.
+    """
+    validated = validate_output(STAGE_SCHEMAS[output_key], text)
+    return validated.get(output_key, validated)
+
+
+class SchemaCheck:
+    """``OutputCheck``-compatible validator: the failure reason, or ``None`` if valid."""
+
+    def __init__(self, schema: Type[BaseModel]) -> None:
+        self.schema = schema
+
+    def __call__(self, text: str) -> str | None:
+        try:
+            validate_output(self.schema, text)
+        except OutputValidationError as error:
+            return str(error)
+        return None
+
+
+def _list_key(schema: Type[BaseModel]) -> str | None:
+    fields = schema.model_fields
+    if len(fields) == 1:
+        return next(iter(fields))
+    required_lists = [
+        name
+        for name, field in fields.items()
+        if field.is_required() and getattr(field.annotation, "__origin__", None) in (list, List)
+    ]
+    return required_lists[0] if len(required_lists) == 1 else None
+
+
+def _summarize(error: ValidationError, limit: int = 3) -> str:
+    problems = [
+        f"{'.'.join(str(part) for part in item['loc']) or 'output'}: {item['msg']}"
+        for item in error.errors()[:limit]
+    ]
+    more = error.error_count() - limit
+    return "; ".join(problems) + (f" (+{more} more)" if more > 0 else "")
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import AsyncGenerator, Sequence, Tuple
+
+from google.adk.agents import ParallelAgent
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+BRANCH_ERROR_CODE = "BRANCH_FAILED"
+BRANCH_ERRORS_STATE_KEY = "branch_errors"
+
+
+class IsolatedBranchAgent(BaseAgent):
+    """Runs a single sub-agent and converts its failure into an error event."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        branch_agent = self.sub_agents[0]
+        try:
+            async for event in branch_agent.run_async(ctx):
+                yield event
+        except Exception as error:
+            message = f"{type(error).__name__}: {error}"
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                error_code=BRANCH_ERROR_CODE,
+                error_message=message,
+                actions=EventActions(
+                    state_delta={f"{BRANCH_ERRORS_STATE_KEY}.{branch_agent.name}": message}
+                ),
+            )
+
+
+def isolate_branch(agent: BaseAgent) -> IsolatedBranchAgent:
+    return IsolatedBranchAgent(
+        name=f"{agent.name}_branch",
+        description=agent.description,
+        sub_agents=[agent],
+    )
+
+
+def build_parallel_stage(
+    *, name: str, description: str, sub_agents: Sequence[BaseAgent]
+) -> ParallelAgent:
+    """Fan sub-agents out concurrently; a failing branch does not cancel its siblings."""
+    return ParallelAgent(
+        name=name,
+        description=description,
+        sub_agents=[isolate_branch(agent) for agent in sub_agents],
+    )
+
+
+def branch_failure(event: Event) -> Tuple[str, str] | None:
+    """Return ``(branch agent name, error)`` if ``event`` reports a failed branch."""
+    if event.error_code != BRANCH_ERROR_CODE:
+        return None
+    return event.author.removesuffix("_branch"), event.error_message or "unknown error"
+
+
+def collect_branch_errors(events: Sequence[Event]) -> dict[str, str]:
+    errors: dict[str, str] = {}
+    for event in events:
+        failure = branch_failure(event)
+        if failure is not None:
+            errors[failure[0]] = failure[1]
+    return errors
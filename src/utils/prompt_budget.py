@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+import json
+import math
+import os
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from google.adk.models.llm_request import LlmRequest
+
+# Default input-token budget per downstream stage; override with ``<STAGE>_TOKEN_BUDGET``
+# (``0`` disables pruning, the payload is still compacted).
+OFFER_DESIGN_STAGE = "offer_design"
+STAGE_TOKEN_BUDGETS: Dict[str, int] = {
+    OFFER_DESIGN_STAGE: 2000,
+}
+# Sent as a separate last part after the offer design payload, so the instruction and
+# payload form a stable prefix the model can serve from a context cache.
+OFFER_DESIGN_REQUEST = "Propose the 3 offer concepts for the input above."
+
+# Fields removed first when a payload is over budget, least useful first. Identity
+# fields (titles, ids, names, dates) are never dropped.
+PRUNABLE_FIELDS = (
+    "sample_customer",
+    "markets",
+    "end_date",
+    "region",
+    "brand_focus",
+    "year",
+    "behavioral_patterns",
+    "velocity",
+    "potential_global_viewership",
+    "past_sales_history",
+)
+NESTED_LIST_CAPS = (3, 2)
+STRING_CAPS = (240, 160, 100)
+# When records have to go, those with a lower rank are dropped first: records for a
+# segment in the payload, then upcoming events soonest first (past ones last, most
+# recent first), then stronger signals. Ties keep their original order.
+_SIGNAL_RANKS = {"high": 0, "medium": 1, "low": 2}
+
+_TOKEN_PIECE_RE = re.compile(r"\w+|[^\w\s]|\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: ~4 characters per word piece, one per symbol.
+
+    Single spaces merge into the following word; longer whitespace runs (newlines,
+    indentation) count as one token each.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECE_RE.findall(text):
+        if piece.isspace():
+            tokens += piece != " "
+        elif piece[0].isalnum() or piece[0] == "_":
+            tokens += math.ceil(len(piece) / 4)
+        else:
+            tokens += 1
+    return tokens
+
+
+def prompt_tokens(llm_request: LlmRequest) -> int:
+    """Estimated input tokens of a request: system instruction plus contents."""
+    texts = [str(llm_request.config.system_instruction or "")] if llm_request.config else []
+    for content in llm_request.contents:
+        texts.extend(part.text for part in content.parts or () if part.text)
+    return estimate_tokens("\n".join(texts))
+
+
+def minify(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def encode_compact(payload: Any) -> str:
+    """Compact text form of a payload.
+
+    Top-level keys become ``name: <minified json>`` lines, nested objects are
+    flattened into dotted names, and lists of records become tables so repeated
+    keys are written once.
+    """
+    if not isinstance(payload, dict):
+        return minify(payload)
+    lines: List[str] = []
+    for key, value in payload.items():
+        lines.extend(_encode_field(str(key), value))
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class CompactPrompt:
+    """A payload encoded for a model call, with token estimates before and after."""
+
+    text: str
+    tokens_before: int
+    tokens_after: int
+    budget: int | None
+    pruned: Tuple[str, ...] = ()
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.tokens_after > self.budget
+
+    @property
+    def log(self) -> str:
+        budget = f", budget {self.budget}" if self.budget is not None else ""
+        pruned = f"; pruned: {', '.join(self.pruned)}" if self.pruned else ""
+        return f"~{self.tokens_before} -> ~{self.tokens_after} tokens{budget}{pruned}"
+
+
+def compact_prompt(payload: Dict[str, Any], budget: int | None = None) -> CompactPrompt:
+    """Encode ``payload`` compactly, pruning low-value content until it fits ``budget``.
+
+    ``tokens_before`` is measured on the indented JSON the stages used to send. Pruning
+    goes from cheap to lossy and stops as soon as the text fits:
+
+    1. drop ``PRUNABLE_FIELDS`` in order, everywhere in the payload (for the offer
+       payload: ``sample_customer``, event ``markets``/``end_date``/``region``, calendar
+       ``brand_focus``/``year``, trend ``behavioral_patterns``/``velocity``, event
+       ``potential_global_viewership`` and ``past_sales_history``);
+    2. cap value lists (``evidence_snippets``, ``preferred_mechanics``, ...) at
+       ``NESTED_LIST_CAPS`` items;
+    3. clip long text to ``STRING_CAPS`` characters;
+    4. drop whole records (trend briefs, segments, events), least relevant first and
+       always from the currently largest table, keeping at least one per table.
+
+    Titles, ids, names, dates and segment fields are never dropped. ``pruned`` lists
+    every step taken. Input is not mutated.
+    """
+    tokens_before = estimate_tokens(json.dumps(payload, indent=2, default=str))
+    working = json.loads(minify(payload))
+    text = encode_compact(working)
+    pruned: List[str] = []
+    if budget is not None:
+        for label, prune in _pruning_steps():
+            if estimate_tokens(text) <= budget:
+                break
+            if prune(working):
+                pruned.append(label)
+                text = encode_compact(working)
+        if estimate_tokens(text) > budget:
+            text, dropped = _drop_records(working, budget)
+            pruned.extend(f"dropped {count} of {name}" for name, count in dropped.items())
+    return CompactPrompt(
+        text=text,
+        tokens_before=tokens_before,
+        tokens_after=estimate_tokens(text),
+        budget=budget,
+        pruned=tuple(pruned),
+    )
+
+
+def stage_token_budget(stage: str) -> int | None:
+    """Token budget for ``stage`` from ``<STAGE>_TOKEN_BUDGET`` or the defaults."""
+    raw = os.getenv(f"{stage.upper()}_TOKEN_BUDGET", "").strip()
+    if not raw:
+        return STAGE_TOKEN_BUDGETS.get(stage)
+    try:
+        budget = int(raw)
+    except ValueError:
+        return STAGE_TOKEN_BUDGETS.get(stage)
+    return budget if budget > 0 else None
+
+
+def _encode_field(name: str, value: Any) -> List[str]:
+    if _is_table(value):
+        columns = list(dict.fromkeys(key for record in value for key in record))
+        header = f"{name}[{len(value)}]{{{','.join(columns)}}}:"
+        return [header] + [minify([record.get(column) for column in columns]) for record in value]
+    if isinstance(value, dict) and value:
+        lines = []
+        for key, item in value.items():
+            lines.extend(_encode_field(f"{name}.{key}", item))
+        return lines
+    return [f"{name}: {minify(value)}"]
+
+
+def _is_table(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) > 1
+        and all(isinstance(item, dict) and item for item in value)
+    )
+
+
+def _pruning_steps() -> Iterator[Tuple[str, Callable[[Any], bool]]]:
+    for field in PRUNABLE_FIELDS:
+        yield field, lambda value, field=field: _drop_field(value, field)
+    for cap in NESTED_LIST_CAPS:
+        yield f"lists capped at {cap}", lambda value, cap=cap: _cap_lists(value, cap)
+    for cap in STRING_CAPS:
+        yield f"text clipped to {cap} chars", lambda value, cap=cap: _clip_strings(value, cap)
+
+
+def _drop_field(value: Any, field: str) -> bool:
+    changed = False
+    if isinstance(value, dict):
+        if field in value:
+            del value[field]
+            changed = True
+        for item in value.values():
+            changed = _drop_field(item, field) or changed
+    elif isinstance(value, list):
+        for item in value:
+            changed = _drop_field(item, field) or changed
+    return changed
+
+
+def _cap_lists(value: Any, cap: int) -> bool:
+    # Lists of records are pruned record by record later; only value lists are capped.
+    changed = False
+    items = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    for item in items:
+        changed = _cap_lists(item, cap) or changed
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, list) and len(item) > cap and not _is_table(item):
+                value[key] = item[:cap]
+                changed = True
+    return changed
+
+
+def _clip_strings(value: Any, cap: int) -> bool:
+    changed = False
+    if isinstance(value, dict):
+        keys = list(value)
+    elif isinstance(value, list):
+        keys = range(len(value))
+    else:
+        return False
+    for key in keys:
+        item = value[key]
+        if isinstance(item, str) and len(item) > cap:
+            value[key] = item[:cap].rsplit(" ", 1)[0] + "..."
+            changed = True
+        else:
+            changed = _clip_strings(item, cap) or changed
+    return changed
+
+
+def _drop_records(payload: Dict[str, Any], budget: int) -> Tuple[str, Dict[str, int]]:
+    """Drop the fewest records that bring ``payload`` within ``budget``; returns the text.
+
+    The drop order is planned once from record sizes, then the cut point is found by
+    binary search, so the payload is encoded O(log n) times instead of once per record.
+    """
+    tables = _tables(payload)
+    segments = _field_values(payload, "segment_id")
+    today = date.today().isoformat()
+    ranked = {
+        path: sorted(
+            range(len(records)),
+            key=lambda index: (_relevance(records[index], segments, today), index),
+        )
+        for path, (_, _, records) in tables.items()
+    }
+    sizes = {
+        path: [len(minify(record)) for record in records]
+        for path, (_, _, records) in tables.items()
+    }
+    remaining = {path: sum(record_sizes) for path, record_sizes in sizes.items()}
+    kept = {path: len(records) for path, (_, _, records) in tables.items()}
+    # Each step drops the least relevant record left in the largest table.
+    plan: List[Tuple[str, int]] = []
+    while True:
+        candidates = [path for path in tables if kept[path] > 1]
+        if not candidates:
+            break
+        path = max(candidates, key=lambda path: remaining[path])
+        kept[path] -= 1
+        index = ranked[path][kept[path]]
+        remaining[path] -= sizes[path][index]
+        plan.append((path, index))
+
+    def _encode_without(steps: int) -> str:
+        dropped: Dict[str, Set[int]] = {path: set() for path in tables}
+        for path, index in plan[:steps]:
+            dropped[path].add(index)
+        for path, (parent, key, records) in tables.items():
+            parent[key] = [
+                record for index, record in enumerate(records) if index not in dropped[path]
+            ]
+        return encode_compact(payload)
+
+    low, high = 1, len(plan)
+    while low < high:
+        middle = (low + high) // 2
+        if estimate_tokens(_encode_without(middle)) <= budget:
+            high = middle
+        else:
+            low = middle + 1
+    text = _encode_without(high)
+    counts: Dict[str, int] = {}
+    for path, _ in plan[:high]:
+        counts[path] = counts.get(path, 0) + 1
+    return text, counts
+
+
+def _tables(value: Any, name: str = "") -> Dict[str, Tuple[Dict[str, Any], str, List[Any]]]:
+    """Tables in ``value`` by dotted path, with the dict and key that hold them."""
+    tables: Dict[str, Tuple[Dict[str, Any], str, List[Any]]] = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            path = f"{name}.{key}" if name else str(key)
+            if _is_table(item):
+                tables[path] = (value, key, item)
+            else:
+                tables.update(_tables(item, path))
+    return tables
+
+
+def _field_values(value: Any, field: str) -> Set[str]:
+    values: Set[str] = set()
+    if isinstance(value, dict):
+        if field in value and value[field]:
+            values.add(str(value[field]).strip().lower())
+        items: Any = value.values()
+    elif isinstance(value, list):
+        items = value
+    else:
+        return values
+    for item in items:
+        values |= _field_values(item, field)
+    return values
+
+
+def _relevance(record: Dict[str, Any], segments: Set[str], today: str) -> Tuple[Any, ...]:
+    segment = str(record.get("target_segment") or "").strip().lower()
+    off_segment = bool(segments) and bool(segment) and segment not in segments
+    when = str(record.get("date") or "")
+    try:
+        days = (date.fromisoformat(when[:10]) - date.fromisoformat(today)).days
+    except ValueError:
+        proximity: Tuple[int, int] = (0, 0)
+    else:
+        proximity = (0, days) if days >= 0 else (1, -days)
+    signal = _SIGNAL_RANKS.get(str(record.get("signal_strength") or "").strip().lower(), 1)
+    return (off_segment, proximity, signal)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Set
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import BaseModel
+
+from src.utils.llm_wrappers import WrappedLlm, request_agent_name
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+CACHE_ENV_VAR = "LLM_RESPONSE_CACHE"
+CACHE_DIR_ENV_VAR = "LLM_RESPONSE_CACHE_DIR"
+CACHE_TTL_ENV_VAR = "LLM_RESPONSE_CACHE_TTL_S"
+CACHE_MAX_MB_ENV_VAR = "LLM_RESPONSE_CACHE_MAX_MB"
+CACHE_MAX_ENTRIES_ENV_VAR = "LLM_RESPONSE_CACHE_MAX_ENTRIES"
+
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "llm_responses"
+DEFAULT_TTL_S = 7 * 24 * 3600.0
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 512
+
+# Labels only carry billing metadata and never change what the model returns.
+_CONFIG_KEY_EXCLUDE = {"labels", "http_options"}
+# May hold a pydantic model class (``LlmAgent.output_schema``), which has no JSON dump.
+_SCHEMA_FIELDS = {"response_schema", "response_json_schema"}
+
+
+def response_cache_enabled() -> bool:
+    return os.getenv(CACHE_ENV_VAR, "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def request_cache_key(llm_request: LlmRequest) -> str:
+    """Content address of a model request: model, instruction, config and contents."""
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if instruction is not None and not isinstance(instruction, str):
+        instruction = json.dumps(_dump(instruction), sort_keys=True)
+    material = {
+        "model": llm_request.model,
+        "instruction_sha256": hashlib.sha256((instruction or "").encode("utf-8")).hexdigest(),
+        "config": dump_config(config, exclude=_CONFIG_KEY_EXCLUDE | {"system_instruction"}),
+        "contents": [strip_call_ids(_dump(content)) for content in llm_request.contents],
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + on-disk) store of final model responses.
+
+    The disk tier evicts entries older than ``ttl_s`` on read and trims the oldest
+    files once the directory grows past ``max_disk_bytes``. Pass ``directory=None``
+    for a memory-only cache.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str | Path | None = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str, agent_name: str = "") -> Dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_s:
+                self._memory.move_to_end(key)
+                self._count(agent_name, "hits")
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+        payload = self._read_disk(key, now)
+        with self._lock:
+            if payload is None:
+                self._count(agent_name, "misses")
+                return None
+            self._remember(key, payload, now)
+            self._count(agent_name, "hits")
+        return payload
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, payload, now)
+        self._write_disk(key, payload)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._stats.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _count(self, agent_name: str, field: str) -> None:
+        counts = self._stats.setdefault(agent_name or "unknown", {"hits": 0, "misses": 0})
+        counts[field] += 1
+
+    def _remember(self, key: str, payload: Dict[str, Any], now: float) -> None:
+        self._memory[key] = (now, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path | None:
+        return self.directory / f"{key}.json" if self.directory is not None else None
+
+    def _read_disk(self, key: str, now: float) -> Dict[str, Any] | None:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            if now - path.stat().st_mtime > self.ttl_s:
+                path.unlink(missing_ok=True)
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, key: str, payload: Dict[str, Any]) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        if self.directory is None:
+            return
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, file_path in sorted(files):
+            Path(file_path).unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+
+class CachedLlm(WrappedLlm):
+    """Serves repeated requests from a ``ResponseCache`` instead of calling ``inner``."""
+
+    cache: ResponseCache
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        agent_name = request_agent_name(llm_request)
+        key = request_cache_key(llm_request)
+        cached = self.cache.get(key, agent_name)
+        if cached is not None:
+            yield LlmResponse.model_validate(cached)
+            return
+
+        final_response: LlmResponse | None = None
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            if not response.partial:
+                final_response = response
+            yield response
+        if final_response is not None and not final_response.error_code:
+            self.cache.put(key, final_response.model_dump(mode="json", exclude_none=True))
+
+
+_DEFAULT_CACHE: ResponseCache | None = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache configured from the ``LLM_RESPONSE_CACHE_*`` environment."""
+    global _DEFAULT_CACHE
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = ResponseCache(
+                directory=os.getenv(CACHE_DIR_ENV_VAR) or DEFAULT_CACHE_DIR,
+                max_entries=int(os.getenv(CACHE_MAX_ENTRIES_ENV_VAR, DEFAULT_MAX_ENTRIES)),
+                ttl_s=float(os.getenv(CACHE_TTL_ENV_VAR, DEFAULT_TTL_S)),
+                max_disk_bytes=int(
+                    float(os.getenv(CACHE_MAX_MB_ENV_VAR, DEFAULT_MAX_DISK_BYTES / 1024 / 1024))
+                    * 1024
+                    * 1024
+                ),
+            )
+        return _DEFAULT_CACHE
+
+
+def response_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters per agent name for the process-wide cache."""
+    return get_response_cache().stats() if _DEFAULT_CACHE is not None else {}
+
+
+def dump_config(
+    config: types.GenerateContentConfig | None, exclude: Set[str] = frozenset()
+) -> Dict[str, Any]:
+    """JSON-safe dump of a request config; a pydantic response schema becomes its JSON schema."""
+    if config is None:
+        return {}
+    dumped = config.model_dump(
+        mode="json", exclude_none=True, exclude=set(exclude) | _SCHEMA_FIELDS
+    )
+    for field in _SCHEMA_FIELDS - set(exclude):
+        schema = getattr(config, field, None)
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            dumped[field] = schema.model_json_schema()
+        elif schema is not None:
+            dumped[field] = _dump(schema)
+    return dumped
+
+
+def strip_call_ids(content: Dict[str, Any]) -> Dict[str, Any]:
+    # ADK assigns fresh ``adk-<uuid>`` ids to function calls on every run; they would
+    # make every request after a tool call unique.
+    parts = []
+    for part in content.get("parts") or ():
+        part = dict(part)
+        for field in ("function_call", "function_response"):
+            if isinstance(part.get(field), dict):
+                part[field] = {k: v for k, v in part[field].items() if k != "id"}
+        parts.append(part)
+    return {**content, "parts": parts} if parts else content
+
+
+def _dump(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, Iterator, Mapping
+
+from google.adk.agents.base_agent import BaseAgent
+
+from src.utils.instruction_loader import InstructionFile, load_instruction
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+CHECKPOINTS_ENV_VAR = "STAGE_CHECKPOINTS"
+CHECKPOINT_DIR_ENV_VAR = "STAGE_CHECKPOINT_DIR"
+CHECKPOINT_TTL_ENV_VAR = "STAGE_CHECKPOINT_TTL_S"
+
+DEFAULT_CHECKPOINT_DIR = PROJECT_ROOT / ".cache" / "stage_checkpoints"
+DEFAULT_TTL_S = 24 * 3600.0
+# Bump when the checkpoint payload or key material changes shape.
+CHECKPOINT_VERSION = 2
+
+
+def checkpoints_enabled() -> bool:
+    # Opt-in: a checkpointed research stage replays yesterday's trends and events.
+    return os.getenv(CHECKPOINTS_ENV_VAR, "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 of ``value`` as canonical JSON (sorted keys, no whitespace)."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def agent_fingerprint(agent: BaseAgent) -> str:
+    """Hash of what decides an agent tree's answers: names, instructions, models and tools.
+
+    Editing a prompt or switching a model therefore invalidates the checkpoints of
+    the stage that runs the agent.
+    """
+    return content_hash([_describe(node) for node in _walk(agent)])
+
+
+def checkpoint_key(stage: str, fingerprint: str, inputs: Mapping[str, Any]) -> str:
+    """Content address of a stage run: the stage, its agent fingerprint and its inputs.
+
+    Upstream outputs enter by their ``content_hash``, so a stage is recomputed
+    exactly when something it reads has changed.
+    """
+    return content_hash(
+        {
+            "version": CHECKPOINT_VERSION,
+            "stage": stage,
+            "fingerprint": fingerprint,
+            "inputs": dict(inputs),
+        }
+    )
+
+
+class CheckpointStore:
+    """Stage outputs keyed by ``checkpoint_key``, one JSON file each.
+
+    Entries older than ``ttl_s`` count as missing, so live research is redone at
+    least that often. Pass ``directory=None`` for a memory-only store.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str | Path | None = DEFAULT_CHECKPOINT_DIR,
+        ttl_s: float = DEFAULT_TTL_S,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.ttl_s = ttl_s
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, stage: str = "") -> Dict[str, Any] | None:
+        """The checkpoint for ``key`` (``stage``, ``value``, ``created_at``) or ``None``."""
+        now = time.time()
+        with self._lock:
+            checkpoint = self._memory.get(key)
+        if checkpoint is None:
+            checkpoint = self._read_disk(key)
+        if checkpoint is not None and now - checkpoint.get("created_at", 0) > self.ttl_s:
+            self.discard(key)
+            checkpoint = None
+        with self._lock:
+            if checkpoint is not None:
+                self._memory[key] = checkpoint
+            self._count(stage, "hits" if checkpoint is not None else "misses")
+        return checkpoint
+
+    def put(self, key: str, stage: str, value: Any) -> None:
+        checkpoint = {"stage": stage, "value": value, "created_at": round(time.time(), 3)}
+        with self._lock:
+            self._memory[key] = checkpoint
+        path = self._path(key)
+        if path is None:
+            return
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(
+                json.dumps(checkpoint, separators=(",", ":"), ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        path = self._path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stats.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._stats.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _count(self, stage: str, field: str) -> None:
+        counts = self._stats.setdefault(stage or "unknown", {"hits": 0, "misses": 0})
+        counts[field] += 1
+
+    def _path(self, key: str) -> Path | None:
+        return self.directory / f"{key}.json" if self.directory is not None else None
+
+    def _read_disk(self, key: str) -> Dict[str, Any] | None:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+
+_DEFAULT_STORE: CheckpointStore | None = None
+_DEFAULT_STORE_LOCK = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Process-wide store configured from the ``STAGE_CHECKPOINT_*`` environment."""
+    global _DEFAULT_STORE
+    with _DEFAULT_STORE_LOCK:
+        if _DEFAULT_STORE is None:
+            _DEFAULT_STORE = CheckpointStore(
+                directory=os.getenv(CHECKPOINT_DIR_ENV_VAR) or DEFAULT_CHECKPOINT_DIR,
+                ttl_s=float(os.getenv(CHECKPOINT_TTL_ENV_VAR, DEFAULT_TTL_S)),
+            )
+        return _DEFAULT_STORE
+
+
+def _walk(agent: BaseAgent) -> Iterator[BaseAgent]:
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def _describe_instruction(instruction: Any) -> Any:
+    if isinstance(instruction, str) or instruction is None:
+        return instruction
+    if isinstance(instruction, InstructionFile):
+        # The file's text decides the answers; the path is kept relative so moving the
+        # checkout keeps the keys.
+        path = instruction.path.resolve()
+        return {
+            "path": str(path.relative_to(PROJECT_ROOT))
+            if path.is_relative_to(PROJECT_ROOT)
+            else path.name,
+            "text": load_instruction(path),
+        }
+    # Other providers are functions; their name is the best stable stand-in.
+    return getattr(instruction, "__qualname__", repr(instruction))
+
+
+def _describe(agent: BaseAgent) -> Dict[str, Any]:
+    instruction = getattr(agent, "instruction", None)
+    model = getattr(agent, "model", None)
+    schema = getattr(agent, "output_schema", None)
+    return {
+        "name": agent.name,
+        "type": type(agent).__name__,
+        "instruction": _describe_instruction(instruction),
+        "model": getattr(model, "model", model) or None,
+        "tools": sorted(
+            getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool))
+            for tool in getattr(agent, "tools", ()) or ()
+        ),
+        "output_schema": schema.model_json_schema() if schema is not None else None,
+    }
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from src.utils.llm_wrappers import request_agent_name
+from src.utils.prompt_budget import estimate_tokens, prompt_tokens
+
+
+class StubLlm(BaseLlm):
+    """Local stand-in model that answers with canned text after a fixed delay.
+
+    Used by the benchmarks so framework overhead can be measured without Gemini.
+    ``prefill_s_per_1k_tokens`` adds delay proportional to the estimated prompt size,
+    like a real model's time to first token, and ``tokens_per_s`` paces the response
+    at a fixed generation rate. With ``context_cache`` (a ``LocalContextCacheBackend``)
+    requests naming a cache report its tokens as cached and skip their prefill.
+    """
+
+    model: str = "stub"
+    latency_s: float = 0.0
+    prefill_s_per_1k_tokens: float = 0.0
+    tokens_per_s: float = 0.0
+    responses: Dict[str, str] = {}
+    default_response: str = "{}"
+    context_cache: Any = None
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"stub.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        input_tokens = prompt_tokens(llm_request)
+        cached_tokens = self._cached_tokens(llm_request)
+        text = self.responses.get(request_agent_name(llm_request), self.default_response)
+        output_tokens = estimate_tokens(text)
+        delay = self.latency_s + self.prefill_s_per_1k_tokens * input_tokens / 1000
+        if self.tokens_per_s:
+            delay += output_tokens / self.tokens_per_s
+        if delay:
+            await asyncio.sleep(delay)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=input_tokens + cached_tokens,
+                cached_content_token_count=cached_tokens or None,
+                candidates_token_count=output_tokens,
+            ),
+        )
+
+    def _cached_tokens(self, llm_request: LlmRequest) -> int:
+        name = llm_request.config.cached_content if llm_request.config else None
+        if not name:
+            return 0
+        if self.context_cache is None:
+            raise ValueError(f"StubLlm has no context cache to resolve '{name}'.")
+        return self.context_cache.cached_tokens(name)
+
+
+def canned_responses(payloads: Dict[str, object]) -> Dict[str, str]:
+    return {name: json.dumps(payload) for name, payload in payloads.items()}
+
+
+def apply_model(agent: BaseAgent, model: BaseLlm) -> BaseAgent:
+    """Point every LlmAgent in an agent tree at ``model``."""
+    if isinstance(agent, LlmAgent):
+        agent.model = model
+    for sub_agent in agent.sub_agents:
+        apply_model(sub_agent, model)
+    return agent
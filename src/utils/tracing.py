@@ -0,0 +1,610 @@
+from __future__ import annotations
+
+import atexit
+from contextlib import contextmanager
+import contextvars
+from dataclasses import asdict, dataclass, field
+import json
+import os
+from pathlib import Path
+import queue
+import secrets
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from src.utils.context_cache import CONTEXT_CACHE_METADATA_KEY
+from src.utils.llm_governor import GOVERNOR_METADATA_KEY
+from src.utils.model_tiers import ESCALATION_METADATA_KEY, RETRIES_METADATA_KEY
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+except Exception:  # pragma: no cover - optional dependency
+    otel_trace = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+TRACING_ENV_VAR = "TRACING"
+TRACE_JSONL_ENV_VAR = "TRACE_JSONL_PATH"
+TRACE_JSONL_MAX_BYTES_ENV_VAR = "TRACE_JSONL_MAX_BYTES"
+TRACE_JSONL_BACKUPS_ENV_VAR = "TRACE_JSONL_BACKUPS"
+OTLP_ENDPOINT_ENV_VARS = ("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", "OTEL_EXPORTER_OTLP_ENDPOINT")
+DEFAULT_TRACE_JSONL_PATH = PROJECT_ROOT / ".cache" / "traces" / "spans.jsonl"
+DEFAULT_TRACE_JSONL_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TRACE_JSONL_BACKUPS = 3
+DEFAULT_TRACE_JSONL_MAX_QUEUE = 10_000
+INSTRUMENTATION_NAME = "marketing_workflow"
+
+WORKFLOW_SPAN = "workflow"
+AGENT_SPAN = "agent"
+LLM_SPAN = "llm"
+TOOL_SPAN = "tool"
+
+_CURRENT_SPAN: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_trace_span", default=None
+)
+
+
+@dataclass
+class Span:
+    """One timed operation; ``parent_id`` links workflow -> agent -> LLM/tool spans."""
+
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_s(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record["duration_s"] = round(self.duration_s, 6)
+        return record
+
+
+class SpanExporter:
+    """Receives spans as they start and finish."""
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends finished spans to a JSON Lines file from a background writer thread.
+
+    ``on_end`` only queues the span, so the event loop never waits on the disk; the
+    writer appends everything queued so far in one write. A write that would take
+    the file past ``max_bytes`` first rotates it to ``<name>.1`` (older copies move
+    up, keeping ``backups`` of them; ``max_bytes=0`` never rotates). Spans arriving
+    while ``max_queue`` are still waiting are dropped and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = DEFAULT_TRACE_JSONL_MAX_BYTES,
+        backups: int = DEFAULT_TRACE_JSONL_BACKUPS,
+        max_queue: int = DEFAULT_TRACE_JSONL_MAX_QUEUE,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max(max_bytes, 0)
+        self.backups = max(backups, 0)
+        self.dropped = 0
+        self._queue: "queue.Queue[Dict[str, Any] | None]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        atexit.register(self.shutdown)
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="trace-jsonl-writer", daemon=True
+                )
+                self._writer.start()
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def flush(self, timeout_s: float | None = None) -> bool:
+        """Wait until every queued span is on disk; ``False`` if ``timeout_s`` ran out."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout_s
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=5.0)
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    self._append(
+                        "".join(json.dumps(record, default=str) + "\n" for record in records)
+                    )
+            except OSError:
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _append(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.max_bytes:
+            try:
+                size = self.path.stat().st_size
+            except OSError:
+                size = 0
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+        with self.path.open("ab") as handle:
+            handle.write(data)
+
+    def _rotate(self) -> None:
+        if not self.backups:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else self._backup_path(index - 1)
+            if source.exists():
+                os.replace(source, self._backup_path(index))
+
+    def _backup_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+
+class OtelSpanExporter(SpanExporter):
+    """Mirrors spans into OpenTelemetry, e.g. to an OTLP collector.
+
+    Pass any OpenTelemetry SDK ``SpanExporter``; spans keep their parent links and
+    timings. Requires ``opentelemetry-sdk``.
+    """
+
+    def __init__(self, exporter: Any) -> None:
+        if otel_trace is None:
+            raise RuntimeError("OpenTelemetry export requires opentelemetry-sdk.")
+        self._provider = TracerProvider()
+        self._provider.add_span_processor(BatchSpanProcessor(exporter))
+        self._tracer = self._provider.get_tracer(INSTRUMENTATION_NAME)
+        self._open: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        with self._lock:
+            parent = self._open.get(span.parent_id or "")
+        parent_context = (
+            otel_trace.set_span_in_context(parent) if parent is not None else otel_context.Context()
+        )
+        otel_span = self._tracer.start_span(
+            f"{span.kind} {span.name}", context=parent_context, start_time=span.start_ns
+        )
+        with self._lock:
+            self._open[span.span_id] = otel_span
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        otel_span.set_attribute("span.kind", span.kind)
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(
+                    key, value if isinstance(value, (bool, int, float, str)) else str(value)
+                )
+        if span.error:
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=span.end_ns)
+
+    def shutdown(self) -> None:
+        self._provider.shutdown()
+
+
+class Tracer:
+    """Creates spans, hands them to the exporters and collects those of open traces."""
+
+    def __init__(self, exporters: Sequence[SpanExporter] = ()) -> None:
+        self.exporters = list(exporters)
+        self._collected: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def start_span(
+        self, name: str, kind: str, parent: Span | None = None, **attributes: Any
+    ) -> Span:
+        span = Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent is not None else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent is not None else None,
+            start_ns=time.time_ns(),
+            attributes={key: value for key, value in attributes.items() if value is not None},
+        )
+        for exporter in self.exporters:
+            _safe_export(exporter.on_start, span)
+        return span
+
+    def end_span(self, span: Span, error: str | None = None, **attributes: Any) -> None:
+        if span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        span.error = error or span.error
+        span.attributes.update({key: value for key, value in attributes.items() if value is not None})
+        with self._lock:
+            collected = self._collected.get(span.trace_id)
+            if collected is not None:
+                collected.append(span)
+        for exporter in self.exporters:
+            _safe_export(exporter.on_end, span)
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attributes: Any) -> Iterator[Span]:
+        """Span around a block, parented to (and made) the current span."""
+        span = self.start_span(name, kind, parent=_CURRENT_SPAN.get(), **attributes)
+        token = _CURRENT_SPAN.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            self.end_span(span, error=f"{type(error).__name__}: {error}")
+            raise
+        finally:
+            _reset_current(token)
+            self.end_span(span)
+
+    @contextmanager
+    def trace(self, name: str, kind: str = WORKFLOW_SPAN, **attributes: Any) -> Iterator["Trace"]:
+        """Like ``span`` but also collects every finished span of the trace."""
+        with self.span(name, kind, **attributes) as root:
+            with self._lock:
+                self._collected[root.trace_id] = []
+            trace = Trace(root)
+            try:
+                yield trace
+            finally:
+                with self._lock:
+                    trace.spans = self._collected.pop(root.trace_id, [])
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+class Trace:
+    """Spans finished under a root span; complete once the ``trace`` block exits."""
+
+    def __init__(self, root: Span) -> None:
+        self.root = root
+        self.spans: List[Span] = []
+
+
+def current_span() -> Span | None:
+    return _CURRENT_SPAN.get()
+
+
+class TracingPlugin(BasePlugin):
+    """Turns ADK agent, model and tool callbacks into nested spans.
+
+    Agent spans are parented to their parent agent's span (the root agent to the
+    caller's current span), model and tool spans to the agent that made the call.
+    """
+
+    def __init__(self, tracer: Tracer) -> None:
+        super().__init__(name="tracing")
+        self.tracer = tracer
+        self._open: Dict[Tuple[str, ...], Span] = {}
+        self._lock = threading.Lock()
+
+    async def before_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> None:
+        invocation_id = callback_context.invocation_id
+        parent_agent = agent.parent_agent
+        parent = self._get(("agent", invocation_id, parent_agent.name)) if parent_agent else None
+        span = self.tracer.start_span(
+            agent.name,
+            AGENT_SPAN,
+            parent=parent or _CURRENT_SPAN.get(),
+            agent=agent.name,
+            invocation_id=invocation_id,
+        )
+        self._put(("agent", invocation_id, agent.name), span)
+
+    async def after_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> None:
+        self._end(("agent", callback_context.invocation_id, agent.name))
+
+    async def on_agent_error_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext, error: Exception
+    ) -> None:
+        self._end(("agent", callback_context.invocation_id, agent.name), error=_describe(error))
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        invocation_id = callback_context.invocation_id
+        agent_name = callback_context.agent_name
+        span = self.tracer.start_span(
+            f"call_llm {agent_name}",
+            LLM_SPAN,
+            parent=self._get(("agent", invocation_id, agent_name)),
+            agent=agent_name,
+            model=llm_request.model,
+        )
+        self._put(("llm", invocation_id, agent_name), span)
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        if llm_response.partial:
+            return
+        usage = llm_response.usage_metadata
+        metadata = llm_response.custom_metadata or {}
+        escalation = metadata.get(ESCALATION_METADATA_KEY) or {}
+        governor = metadata.get(GOVERNOR_METADATA_KEY) or {}
+        context_cache = metadata.get(CONTEXT_CACHE_METADATA_KEY) or {}
+        self._end(
+            ("llm", callback_context.invocation_id, callback_context.agent_name),
+            error=llm_response.error_message,
+            input_tokens=usage.prompt_token_count if usage else None,
+            output_tokens=usage.candidates_token_count if usage else None,
+            cached_tokens=usage.cached_content_token_count if usage else None,
+            cache_saved_s=context_cache.get("saved_s"),
+            escalated_to=escalation.get("advanced_model"),
+            escalation_reason=escalation.get("reason"),
+            output_retries=metadata.get(RETRIES_METADATA_KEY),
+            lane=governor.get("lane"),
+            queue_wait_s=governor.get("wait_s"),
+            throttle_retries=governor.get("retries") or None,
+        )
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> None:
+        self._end(
+            ("llm", callback_context.invocation_id, callback_context.agent_name),
+            error=_describe(error),
+        )
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        invocation_id = tool_context.invocation_id
+        span = self.tracer.start_span(
+            tool.name,
+            TOOL_SPAN,
+            parent=self._get(("agent", invocation_id, tool_context.agent_name)),
+            agent=tool_context.agent_name,
+            tool=tool.name,
+        )
+        self._put(("tool", invocation_id, tool_context.function_call_id or tool.name), span)
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: Dict[str, Any],
+        tool_context: ToolContext,
+        result: Dict[str, Any],
+    ) -> None:
+        self._end(("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name))
+
+    async def on_tool_error_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: Dict[str, Any],
+        tool_context: ToolContext,
+        error: Exception,
+    ) -> None:
+        self._end(
+            ("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name),
+            error=_describe(error),
+        )
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self._end_invocation(invocation_context.invocation_id, None)
+
+    async def on_run_error_callback(
+        self, *, invocation_context: InvocationContext, error: Exception
+    ) -> None:
+        self._end_invocation(invocation_context.invocation_id, _describe(error))
+
+    def _end_invocation(self, invocation_id: str, error: str | None) -> None:
+        # Spans whose end callback never ran (cancelled or failed branches).
+        with self._lock:
+            keys = [key for key in self._open if key[1] == invocation_id]
+        for key in sorted(keys, key=lambda key: key[0] == "agent"):
+            self._end(key, error=error or "did not finish")
+
+    def _get(self, key: Tuple[str, ...]) -> Span | None:
+        with self._lock:
+            return self._open.get(key)
+
+    def _put(self, key: Tuple[str, ...], span: Span) -> None:
+        with self._lock:
+            self._open[key] = span
+
+    def _end(self, key: Tuple[str, ...], error: str | None = None, **attributes: Any) -> None:
+        with self._lock:
+            span = self._open.pop(key, None)
+        if span is not None:
+            self.tracer.end_span(span, error=error, **attributes)
+
+
+def stage_timings(
+    spans: Sequence[Span], stages: Mapping[str, str], root: Span | None = None
+) -> List[Dict[str, Any]]:
+    """Per-stage timing rows from a trace's spans.
+
+    ``stages`` maps agent names to stage labels; each matching agent span becomes a
+    row with its offset from ``root``, duration, error, and the LLM calls, tool
+    calls, token counts, model escalations, governor queue wait, share of input
+    tokens served from a context cache and latency it saved of the spans beneath it.
+    """
+    children: Dict[str, List[Span]] = {}
+    for span in spans:
+        children.setdefault(span.parent_id or "", []).append(span)
+    origin_ns = root.start_ns if root is not None else min((s.start_ns for s in spans), default=0)
+    rows = []
+    for span in sorted(spans, key=lambda span: span.start_ns):
+        if span.kind != AGENT_SPAN or span.name not in stages:
+            continue
+        descendants = _descendants(span, children)
+        llm_spans = [child for child in descendants if child.kind == LLM_SPAN]
+        input_tokens = sum(child.attributes.get("input_tokens") or 0 for child in llm_spans)
+        cached_tokens = sum(child.attributes.get("cached_tokens") or 0 for child in llm_spans)
+        rows.append(
+            {
+                "stage": stages[span.name],
+                "start_s": round((span.start_ns - origin_ns) / 1e9, 3),
+                "duration_s": round(span.duration_s, 3),
+                "llm_calls": len(llm_spans),
+                "tool_calls": sum(child.kind == TOOL_SPAN for child in descendants),
+                "input_tokens": input_tokens,
+                "output_tokens": sum(
+                    child.attributes.get("output_tokens") or 0 for child in llm_spans
+                ),
+                "cached_tokens": cached_tokens,
+                "cached_share": round(cached_tokens / input_tokens, 3) if input_tokens else 0.0,
+                "cache_saved_s": round(
+                    sum(child.attributes.get("cache_saved_s") or 0 for child in llm_spans), 3
+                ),
+                "escalations": sum("escalated_to" in child.attributes for child in llm_spans),
+                "queue_wait_s": round(
+                    sum(child.attributes.get("queue_wait_s") or 0 for child in llm_spans), 3
+                ),
+                "error": span.error
+                or next((child.error for child in descendants if child.error), None),
+            }
+        )
+    return rows
+
+
+def tracing_enabled() -> bool:
+    return os.getenv(TRACING_ENV_VAR, "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+_TRACER: Tracer | None = None
+_TRACER_LOCK = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer; exporters are configured from the environment.
+
+    Spans go to ``TRACE_JSONL_PATH`` (default ``.cache/traces/spans.jsonl``; empty to
+    disable), rotated at ``TRACE_JSONL_MAX_BYTES`` with ``TRACE_JSONL_BACKUPS`` old
+    files kept, and, when an ``OTEL_EXPORTER_OTLP_*ENDPOINT`` is set and the OTLP
+    exporter is installed, to that collector.
+    """
+    global _TRACER
+    with _TRACER_LOCK:
+        if _TRACER is None:
+            exporters: List[SpanExporter] = []
+            jsonl_path = os.getenv(TRACE_JSONL_ENV_VAR, str(DEFAULT_TRACE_JSONL_PATH)).strip()
+            if jsonl_path:
+                exporters.append(
+                    JsonlSpanExporter(
+                        jsonl_path,
+                        max_bytes=int(
+                            os.getenv(TRACE_JSONL_MAX_BYTES_ENV_VAR, DEFAULT_TRACE_JSONL_MAX_BYTES)
+                        ),
+                        backups=int(
+                            os.getenv(TRACE_JSONL_BACKUPS_ENV_VAR, DEFAULT_TRACE_JSONL_BACKUPS)
+                        ),
+                    )
+                )
+            otlp_exporter = _otlp_exporter()
+            if otlp_exporter is not None:
+                exporters.append(OtelSpanExporter(otlp_exporter))
+            _TRACER = Tracer(exporters)
+        return _TRACER
+
+
+def tracing_plugins() -> List[BasePlugin]:
+    """Runner plugins that record spans, or none when ``TRACING`` is off."""
+    return [TracingPlugin(get_tracer())] if tracing_enabled() else []
+
+
+def _otlp_exporter() -> Any:
+    if otel_trace is None or not any(os.getenv(name) for name in OTLP_ENDPOINT_ENV_VARS):
+        return None
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return OTLPSpanExporter()
+
+
+def _descendants(span: Span, children: Mapping[str, List[Span]]) -> List[Span]:
+    found = []
+    pending = list(children.get(span.span_id, ()))
+    while pending:
+        child = pending.pop()
+        found.append(child)
+        pending.extend(children.get(child.span_id, ()))
+    return found
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def _reset_current(token: contextvars.Token) -> None:
+    try:
+        _CURRENT_SPAN.reset(token)
+    except ValueError:
+        # The block was left from another context (e.g. an async generator closed
+        # by the event loop); that context never saw the span.
+        pass
+
+
+def _safe_export(hook: Any, span: Span) -> None:
+    try:
+        hook(span)
+    except Exception:
+        # Tracing must never fail the traced run.
+        pass
@@ -0,0 +1 @@
+# Package marker for the workflow HTTP service.
@@ -0,0 +1,338 @@
+"""HTTP service around the marketing workflow: submit a job, poll it, fetch the result.
+
+Identical in-flight submissions (same agent and normalized query) share one run.
+A bounded queue feeds a fixed pool of workers; once it is full, new work gets 429.
+
+Run with ``python -m src.workflow_service.app`` or
+``uvicorn src.workflow_service.app:app``.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import math
+import os
+from pathlib import Path
+import re
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+import uuid
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.marketing_orchestrator.agent import (  # noqa: E402
+    WORKFLOW_AGENT_NAMES,
+    MarketingOrchestrator,
+    run_workflow_async,
+)
+from src.utils.context_cache import context_cache_stats, release_context_caches  # noqa: E402
+from src.utils.llm_governor import (  # noqa: E402
+    INTERACTIVE_LANE,
+    LANES,
+    governor_metrics,
+    run_in_lane,
+)
+
+WORKERS_ENV_VAR = "WORKFLOW_SERVICE_WORKERS"
+QUEUE_SIZE_ENV_VAR = "WORKFLOW_SERVICE_QUEUE_SIZE"
+MAX_JOBS_ENV_VAR = "WORKFLOW_SERVICE_MAX_JOBS"
+HOST_ENV_VAR = "WORKFLOW_SERVICE_HOST"
+PORT_ENV_VAR = "WORKFLOW_SERVICE_PORT"
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_MAX_JOBS = 1000
+MAX_WAIT_S = 60.0
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+
+def coalesce_key(agent_name: str | None, query: str) -> str:
+    """Agent plus the query with case, whitespace and trailing punctuation ignored."""
+    normalized = re.sub(r"\s+", " ", query).strip().rstrip(".?!").strip().casefold()
+    return f"{agent_name or MarketingOrchestrator.name}\n{normalized}"
+
+
+@dataclass
+class Job:
+    """One workflow run; every coalesced submission polls the same job."""
+
+    id: str
+    agent: str
+    query: str
+    key: str
+    lane: str = INTERACTIVE_LANE
+    status: str = QUEUED
+    submissions: int = 1
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    results: Dict[str, Any] | None = None
+    logs: List[str] = field(default_factory=list)
+    error: str | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "agent": self.agent,
+            "query": self.query,
+            "lane": self.lane,
+            "status": self.status,
+            "submissions": self.submissions,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class QueueFullError(RuntimeError):
+    """No room for new work; the caller should retry after ``retry_after_s``."""
+
+    def __init__(self, retry_after_s: int) -> None:
+        super().__init__(f"Workflow queue is full; retry in {retry_after_s}s.")
+        self.retry_after_s = retry_after_s
+
+
+class WorkflowService:
+    """Singleflight job queue in front of ``run_workflow_async``.
+
+    ``submit`` joins an in-flight job with the same ``coalesce_key`` instead of
+    queueing another run. At most ``queue_size`` distinct jobs wait for one of the
+    ``workers``; beyond that ``submit`` raises ``QueueFullError``. Finished jobs are
+    kept for polling until ``max_jobs`` newer ones push them out.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+    ) -> None:
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.max_jobs = max(max_jobs, 1)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._in_flight: Dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._running = 0
+        self._durations: List[float] = []
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+        }
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self, query: str, agent_name: str | None = None, lane: str = INTERACTIVE_LANE
+    ) -> Tuple[Job, bool]:
+        """Queue a run, or join the identical one in flight; returns ``(job, coalesced)``.
+
+        ``lane`` is the job's LLM governor priority; a joined job keeps its own. An
+        unknown ``agent_name`` raises ``ValueError``.
+        """
+        if self._queue is None:
+            raise RuntimeError("WorkflowService.start() has not been awaited.")
+        agent_name = agent_name or MarketingOrchestrator.name
+        if agent_name not in WORKFLOW_AGENT_NAMES:
+            raise ValueError(f"agent must be one of {', '.join(WORKFLOW_AGENT_NAMES)}")
+        self.stats["submitted"] += 1
+        key = coalesce_key(agent_name, query)
+        job = self._in_flight.get(key)
+        if job is not None:
+            job.submissions += 1
+            self.stats["coalesced"] += 1
+            return job, True
+        job = Job(
+            id=uuid.uuid4().hex,
+            agent=agent_name,
+            query=query,
+            key=key,
+            lane=lane,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFullError(self.retry_after_s()) from None
+        self._in_flight[key] = job
+        self._remember(job)
+        return job, False
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout_s: float) -> None:
+        if timeout_s <= 0 or job.done.is_set():
+            return
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            return
+
+    def retry_after_s(self) -> int:
+        """Rough time until a queue slot frees up: an average run spread over the workers."""
+        recent = self._durations[-20:]
+        average_s = sum(recent) / len(recent) if recent else 1.0
+        return max(math.ceil(average_s / self.workers), 1)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "in_flight": len(self._in_flight),
+            **self.stats,
+            "llm_governor": governor_metrics(),
+            "context_cache": context_cache_stats(),
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.results, job.logs = await run_in_lane(
+                    job.lane, run_workflow_async(job.query, job.agent)
+                )
+                job.status = SUCCEEDED
+            except Exception as error:
+                job.error = f"{type(error).__name__}: {error}"
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+                self._running -= 1
+                self._durations = [*self._durations[-19:], job.finished_at - job.started_at]
+                self.stats[job.status] = self.stats.get(job.status, 0) + 1
+                # Later submissions start a fresh run (cheap with ``STAGE_CHECKPOINTS`` on).
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+                job.done.set()
+                self._queue.task_done()
+
+    def _remember(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status not in FINISHED_STATUSES:
+                break
+            del self._jobs[oldest_id]
+
+
+class JobRequest(BaseModel):
+    query: str = Field(min_length=1)
+    agent: str | None = None
+    lane: str = INTERACTIVE_LANE
+
+
+def create_app(service: WorkflowService | None = None) -> FastAPI:
+    """FastAPI app serving ``service`` (default: configured from ``WORKFLOW_SERVICE_*``)."""
+    service = service or WorkflowService(
+        workers=int(os.getenv(WORKERS_ENV_VAR, DEFAULT_WORKERS)),
+        queue_size=int(os.getenv(QUEUE_SIZE_ENV_VAR, DEFAULT_QUEUE_SIZE)),
+        max_jobs=int(os.getenv(MAX_JOBS_ENV_VAR, DEFAULT_MAX_JOBS)),
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await service.start()
+        try:
+            yield
+        finally:
+            await service.stop()
+            # Stored context caches are billed until they expire.
+            await release_context_caches()
+
+    app = FastAPI(title="Marketing workflow service", lifespan=lifespan)
+    app.state.service = service
+
+    @app.post("/jobs", status_code=202)
+    async def submit_job(request: JobRequest) -> Dict[str, Any]:
+        if not request.query.strip():
+            raise HTTPException(status_code=422, detail="query must not be blank")
+        if request.lane not in LANES:
+            raise HTTPException(status_code=422, detail=f"lane must be one of {', '.join(LANES)}")
+        try:
+            job, coalesced = service.submit(request.query, request.agent, request.lane)
+        except ValueError as error:
+            raise HTTPException(status_code=422, detail=str(error)) from None
+        except QueueFullError as error:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": str(error)},
+                headers={"Retry-After": str(error.retry_after_s)},
+            )
+        return {**job.summary(), "coalesced": coalesced}
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str) -> Dict[str, Any]:
+        return _job_or_404(service, job_id).summary()
+
+    @app.get("/jobs/{job_id}/result")
+    async def job_result(job_id: str, wait: float = 0.0) -> Any:
+        """The job's results once finished; ``wait`` long-polls for up to that many seconds."""
+        job = _job_or_404(service, job_id)
+        await service.wait(job, min(wait, MAX_WAIT_S))
+        if job.status not in FINISHED_STATUSES:
+            return JSONResponse(status_code=202, content=job.summary())
+        return {**job.summary(), "results": job.results, "logs": job.logs}
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return service.health()
+
+    return app
+
+
+def _job_or_404(service: WorkflowService, job_id: str) -> Job:
+    job = service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'.")
+    return job
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=os.getenv(HOST_ENV_VAR, "127.0.0.1"),
+        port=int(os.getenv(PORT_ENV_VAR, "8080")),
+    )
@@ -2,8 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
-import time
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
 import streamlit as st
 
@@ -12,7 +11,12 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from src.marketing_orchestrator.agent import run_workflow  # noqa: E402
+# Names are looked up on use: the workflow and Google ADK load on the first run,
+# not while the page first renders.
+from src.marketing_orchestrator import agent as marketing_orchestrator  # noqa: E402
+
+if TYPE_CHECKING:
+    from src.marketing_orchestrator.workflow import StageUpdate
 
 
 AGENT_DESCRIPTIONS = {
@@ -62,6 +66,78 @@ def render_offer_card(offer: Dict[str, Any]) -> None:
     )
 
 
+STAGE_TITLES = {
+    "trend_briefs": "Trend Briefs",
+    "customer_insights": "Customer Insights",
+    "event_calendar": "Event Calendar",
+    "offer_concepts": "Offer Concepts",
+}
+
+
+def render_stage_timings(timings: List[Dict[str, Any]]) -> None:
+    if not timings:
+        return
+    st.markdown("#### Stage Timings")
+    st.table(
+        [
+            {
+                "Stage": row["stage"],
+                "Start (s)": row["start_s"],
+                "Duration (s)": row["duration_s"],
+                "LLM calls": row["llm_calls"],
+                "Tool calls": row["tool_calls"],
+                "Tokens in/out": f"{row['input_tokens']}/{row['output_tokens']}",
+                "Escalations": row.get("escalations", 0),
+                "Queue wait (s)": row.get("queue_wait_s", 0.0),
+                "Cached input": f"{row.get('cached_share', 0.0):.0%}",
+                "Cache saved (s)": row.get("cache_saved_s", 0.0),
+                "Error": row["error"] or "",
+            }
+            for row in timings
+        ]
+    )
+
+
+def render_stage_update(update: StageUpdate) -> None:
+    if update.output_key == marketing_orchestrator.TIMINGS_KEY:
+        render_stage_timings(update.value)
+        return
+    title = STAGE_TITLES.get(update.output_key)
+    if title is None:
+        return
+    st.markdown(f"#### {title}")
+    st.caption(update.log)
+    if update.error:
+        st.error(f"{update.stage} failed: {update.error}")
+    elif not update.value:
+        st.warning(f"{update.stage} returned no results.")
+    elif update.output_key == "offer_concepts":
+        for offer in update.value:
+            render_offer_card(offer)
+    else:
+        st.json(update.value)
+
+
+def render_stage_retry(output_key: str, message: str) -> None:
+    """Warn about an empty stage and offer to re-run only that stage."""
+    st.warning(message)
+    if not st.button(f"Retry {STAGE_TITLES[output_key]}", key=f"retry_{output_key}"):
+        return
+    with st.spinner(f"Retrying {STAGE_TITLES[output_key]}..."):
+        # Offer design is rebuilt from the upstream outputs of the last run.
+        update = marketing_orchestrator.retry_stage(
+            output_key,
+            st.session_state.get("last_query", ""),
+            {**st.session_state.get("stage_results", {}), **st.session_state.get("results", {})},
+        )
+    st.session_state.setdefault("logs", []).append(update.log)
+    if update.error:
+        st.error(f"{update.stage} failed again: {update.error}")
+        return
+    st.session_state["results"][output_key] = update.value
+    st.rerun()
+
+
 def main() -> None:
     st.set_page_config(page_title="Wendy's AI Agents", layout="wide")
     st.title("Wendy's AI Agents Hackathon")
@@ -70,6 +146,10 @@ def main() -> None:
         st.header("Agent Selector")
         selected_agent = st.selectbox("Select an agent", list(AGENT_DESCRIPTIONS.keys()))
         st.markdown(AGENT_DESCRIPTIONS[selected_agent])
+        recompute = st.checkbox(
+            "Recompute all stages",
+            help="With STAGE_CHECKPOINTS on, stages whose inputs are unchanged reuse their last output.",
+        )
         st.divider()
         st.caption(
             "Workflow: Market Trends Analyst -> Customer Insights -> Event Planner -> Offer Design"
@@ -92,20 +172,36 @@ def main() -> None:
                 st.warning("Please enter a research topic before running.")
             else:
                 st.session_state["last_query"] = query
+                logs: List[str] = [f"Selected agent: {selected_agent}."]
+                stage_results: Dict[str, Any] = {}
+                live_results = st.container()
                 with st.spinner("Processing..."):
-                    results, logs = run_workflow(query, selected_agent)
-                    time.sleep(0.4)
+                    # Each section is rendered as soon as its stage finishes.
+                    for update in marketing_orchestrator.stream_workflow(
+                        query, selected_agent, recompute=recompute
+                    ):
+                        logs.append(update.log)
+                        log_placeholder.markdown(
+                            "\n".join(f"- {entry}" for entry in logs)
+                        )
+                        stage_results[update.output_key] = update.value
+                        with live_results:
+                            render_stage_update(update)
                 st.session_state["analysis_complete"] = True
-                st.session_state["results"] = results
+                st.session_state["results"] = marketing_orchestrator.select_workflow_results(
+                    selected_agent, stage_results
+                )
                 st.session_state["logs"] = logs
+                st.session_state["stage_results"] = stage_results
                 st.session_state["last_agent"] = selected_agent
                 st.success("Execution complete. Open the Results tab to view outputs.")
 
-        logs: List[str] = st.session_state.get("logs", [])
+        logs = st.session_state.get("logs", [])
         if logs:
-            log_placeholder.subheader("Execution Log")
-            for entry in logs:
-                log_placeholder.write(f"- {entry}")
+            with log_placeholder.container():
+                st.subheader("Execution Log")
+                for entry in logs:
+                    st.write(f"- {entry}")
 
     with results_tab:
         st.subheader("Results")
@@ -118,29 +214,31 @@ def main() -> None:
                 st.info("Run a query in the Query tab to view results here.")
             else:
                 st.caption(f"Showing output for: {last_agent}")
+                with st.expander("Stage timings"):
+                    render_stage_timings(results.get(marketing_orchestrator.TIMINGS_KEY, []))
                 if last_agent in ("Marketing Orchestrator", "Offer Design"):
                     offers = results.get("offer_concepts", [])
                     if not offers:
-                        st.warning("No offers generated. Run the workflow again.")
+                        render_stage_retry("offer_concepts", "No offers generated.")
                     else:
                         for offer in offers:
                             render_offer_card(offer)
                 elif last_agent == "Market Trends Analyst":
                     trend_briefs = results.get("trend_briefs", [])
                     if not trend_briefs:
-                        st.warning("No trend briefs generated. Run the workflow again.")
+                        render_stage_retry("trend_briefs", "No trend briefs generated.")
                     else:
                         st.json(trend_briefs)
                 elif last_agent == "Customer Insights Manager":
                     customer_insights = results.get("customer_insights", [])
                     if not customer_insights:
-                        st.warning("No customer insights generated. Run the workflow again.")
+                        render_stage_retry("customer_insights", "No customer insights generated.")
                     else:
                         st.json(customer_insights)
                 elif last_agent == "Event Planner":
                     event_calendar = results.get("event_calendar", {})
                     if not event_calendar:
-                        st.warning("No event calendar generated. Run the workflow again.")
+                        render_stage_retry("event_calendar", "No event calendar generated.")
                     else:
                         st.json(event_calendar)
                 else: